@@ -1,29 +1,22 @@
 # src/main.py
 import asyncio
-import dagger
+import csv
+import io
 import streamlit as st
 import os
 import time
-from datetime import datetime
 import pandas as pd
 
 from models.data_models import UserDetails, JobCriteria
-from agents.coordinator import CoordinatorAgent
-from agents.job_search import JobSearchAgent
-from agents.form_analyzer import FormAnalyzerAgent
-from agents.form_filler import FormFillerAgent
-from agents.tracker import TrackerAgent
+from agents.tracker import REPORT_COLUMNS
+from runtime import build_runtime
+from utils.service_client import ServiceClient, daemon_url
+from utils.application_store import ApplicationStore, days_ago, default_store_path
 
-async def run_job_application_system(user_details, job_criteria, domains):
-    # Create runtime
-    runtime = dagger.Runtime()
-    
-    # Register all agents
-    runtime.register_agent("coordinator", CoordinatorAgent())
-    runtime.register_agent("job_search", JobSearchAgent())
-    runtime.register_agent("form_analyzer", FormAnalyzerAgent())
-    runtime.register_agent("form_filler", FormFillerAgent())
-    runtime.register_agent("tracker", TrackerAgent())
+async def run_job_application_system(user_details, job_criteria, domains, on_result=None, top_k=None, min_score=None,
+                                     settings=None):
+    # Create runtime with all agents registered; settings as in the CLI config file
+    runtime = build_runtime(settings)
     
     # Start the runtime
     await runtime.start()
@@ -32,11 +25,14 @@ async def run_job_application_system(user_details, job_criteria, domains):
         # Get coordinator
         coordinator = await runtime.get_agent("coordinator")
         
-        # Run job application process
+        # Run job application process; on_result sees each result as it completes
         results = await coordinator.coordinate_job_applications(
             user_details,
             job_criteria,
-            domains
+            domains,
+            on_result=on_result,
+            top_k=top_k,
+            min_score=min_score
         )
         
         return results
@@ -59,12 +55,14 @@ def create_streamlit_ui():
         name = st.text_input("Full Name")
         email = st.text_input("Email Address")
         phone = st.text_input("Phone Number")
+        skills = st.text_input("Skills (comma-separated)", placeholder="Python, SQL")
         resume = st.file_uploader("Upload Resume (PDF)", type=["pdf"])
         
         # Save uploaded resume temporarily
         resume_path = None
         if resume:
-            resume_path = f"temp_resume_{int(time.time())}.pdf"
+            # Absolute, so a job application service in another directory can read it
+            resume_path = os.path.abspath(f"temp_resume_{int(time.time())}.pdf")
             with open(resume_path, "wb") as f:
                 f.write(resume.getbuffer())
     
@@ -77,6 +75,17 @@ def create_streamlit_ui():
         domains = st.text_area("Job Board Domains (comma-separated)", 
                                value=domains_default)
         domains_list = [d.strip() for d in domains.split(",") if d.strip()]
+        keywords = st.text_input("Keywords (comma-separated)", placeholder="backend, distributed systems")
+        
+        # Listings are ranked against the keywords and skills; without either every listing is kept
+        col1, col2 = st.columns(2)
+        top_k = col1.number_input("Apply to the N most relevant jobs (0 = all)", min_value=0, max_value=1000, value=20)
+        min_score = col2.number_input("Minimum relevance score (0 = any)", min_value=0.0, value=0.0, step=0.5)
+        
+        # Search limits of runs started here; a running service keeps the ones in its --config
+        col1, col2 = st.columns(2)
+        max_jobs_per_domain = col1.number_input("Jobs per domain", min_value=1, max_value=500, value=3)
+        max_result_pages = col2.number_input("Search result pages per domain", min_value=1, max_value=50, value=3)
     
     if st.button("Start Job Search & Application", type="primary"):
         if not (name and email and phone and resume_path and job_title and location and domains_list):
@@ -87,69 +96,136 @@ def create_streamlit_ui():
                 email=email,
                 phone=phone,
                 resume_path=resume_path,
+                skills=split_list(skills),
                 experience_years=experience
             )
             
             job_criteria = JobCriteria(
                 title=job_title,
                 location=location,
-                experience=experience
+                experience=experience,
+                keywords=split_list(keywords)
             )
+            ranking = {"top_k": int(top_k) or None, "min_score": min_score or None}
+            
+            st.subheader("Application Results")
+            progress = st.empty()
+            rows = st.container()
+            streamed = []
+            
+            def show_result(app):
+                # Render each application as soon as the coordinator yields it
+                streamed.append(app)
+                successful = sum(1 for r in streamed if r.success)
+                progress.info(f"Processed {len(streamed)} applications so far ({successful} successful)...")
+                with rows:
+                    status = "✅ Success" if app.success else "❌ Failed"
+                    st.write(f"**{app.job.title}** - {app.job.domain} - {status}")
+                    st.write(f"[Application Link]({app.job.url})")
+                    st.write(f"Applied: {app.timestamp}")
+                    if app.notes:
+                        st.write(f"Notes: {app.notes}")
+                    st.divider()
             
             with st.spinner("Multi-Agent system searching for jobs and applying..."):
-                # Run the async function in the streamlit environment
-                results = asyncio.run(run_job_application_system(
-                    user_details, 
-                    job_criteria, 
-                    domains_list
-                ))
-                
-                if results:
-                    successful = [r for r in results if r.success]
-                    st.success(f"Successfully processed {len(successful)} out of {len(results)} job applications!")
-                    
-                    # Display results
-                    st.subheader("Application Results")
-                    
-                    for app in results:
-                        status = "✅ Success" if app.success else "❌ Failed"
-                        st.write(f"**{app.job.title}** - {app.job.domain} - {status}")
-                        st.write(f"[Application Link]({app.job.url})")
-                        st.write(f"Applied: {app.timestamp}")
-                        if app.notes:
-                            st.write(f"Notes: {app.notes}")
-                        st.divider()
-                        
-                    # Provide download links
-                    csv_file = f"job_applications_{int(time.time())}.csv"
-                    
-                    # Convert to dict for DataFrame
-                    apps_dict = []
-                    for app in results:
-                        apps_dict.append({
-                            "url": app.job.url,
-                            "domain": app.job.domain,
-                            "title": app.job.title,
-                            "success": app.success,
-                            "timestamp": app.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                            "notes": app.notes
-                        })
-                        
-                    pd.DataFrame(apps_dict).to_csv(csv_file, index=False)
-                    
-                    with open(csv_file, "rb") as file:
-                        st.download_button(
-                            label="Download Results (CSV)",
-                            data=file,
-                            file_name=csv_file,
-                            mime="text/csv"
-                        )
+                if daemon_url():
+                    # A running service keeps browsers and caches warm between runs
+                    client = ServiceClient()
+                    try:
+                        job_id = client.submit(user_details, job_criteria, domains_list, **ranking)
+                        results = []
+                        for app in client.iter_results(job_id):
+                            show_result(app)
+                            results.append(app)
+                    finally:
+                        client.close()
                 else:
-                    st.warning("No applications processed. Try adjusting your search criteria.")
+                    # Run the async function in the streamlit environment
+                    results = asyncio.run(run_job_application_system(
+                        user_details, 
+                        job_criteria, 
+                        domains_list,
+                        on_result=show_result,
+                        settings={"max_jobs_per_domain": int(max_jobs_per_domain),
+                                  "max_result_pages": int(max_result_pages)},
+                        **ranking
+                    ))
+                
+            if results:
+                successful = [r for r in results if r.success]
+                progress.success(f"Successfully processed {len(successful)} out of {len(results)} job applications!")
+                
+                # Build the download in memory; nothing is written to disk
+                st.download_button(
+                    label="Download Results (CSV)",
+                    data=results_to_csv(results),
+                    file_name=f"job_applications_{int(time.time())}.csv",
+                    mime="text/csv"
+                )
+            else:
+                progress.warning("No applications processed. Try adjusting your search criteria.")
                     
             # Clean up temporary file
             if resume_path and os.path.exists(resume_path):
                 os.remove(resume_path)
+                
+    show_application_history()
+
+def split_list(text):
+    """Comma-separated input as a list, None if empty"""
+    return [item.strip() for item in text.split(",") if item.strip()] or None
+
+def results_to_csv(results):
+    """Serialize application results to CSV text in an in-memory buffer"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_COLUMNS)
+    writer.writeheader()
+    for app in results:
+        writer.writerow(app.to_record())
+    return buffer.getvalue()
+
+def show_application_history(db_path=None, page_size=50):
+    """Filtered, paged view over every application recorded by the tracker"""
+    db_path = db_path or default_store_path()
+    if not os.path.exists(db_path):
+        return
+        
+    with st.expander("📊 Application History"):
+        col1, col2, col3 = st.columns(3)
+        domain = col1.text_input("Domain", placeholder="lever.co").strip() or None
+        status = col2.selectbox("Status", ["All", "Success", "Failed"])
+        days = col3.number_input("Last N days", min_value=0, max_value=3650, value=7)
+        
+        filters = {
+            "domain": domain,
+            "success": {"All": None, "Success": True, "Failed": False}[status],
+            "since": days_ago(days) if days else None,
+        }
+        
+        # Keyset pagination: remember the last row id of every page shown so far
+        filter_key = repr(filters["domain"]) + status + str(days)
+        if st.session_state.get("history_filter") != filter_key:
+            st.session_state["history_filter"] = filter_key
+            st.session_state["history_pages"] = [None]
+        pages = st.session_state["history_pages"]
+        
+        store = ApplicationStore(db_path)
+        try:
+            total = store.count(**filters)
+            rows = store.query(limit=page_size, cursor=pages[-1], **filters)
+        finally:
+            store.close()
+            
+        st.write(f"{total} matching applications (page {len(pages)})")
+        st.dataframe(pd.DataFrame([result.to_record() for _, result in rows]))
+        
+        prev_col, next_col = st.columns(2)
+        if len(pages) > 1 and prev_col.button("Previous page"):
+            pages.pop()
+            st.rerun()
+        if len(rows) == page_size and next_col.button("Next page"):
+            pages.append(rows[-1][0])
+            st.rerun()
 
 if __name__ == "__main__":
     create_streamlit_ui()
\ No newline at end of file
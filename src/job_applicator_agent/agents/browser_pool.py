@@ -0,0 +1,325 @@
+# src/agents/browser_pool.py
+import dagger
+import asyncio
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable, Dict, List, Optional
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from webdriver_manager.chrome import ChromeDriverManager
+
+from utils.tracing import tracer
+
+try:
+    import psutil
+except ImportError:  # RSS is read from /proc instead
+    psutil = None
+
+
+@dataclass
+class _PooledDriver:
+    driver: webdriver.Chrome
+    created_at: float = field(default_factory=time.monotonic)
+    pages: int = 0
+    leased_at: Optional[float] = None
+
+
+class BrowserSession:
+    """One leased tab that follows a job from analysis to filling.
+
+    The driver is leased on first use and kept until close(), and open()
+    skips the page load when the tab already shows the requested URL, so
+    the filler can continue on the exact page the analyzer inspected.
+    """
+
+    def __init__(self, pool: "BrowserPoolAgent"):
+        self.pool = pool
+        self.driver: Optional[webdriver.Chrome] = None
+        self.url: Optional[str] = None
+        self.page_loads = 0
+
+    async def open(self, url: str, wait_for: Optional[str] = None) -> webdriver.Chrome:
+        """Return the session's driver showing url, loading it only if needed"""
+        if self.driver is None:
+            self.driver = await self.pool.acquire()
+        if self.url != url:
+            await self.pool.navigate(self.driver, url, wait_for=wait_for)
+            self.url = url
+            self.page_loads += 1
+        return self.driver
+
+    async def close(self):
+        if self.driver is not None:
+            driver, self.driver, self.url = self.driver, None, None
+            await self.pool.release(driver)
+
+    async def __aenter__(self) -> "BrowserSession":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class BrowserPoolAgent(dagger.Agent):
+    """Shared pool of headless Chrome drivers leased by the other agents.
+
+    Selenium calls block, so every driver operation runs on a dedicated
+    thread pool (one thread per driver) instead of on the event loop.
+    """
+
+    def __init__(self,
+                 size: int = 3,
+                 max_pages: int = 50,
+                 max_rss_mb: int = 1024,
+                 headless: bool = True,
+                 page_timeout: float = 30.0,
+                 ready_timeout: float = 10.0):
+        super().__init__()
+        self.size = size
+        self.max_pages = max_pages  # Recycle a driver after this many page loads
+        self.max_rss_mb = max_rss_mb  # ... or once Chrome grows past this much memory
+        self.headless = headless
+        self.page_timeout = page_timeout  # Hard limit for driver.get()
+        self.ready_timeout = ready_timeout  # Limit for readiness waits after load
+
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="browser")
+
+        self._driver_path = None
+        self._idle: List[_PooledDriver] = []
+        self._leased: Dict[int, _PooledDriver] = {}
+        self._slots = asyncio.Semaphore(size)
+        self._closed = False
+
+        self._started_at = time.monotonic()
+        self._stats = {
+            "created": 0,
+            "recycled": 0,
+            "unhealthy": 0,
+            "leases": 0,
+            "pages": 0,
+            "ready_timeouts": 0,
+            "wait_seconds": 0.0,
+            "busy_seconds": 0.0,
+        }
+
+        # Register capabilities
+        self.register_capability(
+            "get_pool_stats",
+            "Get browser pool utilization statistics",
+            self.get_pool_stats
+        )
+
+    def _create_driver(self) -> _PooledDriver:
+        """Start a new Chrome instance"""
+        chrome_options = Options()
+        if self.headless:
+            chrome_options.add_argument("--headless")
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+
+        # Resolve the chromedriver binary once for the whole pool
+        if self._driver_path is None:
+            self._driver_path = ChromeDriverManager().install()
+
+        service = Service(self._driver_path)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+        driver.set_page_load_timeout(self.page_timeout)
+        self._stats["created"] += 1
+        return _PooledDriver(driver=driver)
+
+    def _quit_driver(self, pooled: _PooledDriver):
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            self.log(f"Error closing browser: {str(e)}")
+
+    def _is_healthy(self, pooled: _PooledDriver) -> bool:
+        """Check that the browser session still responds"""
+        try:
+            pooled.driver.current_url
+            return bool(pooled.driver.window_handles)
+        except Exception:
+            return False
+
+    def _rss_mb(self, pooled: _PooledDriver) -> float:
+        """Resident memory of chromedriver and every Chrome process below it"""
+        try:
+            pid = pooled.driver.service.process.pid
+        except AttributeError:
+            return 0.0
+
+        if psutil is not None:
+            try:
+                process = psutil.Process(pid)
+                processes = [process] + process.children(recursive=True)
+                return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+            except psutil.Error:
+                return 0.0
+
+        # Fall back to walking /proc on Linux
+        total_kb = 0
+        pending = [pid]
+        while pending:
+            current = pending.pop()
+            try:
+                with open(f"/proc/{current}/status") as f:
+                    for line in f:
+                        if line.startswith("VmRSS:"):
+                            total_kb += int(line.split()[1])
+                            break
+                with open(f"/proc/{current}/task/{current}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+            except (OSError, ValueError):
+                continue
+        return total_kb / 1024
+
+    def _needs_recycle(self, pooled: _PooledDriver) -> bool:
+        if self.max_pages and pooled.pages >= self.max_pages:
+            return True
+        if self.max_rss_mb and self._rss_mb(pooled) >= self.max_rss_mb:
+            return True
+        return False
+
+    async def acquire(self) -> webdriver.Chrome:
+        """Lease a healthy driver, waiting while the pool is exhausted"""
+        if self._closed:
+            raise RuntimeError("Browser pool is shut down")
+
+        with tracer.span("browser.acquire") as span:
+            wait_started = time.monotonic()
+            await self._slots.acquire()
+            self._stats["wait_seconds"] += time.monotonic() - wait_started
+
+            try:
+                pooled = None
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if await self.run(self._is_healthy, candidate):
+                        pooled = candidate
+                        break
+                    self._stats["unhealthy"] += 1
+                    await self.run(self._quit_driver, candidate)
+
+                if pooled is None:
+                    pooled = await self.run(self._create_driver)
+                    span.set(created=1)
+            except Exception:
+                self._slots.release()
+                raise
+
+        pooled.leased_at = time.monotonic()
+        self._leased[id(pooled.driver)] = pooled
+        self._stats["leases"] += 1
+        return pooled.driver
+
+    async def release(self, driver: webdriver.Chrome):
+        """Return a leased driver, recycling it if it is worn out"""
+        pooled = self._leased.pop(id(driver), None)
+        if pooled is None:
+            return
+
+        self._stats["busy_seconds"] += time.monotonic() - pooled.leased_at
+        pooled.leased_at = None
+
+        if self._closed:
+            await self.run(self._quit_driver, pooled)
+        elif await self.run(self._needs_recycle, pooled):
+            self.log(f"Recycling browser after {pooled.pages} pages")
+            self._stats["recycled"] += 1
+            tracer.count("browser_recycled")
+            await self.run(self._quit_driver, pooled)
+        else:
+            self._idle.append(pooled)
+        self._slots.release()
+
+    @asynccontextmanager
+    async def lease(self):
+        """Context manager that leases a driver for the duration of the block"""
+        driver = await self.acquire()
+        try:
+            yield driver
+        finally:
+            await self.release(driver)
+
+    def session(self) -> BrowserSession:
+        """A lazily leased tab that can be handed from one agent to the next"""
+        return BrowserSession(self)
+
+    async def run(self, func: Callable, *args, **kwargs):
+        """Run a blocking browser call on the pool's executor"""
+        loop = asyncio.get_running_loop()
+        # Carry the caller's context so spans opened in the thread keep their job
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, partial(context.run, func, *args, **kwargs))
+
+    def load_page(self,
+                  driver: webdriver.Chrome,
+                  url: str,
+                  wait_for: Optional[str] = None,
+                  timeout: Optional[float] = None) -> bool:
+        """Load a page on a leased driver and wait until it is ready.
+
+        Blocking; call it from the executor via run() or navigate(). Waits for
+        the DOM to finish loading and, if wait_for is given, for an element
+        matching that CSS selector. Returns False if the wait timed out.
+        """
+        with tracer.span("browser.load_page", url=url) as span:
+            driver.get(url)
+            pooled = self._leased.get(id(driver))
+            if pooled is not None:
+                pooled.pages += 1
+            self._stats["pages"] += 1
+
+            timeout = self.ready_timeout if timeout is None else timeout
+            try:
+                wait = WebDriverWait(driver, timeout)
+                wait.until(lambda d: d.execute_script("return document.readyState") == "complete")
+                if wait_for:
+                    wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, wait_for)))
+                return True
+            except TimeoutException:
+                self._stats["ready_timeouts"] += 1
+                span.set(ready_timeouts=1)
+                return False
+
+    async def navigate(self,
+                       driver: webdriver.Chrome,
+                       url: str,
+                       wait_for: Optional[str] = None,
+                       timeout: Optional[float] = None) -> bool:
+        """Load a page without blocking the event loop"""
+        return await self.run(self.load_page, driver, url, wait_for, timeout)
+
+    async def get_pool_stats(self) -> Dict[str, float]:
+        """Get browser pool utilization statistics"""
+        elapsed = time.monotonic() - self._started_at
+        now = time.monotonic()
+        busy = self._stats["busy_seconds"] + sum(
+            now - pooled.leased_at for pooled in self._leased.values()
+        )
+        return {
+            **self._stats,
+            "size": self.size,
+            "leased": len(self._leased),
+            "idle": len(self._idle),
+            "utilization": busy / (self.size * elapsed) if elapsed > 0 and self.size else 0.0,
+        }
+
+    async def shutdown(self):
+        """Clean up resources"""
+        self._closed = True
+        drivers = self._idle + list(self._leased.values())
+        self._idle = []
+        self._leased = {}
+        for pooled in drivers:
+            await self.run(self._quit_driver, pooled)
+        self._executor.shutdown(wait=False)
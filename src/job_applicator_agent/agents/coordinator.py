@@ -1,56 +1,322 @@
 # src/agents/coordinator.py
 import dagger
-from typing import List
-from models.data_models import UserDetails, JobCriteria, JobListing, ApplicationResult
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+from models.data_models import UserDetails, JobCriteria, JobListing, FormAnalysis, ApplicationResult
+from utils.checkpoints import SEARCHED, STAGE_ORDER, CheckpointStore, run_key_for
+from utils.pipeline import Stage, StagedPipeline
+from utils.relevance import BM25Ranker, query_terms, select_top
+from utils.tracing import tracer
+
+# Default number of concurrent workers per pipeline stage
+DEFAULT_STAGE_WORKERS = {
+    "search": 2,
+    "analyze": 4,
+    "fill": 2,
+    "track": 1,
+}
+
+@dataclass
+class _JobState:
+    """A job moving through the pipeline, with the last stage it completed"""
+    job: JobListing
+    stage: str = "found"
+    form_analysis: Optional[FormAnalysis] = None
+    result: Optional[ApplicationResult] = None
+
+    def reached(self, stage: str) -> bool:
+        return STAGE_ORDER[self.stage] >= STAGE_ORDER[stage]
+
+    def payload(self) -> Dict:
+        return {
+            "job": asdict(self.job),
+            "form_analysis": self.form_analysis.to_dict() if self.form_analysis else None,
+            "result": self.result.to_record() if self.result else None,
+        }
+
+    @classmethod
+    def from_checkpoint(cls, stage: str, payload: Dict) -> "_JobState":
+        job = JobListing(**payload["job"])
+        result = None
+        if payload.get("result"):
+            result = ApplicationResult.from_record(payload["result"])
+            result.job = job
+        form_analysis = None
+        if payload.get("form_analysis"):
+            form_analysis = FormAnalysis.from_dict(payload["form_analysis"])
+        return cls(job=job, stage=stage, form_analysis=form_analysis, result=result)
 
 class CoordinatorAgent(dagger.Agent):
-    def __init__(self):
+    def __init__(self,
+                 stage_workers: Optional[Dict[str, int]] = None,
+                 queue_size: int = 0,
+                 checkpoints: CheckpointStore = None,
+                 session_mode: bool = True,
+                 top_k: Optional[int] = None,
+                 min_score: Optional[float] = None,
+                 ranker: BM25Ranker = None):
         super().__init__()
+        # Workers per stage; queue_size bounds every stage queue (0 = 2 * workers)
+        self.stage_workers = {**DEFAULT_STAGE_WORKERS, **(stage_workers or {})}
+        self.queue_size = queue_size
+        # Per-job stage checkpoints let an interrupted run pick up where it stopped
+        self.checkpoints = checkpoints if checkpoints is not None else CheckpointStore()
+        # Session mode fills each job in the browser tab it was analyzed in, right
+        # after analysis, so a job costs one page load; analyze workers then fill too
+        self.session_mode = session_mode
+        # With top_k or min_score set, and keywords or skills to rank against, only
+        # the most relevant listings go on to analysis. Ranking needs the whole
+        # candidate set, so analysis then starts once the search is done
+        self.top_k = top_k
+        self.min_score = min_score
+        self.ranker = ranker if ranker is not None else BM25Ranker()
+
         # Register capabilities
         self.register_capability(
             "coordinate_job_applications",
             "Orchestrate the entire job application process",
             self.coordinate_job_applications
         )
-        
-    async def coordinate_job_applications(self, 
-                                         user_details: UserDetails, 
-                                         job_criteria: JobCriteria, 
-                                         domains: List[str]) -> List[ApplicationResult]:
-        """Orchestrate the entire job application process"""
-        
-        # Step 1: Find job listings
+
+        self.register_capability(
+            "stream_job_applications",
+            "Run the job application process, yielding each result as it completes",
+            self.stream_job_applications
+        )
+
+    async def coordinate_job_applications(self,
+                                         user_details: UserDetails,
+                                         job_criteria: JobCriteria,
+                                         domains: List[str],
+                                         run_key: Optional[str] = None,
+                                         on_result: Optional[Callable[[ApplicationResult], Optional[Awaitable]]] = None,
+                                         top_k: Optional[int] = None,
+                                         min_score: Optional[float] = None
+                                         ) -> List[ApplicationResult]:
+        """Orchestrate the entire job application process
+
+        on_result, if given, is called with every ApplicationResult as soon
+        as it is recorded (it may be a coroutine function).
+        """
+        tracker = await self.get_agent("tracker")
+        run_id = await tracker.start_run()
+        async for application_result in self.stream_job_applications(
+            user_details, job_criteria, domains, run_key, run_id, top_k, min_score
+        ):
+            if on_result is not None:
+                callback_result = on_result(application_result)
+                if callback_result is not None and hasattr(callback_result, "__await__"):
+                    await callback_result
+
+        # Step 5: Get final report of all applications
+        final_results = await tracker.get_all_applications(run_id)
+
+        return final_results
+
+    async def stream_job_applications(self,
+                                      user_details: UserDetails,
+                                      job_criteria: JobCriteria,
+                                      domains: List[str],
+                                      run_key: Optional[str] = None,
+                                      run_id: Optional[str] = None,
+                                      top_k: Optional[int] = None,
+                                      min_score: Optional[float] = None) -> AsyncIterator[ApplicationResult]:
+        """Run the job application process, yielding each result as it completes
+
+        A run with the same inputs (or the same run_key) as one that crashed
+        resumes every job from the last stage it completed. Results are
+        recorded and reported under the tracker run run_id (a new one if
+        not given), so runs sharing a long-lived tracker stay apart.
+        top_k and min_score override the agent's ranking settings for this run.
+        """
         job_search_agent = await self.get_agent("job_search")
-        jobs = await job_search_agent.find_jobs(job_criteria, domains)
-        self.log(f"Found {len(jobs)} potential job listings")
-        
-        results = []
-        
-        # Step 2: Process each job
-        for job in jobs:
-            # Step 2a: Analyze the application form
-            form_analyzer = await self.get_agent("form_analyzer")
-            form_analysis = await form_analyzer.analyze_application_form(job.url)
-            
+        browser_pool = await self.get_agent("browser_pool")
+        form_analyzer = await self.get_agent("form_analyzer")
+        form_filler = await self.get_agent("form_filler")
+        tracker = await self.get_agent("tracker")
+
+        run_key = run_key or run_key_for(user_details, job_criteria, domains)
+        run_id = run_id or await tracker.start_run()
+
+        def checkpoint(state: _JobState):
+            self.checkpoints.save(run_key, state.job.url, state.stage, state.payload())
+
+        # Resume: skip searched domains and re-enter every unfinished job at its next stage
+        saved = self.checkpoints.load(run_key)
+        searched = {key.split(":", 1)[1] for key, (stage, _) in saved.items() if stage == SEARCHED}
+        resumed = [
+            _JobState.from_checkpoint(stage, payload)
+            for key, (stage, payload) in saved.items()
+            if stage not in (SEARCHED, "recorded")
+        ]
+        if saved:
+            self.log(f"Resuming run {run_key}: {len(searched)} domains searched, {len(resumed)} jobs in progress")
+        source = resumed + [domain for domain in domains if domain not in searched]
+
+        # Step 1: Search each domain; every listing is forwarded as soon as it is found
+        async def search(item):
+            if isinstance(item, _JobState):
+                return [item]
+            return search_domain(item)
+
+        async def search_domain(domain: str) -> AsyncIterator[_JobState]:
+            jobs = 0
+            with tracer.span("coordinator.search", domain=domain) as span:
+                async for job in job_search_agent.stream_jobs(job_criteria, [domain]):
+                    # Jobs checkpointed before an interrupted search resume from their own stage
+                    if job.url in saved:
+                        continue
+                    state = _JobState(job=job)
+                    checkpoint(state)
+                    jobs += 1
+                    yield state
+                span.set(jobs=jobs)
+            self.log(f"Found {jobs} potential job listings on {domain}")
+            self.checkpoints.save(run_key, f"domain:{domain}", SEARCHED)
+
+        # Step 1b: Keep only the most relevant new listings
+        terms = query_terms(job_criteria, user_details)
+        top_k = top_k if top_k is not None else self.top_k
+        min_score = min_score if min_score is not None else self.min_score
+        ranking = bool(terms) and (top_k is not None or min_score is not None)
+
+        async def rank(states: List[_JobState]) -> List[_JobState]:
+            # Jobs resumed past the search were already chosen in an earlier attempt
+            candidates = [state for state in states if state.stage == "found"]
+            with tracer.span("coordinator.rank", candidates=len(candidates)) as span:
+                scores = self.ranker.score(terms, [state.job for state in candidates])
+                selected = select_top(scores, top_k, min_score)
+                span.set(selected=len(selected))
+            chosen = {int(index) for index in selected}
+            self.log(f"Ranked {len(candidates)} listings; {len(chosen)} go on to analysis")
+
+            # Listings passed over stay eligible for later runs
+            passed_over = [state.job.url for index, state in enumerate(candidates) if index not in chosen]
+            if passed_over:
+                await job_search_agent.forget_listings(passed_over)
+            resumed_states = [state for state in states if state.stage != "found"]
+            return resumed_states + [candidates[index] for index in selected]
+
+        # A job dropped before it is tracked is handed on again next run, and so
+        # are the near-duplicates skipped in its favour
+        async def drop(state: _JobState):
+            await job_search_agent.forget_listings([state.job.url])
+
+        def dropping_on_error(handler):
+            async def guarded(state: _JobState):
+                try:
+                    return await handler(state)
+                except Exception:
+                    await drop(state)
+                    raise
+            return guarded
+
+        # Step 2: Analyze the application form
+        async def analyze_in(state: _JobState, session=None) -> bool:
+            with tracer.job_scope(state.job.url), tracer.span("coordinator.analyze"):
+                form_analysis = await form_analyzer.analyze_application_form(state.job.url, session=session)
             if not form_analysis:
-                self.log(f"Could not analyze form for {job.url}")
-                continue
-                
-            # Step 2b: Fill out the application
-            form_filler = await self.get_agent("form_filler")
-            application_result = await form_filler.fill_application(
-                job, 
-                user_details, 
-                form_analysis
-            )
-            
-            # Step 3: Track the result
-            tracker = await self.get_agent("tracker")
-            await tracker.record_application(application_result)
-            
-            results.append(application_result)
-            
-        # Step 4: Get final report of all applications
-        final_results = await tracker.get_all_applications()
-        
-        return final_results
\ No newline at end of file
+                self.log(f"Could not analyze form for {state.job.url}")
+                return False
+            state.form_analysis = form_analysis
+            state.stage = "analyzed"
+            checkpoint(state)
+            return True
+
+        async def analyze(state: _JobState):
+            if state.reached("analyzed"):
+                return state
+            if not self.session_mode:
+                if not await analyze_in(state):
+                    await drop(state)
+                    return None
+                return state
+            # The tab that was analyzed goes straight to filling, still showing the form
+            async with browser_pool.session() as session:
+                if not await analyze_in(state, session):
+                    await drop(state)
+                    return None
+                await fill_in(state, session)
+            return state
+
+        # Step 3: Fill out the application
+        async def fill(state: _JobState):
+            if state.stage == "filling":
+                # An earlier attempt stopped mid-fill; never fill the same job twice
+                state.result = ApplicationResult(
+                    job=state.job,
+                    success=False,
+                    timestamp=datetime.now(),
+                    notes="Interrupted while filling in a previous attempt; not retried"
+                )
+                state.stage = "filled"
+                checkpoint(state)
+                return state
+            if state.reached("filled"):
+                return state
+            await fill_in(state)
+            return state
+
+        async def fill_in(state: _JobState, session=None):
+            state.stage = "filling"
+            checkpoint(state)
+            with tracer.job_scope(state.job.url), tracer.span("coordinator.fill"):
+                state.result = await form_filler.fill_application(
+                    state.job, user_details, state.form_analysis, session=session
+                )
+            state.stage = "filled"
+            checkpoint(state)
+
+        # Step 4: Track the result
+        async def track(state: _JobState) -> ApplicationResult:
+            application_result = state.result
+            with tracer.job_scope(state.job.url), tracer.span("coordinator.track"):
+                await tracker.record_application(application_result, run_id=run_id)
+            # Failed applications stay eligible for the next run, changed or not
+            if application_result.success:
+                await job_search_agent.record_listings([application_result.job.url])
+                await job_search_agent.mark_jobs_seen([application_result.job.url])
+            else:
+                await job_search_agent.forget_listings([application_result.job.url])
+            state.stage = "recorded"
+            checkpoint(state)
+            tracer.count("applications", domain=application_result.job.domain,
+                         success=application_result.success)
+            return application_result
+
+        def on_error(stage: str, item, error: Exception):
+            self.log(f"Error in {stage} stage for {item}: {str(error)}")
+
+        stages = [Stage("search", search, self.stage_workers["search"], self.queue_size, fan_out=True)]
+        if ranking:
+            stages.append(Stage("rank", rank, batch=True))
+        stages += [
+            Stage("analyze", dropping_on_error(analyze), self.stage_workers["analyze"], self.queue_size),
+            Stage("fill", dropping_on_error(fill), self.stage_workers["fill"], self.queue_size),
+            Stage("track", track, self.stage_workers["track"], self.queue_size),
+        ]
+        pipeline = StagedPipeline(stages, on_error=on_error)
+
+        # Results arrive in completion order, not discovery order
+        processed = 0
+        async for application_result in pipeline.run(source):
+            processed += 1
+            yield application_result
+        self.log(f"Processed {processed} job applications")
+
+        # The run finished, so the next run with these inputs starts fresh
+        self.checkpoints.clear(run_key)
+
+        # Reports are derived from the tracker's journal once per run
+        if processed:
+            await tracker.export_reports(run_id)
+
+        # Snapshot of every span and metric recorded so far, when tracing is enabled
+        paths = tracer.export()
+        if paths:
+            self.log(f"Wrote trace to {paths[0]} and metrics to {paths[1]}")
+
+    async def shutdown(self):
+        """Clean up resources"""
+        self.checkpoints.close()
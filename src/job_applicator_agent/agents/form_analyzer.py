@@ -1,23 +1,51 @@
 # src/agents/form_analyzer.py
 import dagger
-import google.generativeai as genai
-import json
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
-import time
 import os
 from dotenv import load_dotenv
 
-from models.data_models import FormAnalysis, FormField
+from agents.browser_pool import BrowserSession
+from models.data_models import FormAnalysis
+from utils.ats_parsers import extract_form
+from utils.form_cache import FormAnalysisCache, form_fingerprint, form_identifiers
+from utils.form_selectors import resolve_selectors
+from utils.form_serializer import estimate_tokens, serialize_form_controls
+from utils.json_repair import FORM_ANALYSIS_SCHEMA, SchemaError, parse_form_analysis
+from utils.llm_gateway import GeminiTransport, LLMGateway, RestTransport
+from utils.tracing import tracer
+
+def _has_form_controls(soup: BeautifulSoup) -> bool:
+    """Whether a static page already contains fillable form controls"""
+    for element in soup.find_all(["input", "textarea", "select"]):
+        if element.get("type", "").lower() != "hidden":
+            return True
+    return False
 
 class FormAnalyzerAgent(dagger.Agent):
-    def __init__(self):
+    def __init__(self,
+                 cache: FormAnalysisCache = None,
+                 min_extractor_confidence: float = 0.7,
+                 prompt_token_budget: int = 1500,
+                 gateway: LLMGateway = None):
         super().__init__()
-        self.driver = None
-        self.model = None
+        # All Gemini traffic goes through the rate-limited async gateway
+        self.gateway = gateway
+        # Rule-based ATS extractors below this confidence defer to Gemini
+        self.min_extractor_confidence = min_extractor_confidence
+        # Hard cap on the estimated size of the page description sent to Gemini
+        self.prompt_token_budget = prompt_token_budget
+        self.prompt_stats = {
+            "prompts": 0,
+            "prompt_tokens": 0,
+            "max_prompt_tokens": 0,
+            "source_chars": 0,
+            "truncated": 0,
+            "repaired_responses": 0,
+            "reprompts": 0,
+            "unparseable_responses": 0,
+        }
+        # Analyses are reused across postings that share a form template
+        self.cache = cache if cache is not None else FormAnalysisCache()
         
         # Register capabilities
         self.register_capability(
@@ -26,108 +54,199 @@ class FormAnalyzerAgent(dagger.Agent):
             self.analyze_application_form
         )
         
-    def setup_browser(self):
-        """Setup headless browser for form analysis"""
-        if self.driver is not None:
-            return
-            
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
+        self.register_capability(
+            "get_cache_stats",
+            "Get form analysis cache hit/miss counters",
+            self.get_cache_stats
+        )
+        
+        self.register_capability(
+            "get_llm_stats",
+            "Get Gemini gateway request, retry and batching counters",
+            self.get_llm_stats
+        )
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.register_capability(
+            "get_prompt_stats",
+            "Get Gemini prompt size metrics",
+            self.get_prompt_stats
+        )
         
     def setup_gemini(self):
-        load_dotenv()
         """Setup Gemini API"""
-        if self.model is not None:
+        load_dotenv()
+        if self.gateway is not None:
             return
             
         GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")  # Replace with your actual API key
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel('gemini-2.0-flash')
+        # GEMINI_BASE_URL points the gateway at a REST endpoint, e.g. a local stub server
+        base_url = os.getenv("GEMINI_BASE_URL")
+        if base_url:
+            transport = RestTransport(base_url=base_url, api_key=GEMINI_API_KEY)
+        else:
+            transport = GeminiTransport(api_key=GEMINI_API_KEY)
+        self.gateway = LLMGateway(transport)
         
-    async def analyze_application_form(self, url: str) -> FormAnalysis:
-        """Analyze a job application form using Gemini API"""
-        self.setup_browser()
+    async def analyze_application_form(self, url: str, session: BrowserSession = None) -> FormAnalysis:
+        """Analyze a job application form using Gemini API
+        
+        With a session, any page load happens in the session's tab and the
+        tab stays on the form, so the filler can continue there.
+        """
+        with tracer.span("analyze.form", url=url) as span:
+            form_analysis = await self._analyze_application_form(url, session, span)
+            span.set(analyzed=form_analysis is not None)
+            return form_analysis
+            
+    async def _load_page(self, url: str, session: BrowserSession = None):
+        """Page HTML and parsed soup, from the search snapshot when it has the form"""
+        job_search = await self.get_agent("job_search")
+        page_content = await job_search.get_page_snapshot(url)
+        if page_content:
+            soup = BeautifulSoup(page_content, "html.parser")
+            if _has_form_controls(soup):
+                return page_content, soup, "snapshot"
+        
+        browser_pool = await self.get_agent("browser_pool")
+        owned_session = session is None
+        session = session or browser_pool.session()
+        try:
+            # Wait for the DOM and the application form instead of a fixed sleep
+            driver = await session.open(url, wait_for="form")
+            page_content = await browser_pool.run(lambda: driver.page_source)
+        finally:
+            if owned_session:
+                await session.close()
+        return page_content, BeautifulSoup(page_content, "html.parser"), "browser"
+        
+    async def _analyze_application_form(self, url: str, session: BrowserSession, span) -> FormAnalysis:
         self.setup_gemini()
         
         try:
             self.log(f"Analyzing application form at {url}")
-            self.driver.get(url)
-            time.sleep(3)  # Allow page to load
-            
-            page_content = self.driver.page_source
-            soup = BeautifulSoup(page_content, "html.parser")
-            
-            # Extract visible text content
-            text_content = soup.get_text()
-            
-            # Also extract form elements
-            form_elements = []
-            for form in soup.find_all("form"):
-                form_elements.append(str(form))
-            
-            # Ask Gemini to extract application form details
-            prompt = f"""
-            Analyze this job application page content and identify:
-            1. Required form fields (name, email, phone, etc.)
-            2. Where to upload resume
-            3. Submit button identifier
+            page_content, soup, page_source = await self._load_page(url, session)
+            span.set(page_bytes=len(page_content), page_source=page_source)
             
-            Page content excerpt: {text_content[:3000]}...
+            form_analysis = await self._analyze_page(url, page_content, soup, span)
+            if form_analysis is not None:
+                # The filler addresses controls by these selectors in one batched script
+                resolve_selectors(form_analysis, soup)
+            return form_analysis
             
-            Form elements found: {form_elements[:3000] if form_elements else "None found"}
-            
-            Return as JSON with this structure:
-            {{
-                "form_fields": [
-                    {{
-                        "field_id": "string", 
-                        "field_type": "string", 
-                        "label": "string", 
-                        "required": boolean
-                    }}
-                ],
-                "resume_upload_id": "string or null",
-                "submit_button_id": "string or null"
-            }}
-            """
-            
-            response = self.model.generate_content(prompt)
+        except Exception as e:
+            self.log(f"Error analyzing page {url}: {str(e)}")
+            return None
             
+    async def _analyze_page(self, url: str, page_content: str, soup: BeautifulSoup, span) -> FormAnalysis:
+        """Extractor, then cache, then Gemini"""
+        # Known ATS layouts are parsed locally without calling Gemini
+        extraction = extract_form(url, soup)
+        if extraction is not None and extraction.confidence >= self.min_extractor_confidence:
+            self.log(f"Parsed form at {url} with {extraction.extractor} extractor")
+            span.set(source="extractor", extractor=extraction.extractor)
+            return extraction.analysis
+        
+        # Skip Gemini entirely when this form template was analyzed before
+        fingerprint = form_fingerprint(soup)
+        cached_analysis = self.cache.get(fingerprint, form_identifiers(soup))
+        if cached_analysis is not None:
+            self.log(f"Using cached form analysis for {url}")
+            span.set(source="cache", cache_hits=1)
+            return cached_analysis
+        
+        # Reduce the page to a compact, token-bounded description of its inputs
+        compact_form = serialize_form_controls(soup, self.prompt_token_budget, len(page_content))
+        
+        # Ask Gemini to extract application form details
+        prompt = f"""
+        Analyze this job application form and identify:
+        1. Required form fields (name, email, phone, etc.)
+        2. Where to upload resume
+        3. Submit button identifier
+        
+        Use the control's id as field_id, or its name when it has no id.
+        
+        {compact_form.text}
+        
+        Return as JSON with this structure:
+        {{
+            "form_fields": [
+                {{
+                    "field_id": "string", 
+                    "field_type": "string", 
+                    "label": "string", 
+                    "required": boolean
+                }}
+            ],
+            "resume_upload_id": "string or null",
+            "submit_button_id": "string or null"
+        }}
+        """
+        self._record_prompt(prompt, compact_form)
+        span.set(source="llm", cache_misses=1, prompt_tokens=estimate_tokens(prompt))
+        
+        # Batchable: when many analyses queue up they share one Gemini request
+        with tracer.span("llm.generate", prompt_tokens=estimate_tokens(prompt)):
+            response_text = await self.gateway.generate(
+                prompt, batchable=True, json_schema=FORM_ANALYSIS_SCHEMA
+            )
+        
+        with tracer.span("analyze.parse"):
+            form_analysis = await self._parse_response(prompt, response_text, url)
+        if form_analysis is not None:
+            self.cache.put(fingerprint, form_analysis)
+        return form_analysis
+        
+    async def _parse_response(self, prompt: str, response_text: str, url: str):
+        """Repair and validate Gemini output locally; re-prompt only if that fails"""
+        try:
+            form_analysis, repairs = parse_form_analysis(response_text)
+        except SchemaError as e:
+            self.log(f"Could not repair Gemini response for {url}: {str(e)}; asking again")
+            self.prompt_stats["reprompts"] += 1
+            tracer.count("llm_reprompts")
+            retry_prompt = (
+                f"{prompt}\n\nYour previous answer could not be used ({str(e)}). "
+                "Reply with only the JSON object, no markdown and no commentary."
+            )
+            response_text = await self.gateway.generate(retry_prompt, json_schema=FORM_ANALYSIS_SCHEMA)
             try:
-                analysis_dict = json.loads(response.text)
-                
-                # Convert to our data model
-                form_fields = []
-                for field in analysis_dict.get("form_fields", []):
-                    form_fields.append(FormField(
-                        field_id=field["field_id"],
-                        field_type=field["field_type"],
-                        label=field["label"],
-                        required=field.get("required", False)
-                    ))
-                
-                form_analysis = FormAnalysis(
-                    form_fields=form_fields,
-                    resume_upload_id=analysis_dict.get("resume_upload_id"),
-                    submit_button_id=analysis_dict.get("submit_button_id")
-                )
-                
-                return form_analysis
-                
-            except Exception as e:
+                form_analysis, repairs = parse_form_analysis(response_text)
+            except SchemaError as e:
+                self.prompt_stats["unparseable_responses"] += 1
                 self.log(f"Error parsing Gemini response: {str(e)}")
                 return None
+        
+        if repairs:
+            self.prompt_stats["repaired_responses"] += 1
+            tracer.count("llm_repaired_responses")
+            self.log(f"Repaired Gemini response for {url}: {', '.join(repairs)}")
+        return form_analysis
+        
+    async def get_llm_stats(self):
+        """Get LLM gateway request, retry and batching counters"""
+        return self.gateway.get_stats() if self.gateway is not None else {}
+        
+    async def get_cache_stats(self):
+        """Get form analysis cache hit/miss counters"""
+        return self.cache.stats()
+        
+    def _record_prompt(self, prompt: str, compact_form):
+        prompt_tokens = estimate_tokens(prompt)
+        self.prompt_stats["prompts"] += 1
+        self.prompt_stats["prompt_tokens"] += prompt_tokens
+        self.prompt_stats["max_prompt_tokens"] = max(self.prompt_stats["max_prompt_tokens"], prompt_tokens)
+        self.prompt_stats["source_chars"] += compact_form.source_chars
+        if compact_form.truncated:
+            self.prompt_stats["truncated"] += 1
+            self.log(f"Form description truncated to {compact_form.controls} of {compact_form.total_controls} controls")
             
-        except Exception as e:
-            self.log(f"Error analyzing page {url}: {str(e)}")
-            return None
+    async def get_prompt_stats(self):
+        """Get Gemini prompt size metrics"""
+        return dict(self.prompt_stats)
             
     async def shutdown(self):
         """Clean up resources"""
-        if self.driver:
-            self.driver.quit()
\ No newline at end of file
+        if self.gateway is not None:
+            self.gateway.close()
+        self.cache.close()
\ No newline at end of file
@@ -2,19 +2,73 @@
 import dagger
 import os
 from datetime import datetime
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from webdriver_manager.chrome import ChromeDriverManager
-import time
 
+from agents.browser_pool import BrowserSession
 from models.data_models import JobListing, UserDetails, FormAnalysis, ApplicationResult
+from utils.form_selectors import fallback_selector
+from utils.tracing import tracer
+
+# Sets every field in one call: arguments[0] is [[field_id, selector, value]],
+# arguments[1] the resume input selector. Values go through the native setter
+# and input/change events fire so framework-managed inputs see the change.
+FILL_FORM_SCRIPT = """
+const fields = arguments[0];
+const resumeSelector = arguments[1];
+const report = [];
+for (const [fieldId, selector, value] of fields) {
+    let element = null;
+    try {
+        element = document.querySelector(selector);
+    } catch (e) {
+        report.push([fieldId, false, "invalid selector"]);
+        continue;
+    }
+    if (!element) {
+        report.push([fieldId, false, "not found"]);
+        continue;
+    }
+    try {
+        if (element.tagName === "SELECT") {
+            const option = Array.from(element.options).find(
+                o => o.value === value || o.text.trim() === value);
+            if (!option) {
+                report.push([fieldId, false, "no matching option"]);
+                continue;
+            }
+            element.value = option.value;
+        } else {
+            const prototype = element.tagName === "TEXTAREA"
+                ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(prototype, "value").set.call(element, value);
+        }
+        element.dispatchEvent(new Event("input", {bubbles: true}));
+        element.dispatchEvent(new Event("change", {bubbles: true}));
+        report.push([fieldId, true, ""]);
+    } catch (e) {
+        report.push([fieldId, false, String(e)]);
+    }
+}
+let resume = null;
+if (resumeSelector) {
+    try { resume = document.querySelector(resumeSelector); } catch (e) {}
+}
+return {report: report, resume: resume};
+"""
+
+def _field_value(label: str, user_details: UserDetails):
+    """User detail that belongs in a field, by its label"""
+    label = label.lower()
+    if any(key in label for key in ["name", "full name"]):
+        return user_details.name
+    if "email" in label:
+        return user_details.email
+    if any(key in label for key in ["phone", "telephone", "mobile"]):
+        return user_details.phone
+    return None
 
 class FormFillerAgent(dagger.Agent):
     def __init__(self):
         super().__init__()
-        self.driver = None
         
         # Register capabilities
         self.register_capability(
@@ -23,101 +77,103 @@ class FormFillerAgent(dagger.Agent):
             self.fill_application
         )
         
-    def setup_browser(self):
-        """Setup browser for form filling"""
-        if self.driver is not None:
-            return
-            
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # For hackathon, you might want this visible
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
-        
     async def fill_application(self, 
                               job: JobListing, 
                               user_details: UserDetails, 
-                              form_analysis: FormAnalysis) -> ApplicationResult:
-        """Fill out a job application"""
-        self.setup_browser()
+                              form_analysis: FormAnalysis,
+                              session: BrowserSession = None) -> ApplicationResult:
+        """Fill out a job application
+        
+        Given the session the form was analyzed in, filling continues in
+        that tab without loading the page again.
+        """
+        browser_pool = await self.get_agent("browser_pool")
+        owned_session = session is None
+        session = session or browser_pool.session()
         
         try:
             self.log(f"Filling application for {job.title} at {job.url}")
-            self.driver.get(job.url)
-            time.sleep(3)  # Allow page to load
+            driver = await session.open(job.url, wait_for="form")
+            # Selenium blocks, so filling runs on the browser executor
+            return await browser_pool.run(
+                self._fill_application, driver, job, user_details, form_analysis
+            )
+        except Exception as e:
+            self.log(f"Error filling application {job.url}: {str(e)}")
+            return self._failed_result(job, e)
+        finally:
+            if owned_session:
+                await session.close()
             
-            # Fill form fields
+    def _fill_application(self, driver, job: JobListing,
+                          user_details: UserDetails, form_analysis: FormAnalysis) -> ApplicationResult:
+        with tracer.span("fill.application", url=job.url) as span:
+            result = self._fill_form(driver, job, user_details, form_analysis, span)
+            span.set(success=result.success)
+            return result
+            
+    def _fill_form(self, driver, job: JobListing, user_details: UserDetails,
+                   form_analysis: FormAnalysis, span) -> ApplicationResult:
+        try:
+            # Map form fields to user details
+            fields = []
             for field in form_analysis.form_fields:
-                value = None
-                field_id = field.field_id
-                
-                # Map form fields to user details
-                if any(key in field.label.lower() for key in ["name", "full name"]):
-                    value = user_details.name
-                elif "email" in field.label.lower():
-                    value = user_details.email
-                elif any(key in field.label.lower() for key in ["phone", "telephone", "mobile"]):
-                    value = user_details.phone
-                
+                value = _field_value(field.label, user_details)
                 if value:
-                    try:
-                        element = self.driver.find_element(By.ID, field_id)
-                        element.send_keys(value)
-                        self.log(f"Filled field: {field.label}")
-                    except:
-                        try:
-                            element = self.driver.find_element(By.NAME, field_id)
-                            element.send_keys(value)
-                            self.log(f"Filled field: {field.label}")
-                        except:
-                            self.log(f"Could not find element {field_id}")
+                    fields.append([field.field_id, field.selector or fallback_selector(field.field_id), value])
             
-            # Upload resume if possible
+            resume_selector = None
             if form_analysis.resume_upload_id and user_details.resume_path:
-                try:
-                    upload_element = self.driver.find_element(By.ID, form_analysis.resume_upload_id)
-                    upload_element.send_keys(os.path.abspath(user_details.resume_path))
-                    self.log("Uploaded resume")
-                except:
-                    self.log("Could not upload resume")
+                resume_selector = (form_analysis.resume_upload_selector
+                                   or fallback_selector(form_analysis.resume_upload_id))
+            
+            # One round trip sets every value and hands back the file input
+            outcome = driver.execute_script(FILL_FORM_SCRIPT, fields, resume_selector) or {}
+            field_report = [
+                {"field_id": field_id, "filled": filled, "error": error or None}
+                for field_id, filled, error in outcome.get("report", [])
+            ]
+            
+            # Browsers refuse scripted file selection, so the resume goes through send_keys
+            if resume_selector:
+                upload_element = outcome.get("resume")
+                error = None if upload_element is not None else "not found"
+                if upload_element is not None:
+                    try:
+                        upload_element.send_keys(os.path.abspath(user_details.resume_path))
+                        self.log("Uploaded resume")
+                    except Exception as e:
+                        error = str(e)
+                field_report.append({"field_id": form_analysis.resume_upload_id, "filled": error is None, "error": error})
             
-            # For hackathon demo, we'll consider this a successful application
-            # In a real implementation, you would click the submit button
-            # if form_analysis.submit_button_id:
-            #     try:
-            #         submit_button = self.driver.find_element(By.ID, form_analysis.submit_button_id)
-            #         submit_button.click()
-            #         time.sleep(2)  # Wait for submission
-            #         self.log("Submitted application")
-            #     except:
-            #         self.log("Could not click submit button")
+            filled = sum(1 for entry in field_report if entry["filled"])
+            span.set(fields_filled=filled, fields_missing=len(field_report) - filled)
+            for entry in field_report:
+                if not entry["filled"]:
+                    self.log(f"Could not fill {entry['field_id']}: {entry['error']}")
+            self.log(f"Filled {filled} of {len(field_report)} fields")
             
+            # Demo mode: a filled form counts as a successful application; it is never submitted
             # Create successful result
             result = ApplicationResult(
                 job=job,
                 success=True,
                 timestamp=datetime.now(),
-                notes="Application form filled (demo mode - not actually submitted)"
+                notes=f"Application form filled, {filled}/{len(field_report)} fields (demo mode - not actually submitted)",
+                field_report=field_report
             )
             
             return result
             
         except Exception as e:
             self.log(f"Error filling application {job.url}: {str(e)}")
+            return self._failed_result(job, e)
             
-            # Create failed result
-            result = ApplicationResult(
-                job=job,
-                success=False,
-                timestamp=datetime.now(),
-                notes=f"Failed: {str(e)}"
-            )
-            
-            return result
-            
-    async def shutdown(self):
-        """Clean up resources"""
-        if self.driver:
-            self.driver.quit()
\ No newline at end of file
+    def _failed_result(self, job: JobListing, error: Exception) -> ApplicationResult:
+        """Create failed result"""
+        return ApplicationResult(
+            job=job,
+            success=False,
+            timestamp=datetime.now(),
+            notes=f"Failed: {str(error)}"
+        )
\ No newline at end of file
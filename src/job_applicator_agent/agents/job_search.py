@@ -1,20 +1,64 @@
 # src/agents/job_search.py
+import asyncio
 import dagger
-from typing import List
-import requests
+from collections import OrderedDict
+from contextlib import aclosing
+from dataclasses import replace
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
-import time
 
 from models.data_models import JobCriteria, JobListing
+from utils.crawl_cache import HttpCache, ListingSnapshots
+from utils.http_fetch import PageFetcher
+from utils.job_sources import JobSource, default_sources
+from utils.near_duplicates import NearDuplicateIndex
+from utils.seen_store import SeenJobStore
+from utils.tracing import tracer
+from utils.url_tools import canonicalize_url, unwrap_search_redirect
+
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+
+# Results per search page; later pages are requested with &start=<offset>
+RESULTS_PER_PAGE = 10
+
+# Marks the end of a streamed search
+_SEARCH_DONE = object()
 
 class JobSearchAgent(dagger.Agent):
-    def __init__(self):
+    def __init__(self,
+                 fetcher: PageFetcher = None,
+                 seen_store: SeenJobStore = None,
+                 search_url: str = GOOGLE_SEARCH_URL,
+                 max_snapshots: int = 256,
+                 max_jobs_per_domain: int = 3,
+                 max_result_pages: int = 3,
+                 sources: List[JobSource] = None,
+                 listing_snapshots: ListingSnapshots = None,
+                 near_duplicates: NearDuplicateIndex = None):
         super().__init__()
-        self.driver = None
+        # Board feeds (Greenhouse, Lever) read before falling back to search scraping
+        self.sources = sources if sources is not None else default_sources()
+        # Listings taken from each domain, read from up to max_result_pages of results
+        self.max_jobs_per_domain = max_jobs_per_domain
+        self.max_result_pages = max_result_pages
+        # Search results page queried with ?q=...; a local stub board in benchmarks
+        self.search_url = search_url
+        # Feeds and job pages are fetched over pooled HTTP, revalidated against
+        # the HTTP cache, before falling back to a browser
+        self.fetcher = fetcher if fetcher is not None else PageFetcher(cache=HttpCache())
+        # Postings processed in earlier runs are skipped before any page load
+        self.seen_store = seen_store if seen_store is not None else SeenJobStore()
+        # Listings unchanged since they were last processed are not analyzed again. A
+        # snapshot is only stored once the listing is recorded (record_listings): one
+        # stored on hand-on would suppress a listing whose run never got to it
+        self.listing_snapshots = listing_snapshots if listing_snapshots is not None else ListingSnapshots()
+        self.handed_on: Dict[str, Tuple[JobListing, Optional[str]]] = {}
+        # Only one posting per cluster of near-duplicates (same role, other board or URL) is handed on
+        self.near_duplicates = near_duplicates if near_duplicates is not None else NearDuplicateIndex()
+        # Job pages fetched while enriching, reused by form analysis instead of a reload
+        self.max_snapshots = max_snapshots
+        self.snapshots: "OrderedDict[str, str]" = OrderedDict()
+        
         # Register capabilities
         self.register_capability(
             "find_jobs",
@@ -22,79 +66,320 @@ class JobSearchAgent(dagger.Agent):
             self.find_jobs
         )
         
-    def setup_browser(self):
-        """Setup headless browser for job search"""
-        if self.driver is not None:
-            return
-            
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
+        self.register_capability(
+            "stream_jobs",
+            "Search for jobs across domains, yielding each listing as soon as it is enriched",
+            self.stream_jobs
+        )
         
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=chrome_options)
+        self.register_capability(
+            "get_page_snapshot",
+            "Get the job page HTML captured during search, if any",
+            self.get_page_snapshot
+        )
+        
+        self.register_capability(
+            "mark_jobs_seen",
+            "Remember processed job URLs so later runs skip them",
+            self.mark_jobs_seen
+        )
+        
+        self.register_capability(
+            "record_listings",
+            "Store snapshots of handed-on listings once they are processed",
+            self.record_listings
+        )
+        
+        self.register_capability(
+            "forget_listings",
+            "Hand listings on again next run even if they have not changed",
+            self.forget_listings
+        )
         
     async def find_jobs(self, criteria: JobCriteria, domains: List[str]) -> List[JobListing]:
         """Find jobs matching criteria across the provided domains"""
-        self.setup_browser()
-        all_jobs = []
+        all_jobs = [job async for job in self.stream_jobs(criteria, domains)]
+        self.log(f"Found {len(all_jobs)} job listings")
+        return all_jobs
+        
+    async def stream_jobs(self, criteria: JobCriteria, domains: List[str]) -> AsyncIterator[JobListing]:
+        """Yield each job listing as soon as it is found and enriched
         
-        for domain in domains:
+        Domains are searched at the same time, each in its own browser, and
+        every listing is enriched on its own, so the first one is handed on
+        while the rest of the search is still running.
+        """
+        browser_pool = await self.get_agent("browser_pool")
+        listings: asyncio.Queue = asyncio.Queue()
+        found_urls = set()
+        
+        async def search_all():
             try:
-                self.log(f"Searching for jobs on {domain}")
-                # Simple job search via Google
-                search_query = f"site:{domain} {criteria.title} {criteria.location} {criteria.experience} apply"
-                url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
-                
-                self.driver.get(url)
-                time.sleep(2)  # Allow page to load
-                
-                # Extract job listing URLs
-                soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                search_results = soup.find_all("a")
+                await asyncio.gather(*(
+                    self._search_domain(browser_pool, criteria, domain, found_urls, listings)
+                    for domain in domains
+                ))
+            finally:
+                listings.put_nowait(_SEARCH_DONE)
                 
-                for result in search_results:
-                    href = result.get("href")
-                    if href and domain in href and "apply" in href.lower():
-                        if href not in [job.url for job in all_jobs]:
-                            job = JobListing(
-                                url=href,
-                                domain=domain,
-                                title=criteria.title  # Default title match
-                            )
-                            
-                            # Try to extract better title and description
-                            try:
-                                self.driver.get(href)
-                                time.sleep(2)
-                                job_page_soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                                
-                                # Find title (basic approach)
-                                h1_tags = job_page_soup.find_all("h1")
-                                if h1_tags:
-                                    job.title = h1_tags[0].get_text().strip()
-                                    
-                                # Extract a short description
-                                paragraphs = job_page_soup.find_all("p")
-                                if paragraphs:
-                                    job.description = paragraphs[0].get_text().strip()
-                            except:
-                                self.log(f"Could not extract detailed info for {href}")
-                                
-                            all_jobs.append(job)
-                            
-                            # Limit to 3 jobs per domain for the hackathon demo
-                            if len([j for j in all_jobs if j.domain == domain]) >= 3:
-                                break
-                                
+        producer = asyncio.ensure_future(search_all())
+        try:
+            while True:
+                job = await listings.get()
+                if job is _SEARCH_DONE:
+                    break
+                yield job
+            await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+            # Listings never delivered must not stay recorded as handed on, nor
+            # keep suppressing their near-duplicates
+            undelivered = []
+            while not listings.empty():
+                job = listings.get_nowait()
+                if job is not _SEARCH_DONE:
+                    undelivered.append(job.url)
+            if undelivered:
+                await self.forget_listings(undelivered)
+
+    async def _search_domain(self, browser_pool, criteria: JobCriteria, domain: str, found_urls: set,
+                             listings: asyncio.Queue):
+        """Queue one domain's listings, from its board feed if a source claims it"""
+        source, board = self._source_for(domain)
+        if source is not None:
+            jobs = await self._read_feed(source, board, criteria, domain, found_urls, listings)
+            if jobs is not None:
+                return
+        await self._scrape_search(browser_pool, criteria, domain, found_urls, listings)
+        
+    def _source_for(self, domain: str) -> Tuple[Optional[JobSource], Optional[str]]:
+        for source in self.sources:
+            board = source.board_for(domain)
+            if board:
+                return source, board
+        return None, None
+        
+    def _is_new(self, job_url: str, domain: str, found_urls: set) -> bool:
+        """False for duplicates within this search and jobs processed in earlier runs"""
+        key = canonicalize_url(job_url)
+        if key in found_urls:
+            return False
+        found_urls.add(key)
+        if job_url in self.seen_store:
+            self.log(f"Skipping previously processed job {job_url}")
+            tracer.count("jobs_skipped_seen", domain=domain)
+            return False
+        return True
+        
+    def _hand_on(self, job: JobListing, listings: asyncio.Queue, page_hash: Optional[str] = None) -> bool:
+        """Queue a listing unless it is unchanged since an earlier run or a near-duplicate"""
+        if not self.listing_snapshots.changed(job):
+            tracer.count("listings_unchanged", domain=job.domain)
+            self.snapshots.pop(job.url, None)
+            return False
+        cluster = self.near_duplicates.cluster_of(job)
+        if cluster is not None:
+            self.log(f"Skipping {job.url}, a near-duplicate of {cluster}")
+            tracer.count("listings_duplicate", domain=job.domain)
+            self.snapshots.pop(job.url, None)
+            return False
+        self.handed_on[canonicalize_url(job.url)] = (replace(job), page_hash)
+        listings.put_nowait(job)
+        return True
+        
+    async def _read_feed(self, source: JobSource, board: str, criteria: JobCriteria, domain: str,
+                         found_urls: set, listings: asyncio.Queue) -> Optional[int]:
+        """Queue listings from a board feed; None if the feed could not be read at all"""
+        jobs = 0
+        with tracer.span("search.feed", source=source.name, domain=domain) as span:
+            try:
+                # Feed entries already carry title and description, so no enrichment is needed
+                async with aclosing(source.listings(self.fetcher, criteria, domain, board)) as feed:
+                    async for job in feed:
+                        if not self._is_new(job.url, domain, found_urls) or not self._hand_on(job, listings):
+                            continue
+                        jobs += 1
+                        if jobs >= self.max_jobs_per_domain:
+                            break
             except Exception as e:
-                self.log(f"Error searching {domain}: {str(e)}")
+                # A missing board, an outage or an unexpected response shape
+                if not jobs:
+                    self.log(f"{str(e)}; searching {domain} instead")
+                    tracer.count("feed_fallbacks", source=source.name)
+                    return None
+                self.log(str(e))
+            span.set(jobs=jobs)
+        self.log(f"Found {jobs} job listings on {domain} in the {source.name} feed")
+        return jobs
+        
+    async def _scrape_search(self, browser_pool, criteria: JobCriteria, domain: str, found_urls: set,
+                             listings: asyncio.Queue):
+        """Page through one domain's search results, enriching listings as they turn up"""
+        self.log(f"Searching for jobs on {domain}")
+        limit = self.max_jobs_per_domain
+        pending = set()
+        jobs = pages = 0
+        
+        async def settle():
+            # Wait for an enrichment; listings that turn out unchanged free their slot
+            nonlocal pending, jobs
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            jobs += sum(1 for task in done if not task.cancelled() and not task.exception() and task.result())
+            
+        try:
+            with tracer.span("search.domain", domain=domain) as span:
+                for page in range(self.max_result_pages):
+                    # A browser is held only while a results page is read, never while
+                    # waiting on enrichments: their fallback leases a browser too, so
+                    # holding one here deadlocks once domains fill the whole pool
+                    async with browser_pool.lease() as driver:
+                        # Selenium blocks, so each results page is read on the browser executor
+                        urls = await browser_pool.run(self._search_results, browser_pool, driver, criteria, domain, page)
+                    pages += 1
+                    new_urls = [url for url in urls if canonicalize_url(url) not in found_urls]
+                    for job_url in new_urls:
+                        # Listings past the limit are left unclaimed for other domains' searches
+                        while pending and jobs + len(pending) >= limit:
+                            await settle()
+                        if jobs >= limit:
+                            break
+                        if not self._is_new(job_url, domain, found_urls):
+                            continue
+                            
+                        job = JobListing(
+                            url=job_url,
+                            domain=domain,
+                            title=criteria.title  # Default title match
+                        )
+                        pending.add(asyncio.ensure_future(self._enrich_job(browser_pool, job, listings)))
+                        
+                    # Another page is only needed if listings in flight may not fill the limit
+                    while pending and jobs + len(pending) >= limit:
+                        await settle()
+                    # A page with nothing new is the last page of results
+                    if jobs >= limit or not new_urls:
+                        break
+                span.set(pages=pages)
+        except Exception as e:
+            self.log(f"Error searching {domain}: {str(e)}")
+            
+        # Listings found before an error are still handed on
+        try:
+            while pending:
+                await settle()
+        finally:
+            for enrichment in pending:
+                enrichment.cancel()
+        self.log(f"Found {jobs} job listings on {domain}")
+        
+    def _search_results(self, browser_pool, driver, criteria: JobCriteria, domain: str, page: int) -> List[str]:
+        """Job links on one page of search results for a domain, one per posting"""
+        # Simple job search via Google
+        search_query = f"site:{domain} {criteria.title} {criteria.location} {criteria.experience} apply"
+        url = f"{self.search_url}?q={search_query.replace(' ', '+')}"
+        if page:
+            url += f"&start={page * RESULTS_PER_PAGE}"
+            
+        browser_pool.load_page(driver, url, wait_for="a")
+        
+        # Extract job listing URLs
+        soup = BeautifulSoup(driver.page_source, "html.parser")
+        urls, keys = [], set()
+        for result in soup.find_all("a"):
+            href = result.get("href")
+            if not href:
+                continue
+            href = unwrap_search_redirect(href).strip()
+            if domain in href and "apply" in href.lower():
+                # The link itself is kept for navigation; its canonical form only dedups
+                key = canonicalize_url(href)
+                if key not in keys:
+                    keys.add(key)
+                    urls.append(href)
+        return urls
+        
+    async def _enrich_job(self, browser_pool, job: JobListing, listings: asyncio.Queue) -> bool:
+        """Fill in title and description, HTTP first and browser only as a fallback
+        
+        Returns whether the listing was handed on, i.e. it is new or changed.
+        """
+        with tracer.span("search.enrich", domain=job.domain) as span:
+            page = await self.fetcher.fetch_page(job.url)
+            page_hash = page.content_hash if page is not None else None
+            # The same page as when the listing was last handed on needs no parsing
+            if page_hash and self.listing_snapshots.page_unchanged(job.url, page_hash):
+                span.set(unchanged=1)
+                tracer.count("listings_unchanged", domain=job.domain)
+                return False
                 
-        self.log(f"Found {len(all_jobs)} job listings")
-        return all_jobs
+            # Pages rendered client-side have no usable content in their static HTML
+            if not (page is not None and page.is_html and self._apply_details(job, page.text)):
+                tracer.count("enrich_browser_fallbacks")
+                page_hash = None
+                try:
+                    async with browser_pool.lease() as driver:
+                        await browser_pool.navigate(driver, job.url, wait_for="h1")
+                        html = await browser_pool.run(lambda: driver.page_source)
+                    self._apply_details(job, html)
+                except Exception:
+                    self.log(f"Could not extract detailed info for {job.url}")
+        return self._hand_on(job, listings, page_hash)
+        
+    def _apply_details(self, job: JobListing, html: str) -> bool:
+        """Copy title and description from a job page; False if the page has no title"""
+        job_page_soup = BeautifulSoup(html, "html.parser")
+        
+        # Find title (basic approach)
+        h1_tags = job_page_soup.find_all("h1")
+        if not h1_tags or not h1_tags[0].get_text().strip():
+            return False
+        job.title = h1_tags[0].get_text().strip()
+        self._keep_snapshot(job.url, html)
+        
+        # Extract a short description
+        paragraphs = job_page_soup.find_all("p")
+        if paragraphs:
+            job.description = paragraphs[0].get_text().strip()
+        return True
+        
+    def _keep_snapshot(self, url: str, html: str):
+        self.snapshots[url] = html
+        self.snapshots.move_to_end(url)
+        while len(self.snapshots) > self.max_snapshots:
+            self.snapshots.popitem(last=False)
+            
+    async def get_page_snapshot(self, url: str) -> Optional[str]:
+        """Hand over the page captured for a job during search; each snapshot is used once"""
+        return self.snapshots.pop(url, None)
+        
+    async def mark_jobs_seen(self, urls: List[str]):
+        """Remember processed job URLs so later runs skip them"""
+        for url in urls:
+            self.seen_store.add(url)
+        self.seen_store.flush()
+        
+    async def record_listings(self, urls: List[str]):
+        """Store snapshots of handed-on listings, so they are skipped until they change"""
+        for url in urls:
+            handed_on = self.handed_on.pop(canonicalize_url(url), None)
+            if handed_on is not None:
+                self.listing_snapshots.update(*handed_on)
+                
+    async def forget_listings(self, urls: List[str]):
+        """Hand listings on again next run even if they have not changed
+        
+        Near-duplicates skipped in favour of these listings become eligible too.
+        """
+        forgotten = self.near_duplicates.forget(urls)
+        for url in forgotten:
+            self.handed_on.pop(url, None)
+        self.listing_snapshots.forget(forgotten)
         
     async def shutdown(self):
         """Clean up resources"""
-        if self.driver:
-            self.driver.quit()
\ No newline at end of file
+        self.fetcher.close()
+        self.seen_store.close()
+        self.listing_snapshots.close()
+        self.near_duplicates.close()
@@ -1,18 +1,46 @@
 # src/agents/tracker.py
 import dagger
-from typing import List
+from typing import Dict, List, Optional
+import csv
 import os
-import pandas as pd
+import uuid
 from datetime import datetime
 
 from models.data_models import ApplicationResult
+from utils.application_store import ApplicationStore, days_ago
+from utils.journal import ApplicationJournal
+from utils.tracing import tracer
+
+REPORT_COLUMNS = ["url", "domain", "title", "success", "timestamp", "notes"]
 
 class TrackerAgent(dagger.Agent):
-    def __init__(self):
+    def __init__(self,
+                 output_dir: str = ".",
+                 journal_batch_size: int = 32,
+                 journal_fsync: bool = False,
+                 store: ApplicationStore = None):
         super().__init__()
-        self.applications = []
+        self.output_dir = output_dir
+        # Results recorded without a run id belong to this agent's own run;
+        # a long-lived service starts a run per job instead (start_run)
+        self.run_id = uuid.uuid4().hex
+        # Every result is appended to the journal, a plain-text log of the whole history
+        self.journal = ApplicationJournal(
+            os.path.join(output_dir, "applications_journal.jsonl"),
+            batch_size=journal_batch_size,
+            fsync=journal_fsync
+        )
+        # Indexed history across runs for filtered, paged queries and per-run reports,
+        # in the cache directory
+        self.store = store if store is not None else ApplicationStore()
         
         # Register capabilities
+        self.register_capability(
+            "start_run",
+            "Start a new run; results recorded under its id are reported together",
+            self.start_run
+        )
+        
         self.register_capability(
             "record_application",
             "Record job application result",
@@ -25,44 +53,93 @@ class TrackerAgent(dagger.Agent):
             self.get_all_applications
         )
         
-    async def record_application(self, result: ApplicationResult):
+        self.register_capability(
+            "query_applications",
+            "Page through recorded applications with filters",
+            self.query_applications
+        )
+        
+        self.register_capability(
+            "count_applications",
+            "Count recorded applications, overall and per domain",
+            self.count_applications
+        )
+        
+        self.register_capability(
+            "export_reports",
+            "Write CSV and text reports of a run's applications",
+            self.export_reports
+        )
+        
+    async def start_run(self) -> str:
+        """Id of a new run, to pass to record_application, get_all_applications and export_reports"""
+        return uuid.uuid4().hex
+        
+    async def record_application(self, result: ApplicationResult, run_id: Optional[str] = None):
         """Record a job application result"""
-        self.applications.append(result)
+        run_id = run_id or self.run_id
+        with tracer.span("tracker.record"):
+            record = result.to_record()
+            record["run_id"] = run_id
+            self.journal.append(record)
+            self.store.add(result, run_id=run_id)
         self.log(f"Recorded application for {result.job.title}: {'Success' if result.success else 'Failed'}")
         
-        # Save to file regularly
-        await self.save_applications()
+    async def get_all_applications(self, run_id: Optional[str] = None) -> List[ApplicationResult]:
+        """Get all applications recorded during this run"""
+        rows = self.store.query(limit=None, oldest_first=True, run_id=run_id or self.run_id)
+        return [result for _, result in rows]
         
-    async def get_all_applications(self) -> List[ApplicationResult]:
-        """Get all recorded applications"""
-        return self.applications
+    async def query_applications(self,
+                                 domain: Optional[str] = None,
+                                 success: Optional[bool] = None,
+                                 since_days: Optional[float] = None,
+                                 limit: int = 50,
+                                 before_id: Optional[int] = None) -> Dict:
+        """Page through recorded applications, newest first.
         
-    async def save_applications(self):
-        """Save applications to file"""
-        if not self.applications:
-            return
-            
-        # Convert to dict for DataFrame
-        apps_dict = []
-        for app in self.applications:
-            apps_dict.append({
-                "url": app.job.url,
-                "domain": app.job.domain,
-                "title": app.job.title,
-                "success": app.success,
-                "timestamp": app.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
-                "notes": app.notes
-            })
-            
-        # Save as CSV
-        df = pd.DataFrame(apps_dict)
+        e.g. failures on lever.co in the last 7 days:
+        query_applications(domain="lever.co", success=False, since_days=7)
+        """
+        since = days_ago(since_days) if since_days is not None else None
+        rows = self.store.query(limit=limit, cursor=before_id,
+                                domain=domain, success=success, since=since)
+        return {
+            "applications": [result for _, result in rows],
+            # Pass as before_id to fetch the next page
+            "next_before_id": rows[-1][0] if len(rows) == limit else None
+        }
+        
+    async def count_applications(self,
+                                 domain: Optional[str] = None,
+                                 success: Optional[bool] = None,
+                                 since_days: Optional[float] = None) -> Dict:
+        """Count recorded applications, overall and per domain"""
+        since = days_ago(since_days) if since_days is not None else None
+        return {
+            "total": self.store.count(domain=domain, success=success, since=since),
+            "by_domain": self.store.summary(domain=domain, success=success, since=since)
+        }
+        
+    async def export_reports(self, run_id: Optional[str] = None) -> str:
+        """Write CSV and text reports of one run and return the CSV path
+
+        The run's records are read through the store's run index, so the
+        cost follows the size of the run, not of the whole history.
+        """
+        run_id = run_id or self.run_id
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"successful_applications_{timestamp}.csv"
-        df.to_csv(filename, index=False)
+        # Runs of a long-lived service can finish within the same second
+        filename = os.path.join(self.output_dir, f"successful_applications_{timestamp}_{run_id[:8]}.csv")
         
-        # Also save as text file
-        with open(filename.replace('.csv', '.txt'), 'w') as f:
-            for app in apps_dict:
+        count = 0
+        with tracer.span("tracker.export_reports") as span, \
+                open(filename, "w", newline="") as csv_file, open(filename.replace('.csv', '.txt'), 'w') as f:
+            writer = csv.DictWriter(csv_file, fieldnames=REPORT_COLUMNS, extrasaction="ignore")
+            writer.writeheader()
+            for _, result in self.store.query(limit=None, oldest_first=True, run_id=run_id):
+                app = result.to_record()
+                writer.writerow(app)
                 f.write(f"Title: {app['title']}\n")
                 f.write(f"URL: {app['url']}\n")
                 f.write(f"Domain: {app['domain']}\n")
@@ -70,5 +147,13 @@ class TrackerAgent(dagger.Agent):
                 f.write(f"Timestamp: {app['timestamp']}\n")
                 f.write(f"Notes: {app['notes']}\n")
                 f.write("-" * 50 + "\n")
+                count += 1
+            span.set(rows=count)
                 
-        self.log(f"Saved {len(self.applications)} application records to {filename}")
\ No newline at end of file
+        self.log(f"Saved {count} application records to {filename}")
+        return filename
+        
+    async def shutdown(self):
+        """Clean up resources"""
+        self.journal.close()
+        self.store.close()
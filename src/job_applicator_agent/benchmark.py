@@ -0,0 +1,276 @@
+# src/job_applicator_agent/benchmark.py
+import argparse
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import time
+from typing import Dict, Optional
+
+import dagger
+
+from models.data_models import UserDetails, JobCriteria
+from agents.browser_pool import BrowserPoolAgent
+from agents.coordinator import CoordinatorAgent
+from agents.job_search import JobSearchAgent
+from agents.form_analyzer import FormAnalyzerAgent
+from agents.form_filler import FormFillerAgent
+from agents.tracker import TrackerAgent
+from utils.application_store import ApplicationStore
+from utils.benchmark_report import DEFAULT_BASELINE, compare_to_baseline, summarize
+from utils.board_stub import ATS_STYLES, RESULTS_PER_PAGE, StubJobBoardServer
+from utils.checkpoints import CheckpointStore
+from utils.crawl_cache import HttpCache, ListingSnapshots
+from utils.form_cache import FormAnalysisCache
+from utils.http_fetch import PageFetcher
+from utils.job_sources import GreenhouseSource, LeverSource
+from utils.llm_gateway import LLMGateway, RestTransport
+from utils.llm_stub import StubLLMServer
+from utils.near_duplicates import NearDuplicateIndex
+from utils.seen_store import SeenJobStore
+from utils.tracing import tracer
+
+# Spans reported per stage; every other span is listed as well
+STAGE_SPANS = ["coordinator.search", "coordinator.analyze", "coordinator.fill", "coordinator.track"]
+
+# Domain entries read through board feeds when benchmarking with feeds
+FEED_DOMAINS = {"greenhouse": "greenhouse.io/company{}", "lever": "lever.co/company{}"}
+
+class BenchmarkStalled(RuntimeError):
+    """The pipeline did not finish within the benchmark timeout"""
+
+
+_CONTROL_LINE = re.compile(r"^(\S+) \| id=([^|\n]*) \| name=([^|\n]*) \| label=([^|\n]*)(\| required)?", re.MULTILINE)
+
+
+def _analysis_for(task: str) -> Dict:
+    """Form analysis derived from the controls listed in one prompt"""
+    form_fields, resume_upload_id, submit_button_id = [], None, None
+    for control_type, control_id, name, label, required in _CONTROL_LINE.findall(task):
+        identifier = control_id.strip() or name.strip()
+        if not identifier:
+            continue
+        if control_type == "file":
+            resume_upload_id = resume_upload_id or identifier
+        elif control_type.startswith("button"):
+            submit_button_id = submit_button_id or identifier
+        else:
+            form_fields.append({
+                "field_id": identifier,
+                "field_type": control_type,
+                "label": label.strip(),
+                "required": bool(required),
+            })
+    return {"form_fields": form_fields, "resume_upload_id": resume_upload_id, "submit_button_id": submit_button_id}
+
+
+def answer_form_prompt(prompt: str) -> str:
+    """Stub Gemini answer for form analysis prompts, batched or not"""
+    tasks = re.split(r"^### Task \d+$", prompt, flags=re.MULTILINE)
+    if len(tasks) > 1:
+        return json.dumps([_analysis_for(task) for task in tasks[1:]])
+    return json.dumps(_analysis_for(prompt))
+
+
+async def run_benchmark(boards_per_ats: int = 1,
+                        jobs_per_domain: int = 10,
+                        templates: int = 3,
+                        board_latency: float = 0.0,
+                        llm_latency: float = 0.0,
+                        browsers: int = 3,
+                        feeds: bool = False,
+                        client_rendered: int = 0,
+                        ats_hosts: bool = False,
+                        timeout: Optional[float] = None,
+                        workdir: Optional[str] = None) -> Dict:
+    """Run the full agent pipeline against local stub servers and time it
+
+    Every run starts with empty caches, checkpoints, listing snapshots
+    and seen-job history in workdir, so runs are comparable. With feeds,
+    Greenhouse and Lever boards are listed through their JSON feeds
+    instead of search results.
+
+    With client_rendered, every Nth posting needs a browser to read, so
+    searches and enrichments compete for browsers; scraping at least as
+    many domains as there are browsers checks that they cannot deadlock.
+    A run still going after timeout seconds raises BenchmarkStalled.
+
+    With ats_hosts, postings are analyzed as pages on their real ATS
+    hosts, so the rule-based ATS extractors parse the forms that Gemini
+    (the stub LLM) is asked about otherwise.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="job_applicator_bench_")
+    domains = [
+        FEED_DOMAINS[style].format(index) if feeds and style in FEED_DOMAINS else f"company{index}.{style}.test"
+        for style in ATS_STYLES
+        for index in range(boards_per_ats)
+    ]
+    user_details = UserDetails(
+        name="Bench Mark",
+        email="bench@example.com",
+        phone="555-000-0000",
+        resume_path=os.path.join(workdir, "resume.pdf"),
+    )
+    with open(user_details.resume_path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+    job_criteria = JobCriteria(title="Software Engineer", location="Remote", experience=3)
+
+    # Stage timings come from the tracer; its trace.json is left in workdir
+    tracer.enabled = True
+    tracer.directory = os.path.join(workdir, "trace")
+    tracer.reset()
+
+    with StubJobBoardServer(jobs_per_domain, templates, board_latency, client_rendered=client_rendered) as board, \
+            StubLLMServer(answer_form_prompt, latency=llm_latency) as llm:
+        if ats_hosts:
+            board.serve_as_ats(domains)
+        runtime = dagger.Runtime()
+        runtime.register_agent("browser_pool", BrowserPoolAgent(size=browsers))
+        runtime.register_agent("coordinator", CoordinatorAgent(
+            checkpoints=CheckpointStore(os.path.join(workdir, "checkpoints.db"))
+        ))
+        runtime.register_agent("job_search", JobSearchAgent(
+            fetcher=PageFetcher(cache=HttpCache(os.path.join(workdir, "http_cache.db"))),
+            seen_store=SeenJobStore(os.path.join(workdir, "seen_jobs.log")),
+            listing_snapshots=ListingSnapshots(os.path.join(workdir, "listing_snapshots.db")),
+            near_duplicates=NearDuplicateIndex(os.path.join(workdir, "near_duplicates.db")),
+            search_url=board.search_url,
+            # Every posting on every board, paging through all of the results
+            max_jobs_per_domain=jobs_per_domain,
+            max_result_pages=math.ceil(jobs_per_domain / RESULTS_PER_PAGE),
+            sources=[GreenhouseSource(board.greenhouse_api_url), LeverSource(board.lever_api_url)] if feeds else []
+        ))
+        runtime.register_agent("form_analyzer", FormAnalyzerAgent(
+            cache=FormAnalysisCache(os.path.join(workdir, "form_cache.db")),
+            # The stub is not rate limited; only the in-flight cap applies
+            gateway=LLMGateway(RestTransport(base_url=llm.url), rate_per_second=1000, burst=1000)
+        ))
+        runtime.register_agent("form_filler", FormFillerAgent())
+        runtime.register_agent("tracker", TrackerAgent(
+            output_dir=workdir,
+            store=ApplicationStore(os.path.join(workdir, "applications.db"))
+        ))
+
+        await runtime.start()
+        try:
+            coordinator = await runtime.get_agent("coordinator")
+            started = time.perf_counter()
+            try:
+                results = await asyncio.wait_for(
+                    coordinator.coordinate_job_applications(user_details, job_criteria, domains), timeout
+                )
+            except asyncio.TimeoutError:
+                raise BenchmarkStalled(
+                    f"Not finished after {timeout}s with {len(domains)} domains and {browsers} browsers"
+                ) from None
+            elapsed = time.perf_counter() - started
+        finally:
+            await runtime.shutdown()
+
+        board_requests, llm_requests = board.requests, llm.requests
+
+    durations = tracer.span_durations()
+    stages = {name: summarize(durations.get(name, [])) for name in STAGE_SPANS}
+    spans = {name: summarize(values) for name, values in sorted(durations.items()) if name not in stages}
+    tracer.enabled = False
+
+    return {
+        "config": {
+            "domains": len(domains),
+            "jobs_per_domain": jobs_per_domain,
+            "templates": templates,
+            "board_latency": board_latency,
+            "llm_latency": llm_latency,
+            "browsers": browsers,
+            "feeds": feeds,
+            "client_rendered": client_rendered,
+            "ats_hosts": ats_hosts,
+        },
+        "jobs": len(results),
+        "successful": sum(1 for result in results if result.success),
+        "seconds": round(elapsed, 3),
+        "jobs_per_minute": round(len(results) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "board_requests": board_requests,
+        "workdir": workdir,
+        "llm_requests": llm_requests,
+        "stages": stages,
+        "spans": spans,
+    }
+
+
+def print_report(report: Dict):
+    print(f"{report['jobs']} jobs ({report['successful']} successful) in {report['seconds']}s: "
+          f"{report['jobs_per_minute']} jobs/min")
+    print(f"{'stage':<28}{'count':>7}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, summary in list(report["stages"].items()) + list(report["spans"].items()):
+        print(f"{name:<28}{summary['count']:>7}{summary['p50']:>10.4f}{summary['p95']:>10.4f}{summary['p99']:>10.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the job application pipeline offline")
+    parser.add_argument("--boards-per-ats", type=int, default=1,
+                        help="Synthetic Greenhouse, Lever and Workday boards of each kind")
+    parser.add_argument("--jobs-per-domain", type=int, default=10)
+    parser.add_argument("--templates", type=int, default=3, help="Distinct form variants per board")
+    parser.add_argument("--board-latency", type=float, default=0.05, help="Seconds per job board response")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds per stub Gemini response")
+    parser.add_argument("--browsers", type=int, default=3)
+    parser.add_argument("--feeds", action="store_true",
+                        help="List Greenhouse and Lever boards through their JSON feeds instead of search")
+    parser.add_argument("--client-rendered", type=int, default=0,
+                        help="Every Nth posting is rendered client-side and read through a browser (0: none)")
+    parser.add_argument("--timeout", type=float, default=600.0,
+                        help="Fail the run if the pipeline has not finished after this many seconds")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--ats-hosts", action="store_true",
+                        help="Analyze postings as pages on their ATS hosts, so the rule-based extractors parse them")
+    parser.add_argument("--baseline", nargs="?", const=DEFAULT_BASELINE,
+                        help="Compare against this stored report (default: benchmark_baseline.json); "
+                             "exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative slowdown (default: 0.2)")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(run_benchmark(
+            boards_per_ats=args.boards_per_ats,
+            jobs_per_domain=args.jobs_per_domain,
+            templates=args.templates,
+            board_latency=args.board_latency,
+            llm_latency=args.llm_latency,
+            browsers=args.browsers,
+            feeds=args.feeds,
+            client_rendered=args.client_rendered,
+            ats_hosts=args.ats_hosts,
+            timeout=args.timeout,
+        ))
+    except BenchmarkStalled as e:
+        print(f"Benchmark stalled: {e}")
+        sys.exit(1)
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Stored baseline in {args.baseline}")
+    elif args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
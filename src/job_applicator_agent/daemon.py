@@ -0,0 +1,262 @@
+# src/job_applicator_agent/daemon.py
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import dagger
+
+from models.data_models import UserDetails, JobCriteria, ApplicationResult
+from runtime import build_runtime
+from utils.tracing import tracer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+class ApplicationService:
+    """Keeps one agent runtime warm and works through a queue of application jobs
+
+    Browsers, the form analysis cache and the LLM gateway are set up once
+    when the service starts and reused by every job. Jobs are submitted
+    from any thread; results are kept in memory as they complete so
+    clients can poll for them incrementally.
+    """
+
+    def __init__(self, concurrency: int = 1, max_finished_jobs: int = 100, settings: Optional[Dict] = None):
+        self.concurrency = concurrency
+        # Runtime options in the shape of a CLI config file, e.g. output_dir
+        self.settings = settings or {}
+        self.max_finished_jobs = max_finished_jobs
+        self.runtime: Optional[dagger.Runtime] = None
+        self.started_at = time.time()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    async def start(self):
+        """Start the runtime and the job workers"""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self.runtime = build_runtime(self.settings)
+        await self.runtime.start()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        """Cancel the workers and shut the runtime down"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        if self.runtime is not None:
+            await self.runtime.shutdown()
+
+    def submit(self, request: Dict) -> str:
+        """Queue a job from any thread and return its id
+
+        The request has the same shape as the CLI config file:
+        user_details, job_criteria and domains, optionally top_k and
+        min_score to override the service's ranking settings.
+        """
+        user_details = UserDetails(**request["user_details"])
+        job_criteria = JobCriteria(**request["job_criteria"])
+        domains = list(request["domains"])
+        if not domains:
+            raise ValueError("At least one domain is required")
+        ranking = {key: request[key] for key in ("top_k", "min_score") if request.get(key) is not None}
+
+        job_id = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "domains": domains,
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "error": None,
+                "results": [],
+            }
+        self._loop.call_soon_threadsafe(self._queue.put_nowait,
+                                       (job_id, user_details, job_criteria, domains, ranking))
+        return job_id
+
+    def get_job(self, job_id: str, since: int = 0) -> Optional[Dict]:
+        """Job status with the results recorded after the first `since` ones"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job, results=job["results"][since:])
+            snapshot["next"] = len(job["results"])
+        return snapshot
+
+    def health(self) -> Dict:
+        with self._lock:
+            statuses = [job["status"] for job in self._jobs.values()]
+        return {
+            "status": "ok",
+            "uptime": round(time.time() - self.started_at, 1),
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+        }
+
+    async def stats(self) -> Dict:
+        """Warm-state counters from the long-lived agents"""
+        browser_pool = await self.runtime.get_agent("browser_pool")
+        form_analyzer = await self.runtime.get_agent("form_analyzer")
+        return {
+            "browser_pool": await browser_pool.get_pool_stats(),
+            "form_cache": await form_analyzer.get_cache_stats(),
+            "llm": await form_analyzer.get_llm_stats(),
+        }
+
+    def run_coroutine(self, coroutine, timeout: float = 10):
+        """Run a coroutine on the service loop from a server thread"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            self._jobs[job_id].update(changes)
+
+    def _prune(self):
+        # Forget the oldest finished jobs once too many are kept
+        with self._lock:
+            finished = [job for job in self._jobs.values() if job["finished_at"] is not None]
+            finished.sort(key=lambda job: job["finished_at"])
+            for job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+                del self._jobs[job["id"]]
+
+    async def _worker(self):
+        coordinator = await self.runtime.get_agent("coordinator")
+        while True:
+            job_id, user_details, job_criteria, domains, ranking = await self._queue.get()
+            self._update(job_id, status="running", started_at=time.time())
+
+            def on_result(application_result: ApplicationResult):
+                with self._lock:
+                    self._jobs[job_id]["results"].append(application_result.to_record())
+
+            try:
+                await coordinator.coordinate_job_applications(
+                    user_details, job_criteria, domains, on_result=on_result, **ranking
+                )
+                self._update(job_id, status="done", finished_at=time.time())
+            except Exception as e:
+                self._update(job_id, status="failed", error=str(e), finished_at=time.time())
+            finally:
+                self._queue.task_done()
+                self._prune()
+
+def make_handler(service: ApplicationService):
+    """HTTP handler exposing the service as a small JSON API
+
+    POST /jobs          submit a job, returns {"job_id"}
+    GET  /jobs/<id>     status and results; ?since=N skips results already seen
+    GET  /health        liveness and queue depth
+    GET  /stats         browser pool, form cache and LLM counters
+    GET  /metrics       Prometheus text metrics (when tracing is enabled)
+    GET  /trace         Chrome trace JSON of the spans recorded so far
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Dict):
+            body = json.dumps(payload, default=str).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            parts = [part for part in url.path.split("/") if part]
+
+            if parts == ["health"]:
+                self._send(200, service.health())
+            elif parts == ["stats"]:
+                self._send(200, service.run_coroutine(service.stats()))
+            elif parts == ["metrics"]:
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            elif parts == ["trace"]:
+                self._send(200, tracer.chrome_trace())
+            elif len(parts) == 2 and parts[0] == "jobs":
+                since = int(parse_qs(url.query).get("since", ["0"])[0])
+                job = service.get_job(parts[1], since)
+                if job is None:
+                    self._send(404, {"error": f"Unknown job {parts[1]}"})
+                else:
+                    self._send(200, job)
+            else:
+                self._send(404, {"error": f"Unknown path {url.path}"})
+
+        def do_POST(self):
+            if urlparse(self.path).path.rstrip("/") != "/jobs":
+                self._send(404, {"error": f"Unknown path {self.path}"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                job_id = service.submit(request)
+            except (KeyError, TypeError, ValueError) as e:
+                self._send(400, {"error": f"Invalid job request: {e}"})
+                return
+            self._send(202, {"job_id": job_id})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+async def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, concurrency: int = 1,
+                settings: Optional[Dict] = None):
+    """Run the service until cancelled (Ctrl+C)"""
+    service = ApplicationService(concurrency=concurrency, settings=settings)
+    await service.start()
+
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"Job Application service listening on http://{host}:{server.server_address[1]}")
+
+    try:
+        await asyncio.Event().wait()
+    finally:
+        server.shutdown()
+        server.server_close()
+        await service.stop()
+
+def main():
+    parser = argparse.ArgumentParser(description="Job Application Agent service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Jobs processed at the same time (default: 1)")
+    parser.add_argument("--config", default=None,
+                        help="JSON configuration file with the runtime options of the CLI config, e.g. output_dir")
+    args = parser.parse_args()
+
+    settings = {}
+    if args.config:
+        with open(args.config, "r") as f:
+            settings = json.load(f)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.concurrency, settings))
+    except KeyboardInterrupt:
+        print("Job Application service stopped")
+
+if __name__ == "__main__":
+    main()
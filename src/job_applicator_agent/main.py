@@ -2,6 +2,9 @@
 import os
 import sys
 import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 
 def main():
     """
@@ -14,9 +17,24 @@ def main():
     print("Job Application Agent starting...")
     
     # Parse input arguments
-    if len(sys.argv) > 1:
+    parser = argparse.ArgumentParser(description="Job Application Agent")
+    parser.add_argument("config_file", nargs="?", help="JSON configuration file")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Worker processes; domains are sharded across them (default: 1)")
+    parser.add_argument("--max-jobs-per-domain", type=int, default=None,
+                        help="Listings taken from each domain (default: 3)")
+    parser.add_argument("--max-result-pages", type=int, default=None,
+                        help="Search result pages read per domain (default: 3)")
+    parser.add_argument("--demo", action="store_true",
+                        help="Simulate the agents instead of running the application pipeline")
+    parser.add_argument("--daemon", default=None,
+                        help="Send the job to a running service at this URL "
+                             "(default: $JOB_APPLICATOR_DAEMON_URL)")
+    args = parser.parse_args()
+    
+    if args.config_file:
         # Load configuration from file if specified
-        config_file = sys.argv[1]
+        config_file = args.config_file
         try:
             with open(config_file, 'r') as f:
                 config = json.load(f)
@@ -31,49 +49,47 @@ def main():
                 "name": "John Doe",
                 "email": "john.doe@example.com",
                 "phone": "555-123-4567",
-                "resume_path": "/app/data/resume.pdf"
+                "resume_path": "/app/data/resume.pdf",
+                "skills": ["Python", "SQL"]
             },
             "job_criteria": {
                 "title": "Software Engineer",
                 "location": "San Francisco",
-                "experience": 1
+                "experience": 1,
+                "keywords": ["backend"]
             },
             "domains": [
                 "greenhouse.io",
                 "lever.co"
             ],
-            "output_dir": "/app/output"
+            "output_dir": "/app/output",
+            # Only the top_k listings most relevant to the keywords and skills are applied to
+            "top_k": 20
         }
     
     # Create output directory if it doesn't exist
     os.makedirs(config.get("output_dir", "/app/output"), exist_ok=True)
     
+    workers = args.workers or config.get("workers", 1)
+    if args.demo:
+        config["demo"] = True
+    if args.max_jobs_per_domain is not None:
+        config["max_jobs_per_domain"] = args.max_jobs_per_domain
+    if args.max_result_pages is not None:
+        config["max_result_pages"] = args.max_result_pages
+    
     # Execute the job application pipeline
     try:
-        # 1. Execute job search agent
-        print("Starting job search...")
-        job_results = run_job_search(config)
-        
-        if not job_results:
-            print("No job listings found. Exiting.")
-            sys.exit(0)
-            
-        # 2. Process each job listing
-        successful_applications = []
-        for job in job_results:
-            # Analyze form
-            form_analysis = run_form_analysis(job, config)
-            
-            if not form_analysis:
-                print(f"Could not analyze form for {job['url']}")
-                continue
-                
-            # Fill application
-            application_result = run_form_filler(job, form_analysis, config)
+        daemon = args.daemon or os.environ.get("JOB_APPLICATOR_DAEMON_URL")
+        if daemon:
+            print(f"Submitting job to the service at {daemon}...")
+            successful_applications = run_on_daemon(daemon, config)
+        elif workers > 1:
+            print(f"Sharding {len(config['domains'])} domains across {workers} worker processes...")
+            successful_applications = run_sharded(config, workers)
+        else:
+            successful_applications = process_shard(config["domains"], config)
             
-            if application_result.get("success", False):
-                successful_applications.append(application_result)
-                
         # 3. Track results
         track_applications(successful_applications, config)
         
@@ -83,14 +99,171 @@ def main():
         print(f"Error executing job application pipeline: {str(e)}")
         sys.exit(1)
         
+def process_shard(domains, config):
+    """Run search, analysis and filling for one shard of domains.
+    
+    Runs inside a worker process in sharded mode, so each shard gets its
+    own runtime and browsers and returns plain dicts that can be pickled
+    back. With "demo" set in config the agents are only simulated.
+    """
+    shard_config = dict(config, domains=list(domains))
+    if not config.get("demo"):
+        return run_pipeline(shard_config)
+    
+    # 1. Execute job search agent
+    print(f"Starting job search on {', '.join(domains)}...")
+    job_results = run_job_search(shard_config)
+    
+    if not job_results:
+        print(f"No job listings found on {', '.join(domains)}.")
+        return []
+        
+    # 2. Process each job listing
+    successful_applications = []
+    for job in job_results:
+        # Analyze form
+        form_analysis = run_form_analysis(job, shard_config)
+        
+        if not form_analysis:
+            print(f"Could not analyze form for {job['url']}")
+            continue
+            
+        # Fill application
+        application_result = run_form_filler(job, form_analysis, shard_config)
+        
+        if application_result.get("success", False):
+            successful_applications.append(application_result)
+            
+    return successful_applications
+    
+def run_pipeline(config):
+    """Run the agent pipeline on config's domains; returns the successful applications"""
+    import asyncio
+    from runtime import build_runtime
+    from models.data_models import UserDetails, JobCriteria
+    
+    async def run():
+        runtime = build_runtime(config)
+        await runtime.start()
+        try:
+            coordinator = await runtime.get_agent("coordinator")
+            return await coordinator.coordinate_job_applications(
+                UserDetails(**config["user_details"]),
+                JobCriteria(**config["job_criteria"]),
+                config["domains"]
+            )
+        finally:
+            await runtime.shutdown()
+            
+    return [application_record(result) for result in asyncio.run(run()) if result.success]
+    
+def application_record(result):
+    """Plain dict for an ApplicationResult, as written by track_applications"""
+    from dataclasses import asdict
+    
+    return {
+        "job": asdict(result.job),
+        "success": result.success,
+        "timestamp": result.timestamp.isoformat(),
+        "notes": result.notes
+    }
+    
+def run_shard_round(domains, config, workers, isolated=False):
+    """Run one shard per domain on worker processes.
+    
+    Returns the applications, the shards whose run raised (with the
+    error) and the shards lost to a broken pool. A crashing worker breaks
+    its whole pool, so in a shared pool any of the lost shards may be the
+    cause; isolated, every shard gets a pool of its own and a lost shard
+    is the one that crashed.
+    """
+    applications, errors, crashed = [], {}, []
+    pools = [ProcessPoolExecutor(max_workers=1) for _ in domains] if isolated else \
+        [ProcessPoolExecutor(max_workers=min(workers, len(domains)))]
+    try:
+        futures = {
+            pools[index % len(pools)].submit(process_shard, [domain], config): domain
+            for index, domain in enumerate(domains)
+        }
+        for future in as_completed(futures):
+            domain = futures[future]
+            try:
+                applications.extend(future.result())
+            except BrokenProcessPool:
+                crashed.append(domain)
+            except Exception as e:
+                errors[domain] = e
+    finally:
+        for pool in pools:
+            pool.shutdown()
+    return applications, errors, crashed
+    
+def run_sharded(config, workers, max_attempts=2):
+    """Process each domain in its own worker process.
+    
+    A shard that fails is re-queued, up to max_attempts times. A crashed
+    worker takes its pool and every shard running on it down, so those
+    shards are not charged an attempt; they are re-run isolated, workers
+    at a time, where a crash is charged to the shard that caused it.
+    Results are merged in (domain, url) order so output does not depend
+    on which worker finished first.
+    """
+    pending = list(config["domains"])
+    suspects = []
+    attempts = {domain: 0 for domain in pending}
+    applications = []
+    
+    def charge(domain, reason):
+        attempts[domain] += 1
+        if attempts[domain] < max_attempts:
+            print(f"Worker for {domain} failed ({reason}); re-queueing")
+            return True
+        print(f"Giving up on {domain} after {attempts[domain]} attempts")
+        return False
+        
+    while pending or suspects:
+        isolated = bool(suspects)
+        if isolated:
+            batch, suspects = suspects[:workers], suspects[workers:]
+        else:
+            batch, pending = pending, []
+        results, errors, crashed = run_shard_round(batch, config, workers, isolated)
+        applications.extend(results)
+        
+        for domain, error in errors.items():
+            if charge(domain, f"{type(error).__name__}: {error}"):
+                pending.append(domain)
+        for domain in crashed:
+            if not isolated:
+                print(f"Worker pool broke while running {domain}; re-running it on its own")
+                suspects.append(domain)
+            elif charge(domain, "worker process crashed"):
+                suspects.append(domain)
+                
+    applications.sort(key=lambda app: (app["job"]["domain"], app["job"]["url"]))
+    return applications
+    
+def run_on_daemon(url, config):
+    """Run the job on a warm job application service and wait for it"""
+    from utils.service_client import ServiceClient
+    
+    client = ServiceClient(url)
+    try:
+        results = client.run(config["user_details"], config["job_criteria"], config["domains"],
+                             config.get("top_k"), config.get("min_score"))
+    finally:
+        client.close()
+        
+    return [application_record(result) for result in results if result.success]
+    
 # Helper functions to simulate the agent processes
 def run_job_search(config):
     """Simulates the job search agent process"""
     print("Job Search Agent: Finding job listings...")
     
     # In a real implementation, this would search for jobs
-    # For demo purposes, return some mock results
-    return [
+    # For demo purposes, return some mock results for the configured domains
+    mock_results = [
         {
             "url": "https://boards.greenhouse.io/example/jobs/4567890",
             "domain": "greenhouse.io",
@@ -102,6 +275,7 @@ def run_job_search(config):
             "title": config["job_criteria"]["title"]
         }
     ]
+    return [job for job in mock_results if job["domain"] in config["domains"]]
     
 def run_form_analysis(job, config):
     """Simulates the form analysis agent process"""
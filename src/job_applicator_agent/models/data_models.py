@@ -1,5 +1,5 @@
 # src/models/data_models.py
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from typing import List, Dict, Optional
 from datetime import datetime
 
@@ -32,16 +32,63 @@ class FormField:
     field_type: str
     label: str
     required: bool = False
+    selector: Optional[str] = None  # CSS selector resolved against the analyzed page
     
 @dataclass
 class FormAnalysis:
     form_fields: List[FormField]
     resume_upload_id: Optional[str] = None
     submit_button_id: Optional[str] = None
+    resume_upload_selector: Optional[str] = None
+    submit_button_selector: Optional[str] = None
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> "FormAnalysis":
+        form_fields = []
+        for field in data.get("form_fields", []):
+            form_fields.append(FormField(
+                field_id=field["field_id"],
+                field_type=field["field_type"],
+                label=field["label"],
+                required=field.get("required", False),
+                selector=field.get("selector")
+            ))
+        return cls(
+            form_fields=form_fields,
+            resume_upload_id=data.get("resume_upload_id"),
+            submit_button_id=data.get("submit_button_id"),
+            resume_upload_selector=data.get("resume_upload_selector"),
+            submit_button_selector=data.get("submit_button_selector")
+        )
     
 @dataclass
 class ApplicationResult:
     job: JobListing
     success: bool
     timestamp: datetime
-    notes: str = ""
\ No newline at end of file
+    notes: str = ""
+    # Per-field outcome of filling: [{"field_id", "filled", "error"}]
+    field_report: Optional[List[Dict]] = None
+    
+    def to_record(self) -> Dict:
+        """Flat record used by the tracker's journal and reports"""
+        return {
+            "url": self.job.url,
+            "domain": self.job.domain,
+            "title": self.job.title,
+            "success": self.success,
+            "timestamp": self.timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            "notes": self.notes
+        }
+    
+    @classmethod
+    def from_record(cls, record: Dict) -> "ApplicationResult":
+        return cls(
+            job=JobListing(url=record["url"], domain=record["domain"], title=record["title"]),
+            success=bool(record["success"]),
+            timestamp=datetime.strptime(record["timestamp"], "%Y-%m-%d %H:%M:%S"),
+            notes=record.get("notes") or ""
+        )
\ No newline at end of file
@@ -0,0 +1,33 @@
+# src/job_applicator_agent/runtime.py
+from typing import Dict, Optional
+
+import dagger
+
+from agents.browser_pool import BrowserPoolAgent
+from agents.coordinator import CoordinatorAgent
+from agents.job_search import JobSearchAgent
+from agents.form_analyzer import FormAnalyzerAgent
+from agents.form_filler import FormFillerAgent
+from agents.tracker import TrackerAgent
+
+def build_runtime(settings: Optional[Dict] = None) -> dagger.Runtime:
+    """Register every agent on a new runtime; the caller starts and shuts it down
+
+    settings takes the options of a CLI config file (output_dir, top_k,
+    min_score, max_jobs_per_domain, max_result_pages); other keys, such as
+    user_details, are ignored.
+    """
+    settings = settings or {}
+    runtime = dagger.Runtime()
+
+    # The browser pool is shared and closed by runtime.shutdown()
+    runtime.register_agent("browser_pool", BrowserPoolAgent())
+    runtime.register_agent("coordinator", CoordinatorAgent(top_k=settings.get("top_k"),
+                                                           min_score=settings.get("min_score")))
+    search_limits = {key: settings[key] for key in ("max_jobs_per_domain", "max_result_pages") if key in settings}
+    runtime.register_agent("job_search", JobSearchAgent(**search_limits))
+    runtime.register_agent("form_analyzer", FormAnalyzerAgent())
+    runtime.register_agent("form_filler", FormFillerAgent())
+    runtime.register_agent("tracker", TrackerAgent(output_dir=settings.get("output_dir", ".")))
+
+    return runtime
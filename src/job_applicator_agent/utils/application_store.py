@@ -0,0 +1,137 @@
+# src/utils/application_store.py
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from models.data_models import ApplicationResult
+from utils.paths import cache_path
+from utils.url_tools import canonicalize_url
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT,
+    url TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    title TEXT,
+    success INTEGER NOT NULL,
+    timestamp TEXT NOT NULL,
+    notes TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_applications_domain ON applications (domain, timestamp);
+CREATE INDEX IF NOT EXISTS idx_applications_success ON applications (success, timestamp);
+CREATE INDEX IF NOT EXISTS idx_applications_timestamp ON applications (timestamp);
+CREATE INDEX IF NOT EXISTS idx_applications_canonical_url ON applications (canonical_url);
+CREATE INDEX IF NOT EXISTS idx_applications_run ON applications (run_id, id);
+"""
+
+
+def default_store_path() -> str:
+    """Where the tracker keeps application history unless given another store"""
+    return cache_path("applications.db")
+
+
+class ApplicationStore:
+    """Durable, indexed history of application results in SQLite (WAL mode)"""
+
+    def __init__(self, path: Optional[str] = None):
+        path = path or default_store_path()
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+
+    def add(self, result: ApplicationResult, run_id: Optional[str] = None) -> int:
+        """Insert one result and return its row id"""
+        record = result.to_record()
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO applications (run_id, url, canonical_url, domain, title, success, timestamp, notes) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, record["url"], canonicalize_url(record["url"]), record["domain"],
+                 record["title"], int(record["success"]), record["timestamp"], record["notes"])
+            )
+        return cursor.lastrowid
+
+    def _where(self,
+               domain: Optional[str] = None,
+               success: Optional[bool] = None,
+               since: Optional[datetime] = None,
+               until: Optional[datetime] = None,
+               run_id: Optional[str] = None,
+               url: Optional[str] = None) -> Tuple[str, List]:
+        clauses, params = [], []
+        if domain is not None:
+            clauses.append("domain = ?")
+            params.append(domain)
+        if success is not None:
+            clauses.append("success = ?")
+            params.append(int(success))
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.strftime(TIMESTAMP_FORMAT))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until.strftime(TIMESTAMP_FORMAT))
+        if run_id is not None:
+            clauses.append("run_id = ?")
+            params.append(run_id)
+        if url is not None:
+            clauses.append("canonical_url = ?")
+            params.append(canonicalize_url(url))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self,
+              limit: Optional[int] = 50,
+              cursor: Optional[int] = None,
+              oldest_first: bool = False,
+              **filters) -> List[Tuple[int, ApplicationResult]]:
+        """Page through results matching the filters.
+
+        Returns (row id, result) pairs, newest first by default. Pass the
+        last row id of a page as cursor to get the next page: rows older
+        than it, or newer with oldest_first.
+        """
+        where, params = self._where(**filters)
+        if cursor is not None:
+            where += (" AND " if where else " WHERE ") + ("id > ?" if oldest_first else "id < ?")
+            params.append(cursor)
+        sql = f"SELECT * FROM applications{where} ORDER BY id {'ASC' if oldest_first else 'DESC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self.connection.execute(sql, params).fetchall()
+        return [(row["id"], ApplicationResult.from_record(dict(row))) for row in rows]
+
+    def count(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self.connection.execute(f"SELECT COUNT(*) FROM applications{where}", params).fetchone()[0]
+
+    def summary(self, **filters) -> List[Dict]:
+        """Attempts, successes and failures per domain"""
+        where, params = self._where(**filters)
+        rows = self.connection.execute(
+            f"SELECT domain, COUNT(*) AS total, SUM(success) AS successes "
+            f"FROM applications{where} GROUP BY domain ORDER BY total DESC",
+            params
+        ).fetchall()
+        return [
+            {"domain": row["domain"], "total": row["total"],
+             "successes": row["successes"], "failures": row["total"] - row["successes"]}
+            for row in rows
+        ]
+
+    def close(self):
+        self.connection.close()
+
+
+def days_ago(days: float) -> datetime:
+    return datetime.now() - timedelta(days=days)
@@ -0,0 +1,183 @@
+# src/utils/ats_parsers.py
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from bs4 import BeautifulSoup
+
+from models.data_models import FormAnalysis, FormField
+from utils.form_serializer import control_label
+
+# Inputs that never need to be filled in by us
+_SKIPPED_INPUT_TYPES = {"hidden", "submit", "button", "reset", "image"}
+
+
+@dataclass
+class ExtractionResult:
+    analysis: FormAnalysis
+    confidence: float  # 0.0 - 1.0
+    extractor: str
+
+
+@dataclass
+class _Extractor:
+    name: str
+    domains: Tuple[str, ...]
+    extract: Callable[[BeautifulSoup], Optional[Tuple[FormAnalysis, float]]]
+
+
+_EXTRACTORS: List[_Extractor] = []
+
+# ATS pages served from another host, e.g. a company careers site embedding
+# Greenhouse or a local stub board: URL prefix -> the ATS domain it stands in for
+_URL_ALIASES: Dict[str, str] = {}
+
+
+def register_extractor(name: str, *domains: str):
+    """Register a rule-based form extractor for the given ATS domains.
+
+    The decorated function takes the parsed page and returns a
+    (FormAnalysis, confidence) tuple, or None when the layout is not
+    recognized.
+    """
+    def decorator(func):
+        _EXTRACTORS.append(_Extractor(name=name, domains=tuple(domains), extract=func))
+        return func
+    return decorator
+
+
+def alias_url_prefix(prefix: str, domain: str):
+    """Pick extractors for pages under prefix as if they were served from the ATS domain"""
+    _URL_ALIASES[prefix] = domain
+
+
+def remove_url_alias(prefix: str):
+    _URL_ALIASES.pop(prefix, None)
+
+
+def _host_of(url: str) -> str:
+    for prefix, domain in _URL_ALIASES.items():
+        if url.startswith(prefix):
+            return domain
+    return (urlparse(url).hostname or "").lower()
+
+
+def _host_matches(host: str, domain: str) -> bool:
+    return host == domain or host.endswith("." + domain)
+
+
+def extract_form(url: str, soup: BeautifulSoup) -> Optional[ExtractionResult]:
+    """Run the extractors registered for the URL's domain, best result first"""
+    host = _host_of(url)
+    best = None
+    for extractor in _EXTRACTORS:
+        if not any(_host_matches(host, domain) for domain in extractor.domains):
+            continue
+        extracted = extractor.extract(soup)
+        if extracted is None:
+            continue
+        analysis, confidence = extracted
+        if best is None or confidence > best.confidence:
+            best = ExtractionResult(analysis=analysis, confidence=confidence, extractor=extractor.name)
+    return best
+
+
+def _fields_from_form(soup: BeautifulSoup, form) -> FormAnalysis:
+    """Convert the controls of a form into a FormAnalysis"""
+    form_fields = []
+    resume_upload_id = None
+    submit_button_id = None
+
+    for element in form.find_all(["input", "textarea", "select", "button"]):
+        if element.name == "button":
+            field_type = element.get("type", "submit").lower()
+        elif element.name == "input":
+            field_type = element.get("type", "text").lower()
+        else:
+            field_type = element.name
+        identifier = element.get("id") or element.get("name")
+
+        if field_type == "submit":
+            if submit_button_id is None and identifier:
+                submit_button_id = identifier
+            continue
+        if element.name == "button":
+            continue
+        if field_type in _SKIPPED_INPUT_TYPES or not identifier:
+            continue
+
+        label = control_label(soup, element)
+        if field_type == "file":
+            hint = f"{identifier} {label}".lower()
+            if resume_upload_id is None and ("resume" in hint or "cv" in hint):
+                resume_upload_id = identifier
+            continue
+
+        form_fields.append(FormField(
+            field_id=identifier,
+            field_type=field_type,
+            label=label,
+            required=element.has_attr("required") or element.get("aria-required") == "true"
+        ))
+
+    return FormAnalysis(
+        form_fields=form_fields,
+        resume_upload_id=resume_upload_id,
+        submit_button_id=submit_button_id
+    )
+
+
+def _confidence(analysis: FormAnalysis) -> float:
+    """Score how complete an extracted application form looks"""
+    labels = " ".join(f"{f.field_id} {f.label}".lower() for f in analysis.form_fields)
+    score = 0.0
+    if "email" in labels:
+        score += 0.4
+    if "name" in labels:
+        score += 0.3
+    if analysis.resume_upload_id:
+        score += 0.3
+    return score
+
+
+def _extract_first(soup: BeautifulSoup, selectors: List[str]) -> Optional[Tuple[FormAnalysis, float]]:
+    for selector in selectors:
+        form = soup.select_one(selector)
+        if form is not None:
+            analysis = _fields_from_form(soup, form)
+            return analysis, _confidence(analysis)
+    return None
+
+
+@register_extractor("greenhouse", "greenhouse.io")
+def extract_greenhouse(soup: BeautifulSoup):
+    return _extract_first(soup, [
+        "form#application_form",
+        "form#application-form",
+        "form.application--form",
+        "div#application form",
+    ])
+
+
+@register_extractor("lever", "lever.co")
+def extract_lever(soup: BeautifulSoup):
+    return _extract_first(soup, [
+        "form#application-form",
+        "div.application-page form",
+        "form[action*='/apply']",
+    ])
+
+
+@register_extractor("workday", "workday.com", "myworkdayjobs.com")
+def extract_workday(soup: BeautifulSoup):
+    # Workday renders its forms client-side; only trust fully rendered pages
+    container = soup.select_one("[data-automation-id='applyFlowPage'], [data-automation-id='applyManually']")
+    if container is None:
+        return None
+    form = container if container.name == "form" else (container.find("form") or container)
+    analysis = _fields_from_form(soup, form)
+    # The application's only upload is the resume, and it is labelled by an icon
+    upload = form.select_one("input[type='file'][data-automation-id='file-upload-input-ref']")
+    if analysis.resume_upload_id is None and upload is not None:
+        analysis.resume_upload_id = upload.get("id") or upload.get("name")
+    return analysis, _confidence(analysis)
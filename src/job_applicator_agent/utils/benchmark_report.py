@@ -0,0 +1,60 @@
+# src/utils/benchmark_report.py
+import math
+import os
+from typing import Dict, List
+
+# Baseline of benchmark.py with its default options, kept next to it
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmark_baseline.json")
+
+# Stage latency changes smaller than this are noise, not regressions
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(durations: List[float]) -> Dict[str, float]:
+    return {
+        "count": len(durations),
+        "p50": round(percentile(durations, 50), 4),
+        "p95": round(percentile(durations, 95), 4),
+        "p99": round(percentile(durations, 99), 4),
+        "max": round(max(durations), 4) if durations else 0.0,
+    }
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float = 0.2) -> List[str]:
+    """Regressions of report against baseline, beyond the relative tolerance.
+
+    Only what the baseline records is checked: a baseline without
+    throughput or stage timings still guards the job counts.
+    """
+    regressions = []
+    if report["config"] != baseline.get("config"):
+        regressions.append(f"Config differs from the baseline: {baseline.get('config')} vs {report['config']}")
+        return regressions
+
+    expected = baseline.get("jobs_per_minute", 0)
+    if expected and report["jobs_per_minute"] < expected * (1 - tolerance):
+        regressions.append(f"Throughput {report['jobs_per_minute']} jobs/min is below baseline {expected}")
+    if report["jobs"] < baseline.get("jobs", 0):
+        regressions.append(f"Only {report['jobs']} jobs processed, baseline processed {baseline['jobs']}")
+    if report["successful"] < baseline.get("successful", 0):
+        regressions.append(f"Only {report['successful']} applications succeeded, "
+                           f"baseline had {baseline['successful']}")
+
+    for stage, base in baseline.get("stages", {}).items():
+        current = report["stages"].get(stage)
+        if not current or not base.get("count"):
+            continue
+        for key in ("p95", "p99"):
+            limit = base[key] * (1 + tolerance)
+            if current[key] > limit and current[key] - base[key] > NOISE_FLOOR_SECONDS:
+                regressions.append(f"{stage} {key} {current[key]}s exceeds baseline {base[key]}s")
+    return regressions
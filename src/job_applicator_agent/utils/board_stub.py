@@ -0,0 +1,358 @@
+# src/utils/board_stub.py
+import argparse
+import hashlib
+import html
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, quote, urlparse
+
+from utils.ats_parsers import alias_url_prefix, remove_url_alias
+
+# Markup style used for a board, picked by the ATS name in its domain
+ATS_STYLES = ("greenhouse", "lever", "workday")
+
+# Host each style's postings stand in for when served as ATS pages
+ATS_HOSTS = {"greenhouse": "boards.greenhouse.io", "lever": "jobs.lever.co", "workday": "wd1.myworkdayjobs.com"}
+
+# Search results per page, as on Google
+RESULTS_PER_PAGE = 10
+
+
+def board_style(domain: str) -> str:
+    for style in ATS_STYLES:
+        if style in domain:
+            return style
+    return "greenhouse"
+
+
+def _greenhouse_form(job: int, extra: List[str]) -> str:
+    questions = "".join(
+        f'<label for="question_{q}">{html.escape(q)}</label><input type="text" id="question_{q}" name="question_{q}">'
+        for q in extra
+    )
+    return f"""
+    <div id="application">
+      <form id="application_form" method="post" action="/apply/{job}">
+        <label for="first_name">First Name</label><input type="text" id="first_name" name="first_name" required>
+        <label for="last_name">Last Name</label><input type="text" id="last_name" name="last_name" required>
+        <label for="email">Email</label><input type="email" id="email" name="email" required>
+        <label for="phone">Phone</label><input type="tel" id="phone" name="phone">
+        <label for="resume">Resume/CV</label><input type="file" id="resume" name="resume">
+        {questions}
+        <button type="submit" id="submit_app">Submit Application</button>
+      </form>
+    </div>"""
+
+
+def _lever_form(job: int, extra: List[str]) -> str:
+    questions = "".join(
+        f'<label>{html.escape(q)}<input type="text" name="cards[{q}]"></label>' for q in extra
+    )
+    return f"""
+    <div class="application-page">
+      <form id="application-form" method="post" action="/apply/{job}">
+        <label>Full name<input type="text" name="name" required></label>
+        <label>Email<input type="email" name="email" required></label>
+        <label>Phone<input type="text" name="phone"></label>
+        <label>Resume/CV<input type="file" id="resume-upload-input" name="resume"></label>
+        {questions}
+        <button type="submit" id="btn-submit">Submit application</button>
+      </form>
+    </div>"""
+
+
+def _workday_form(job: int, extra: List[str]) -> str:
+    questions = "".join(
+        f'<input type="text" id="{q}" data-automation-id="{q}" aria-label="{html.escape(q)}">' for q in extra
+    )
+    return f"""
+    <div data-automation-id="applyFlowPage">
+      <form>
+        <input type="text" id="legalNameSection_firstName" data-automation-id="legalNameSection_firstName" aria-label="First Name" aria-required="true">
+        <input type="text" id="legalNameSection_lastName" data-automation-id="legalNameSection_lastName" aria-label="Last Name" aria-required="true">
+        <input type="email" id="email" data-automation-id="email" aria-label="Email Address" aria-required="true">
+        <input type="tel" id="phone-number" data-automation-id="phone-number" aria-label="Phone Number">
+        <input type="file" id="file-upload-input-ref" data-automation-id="file-upload-input-ref">
+        {questions}
+        <button type="submit" id="bottom-navigation-next-button" data-automation-id="bottom-navigation-next-button">Submit</button>
+      </form>
+    </div>"""
+
+
+_FORMS = {"greenhouse": _greenhouse_form, "lever": _lever_form, "workday": _workday_form}
+
+
+class StubJobBoardServer:
+    """Local job board serving synthetic search results and ATS pages.
+
+    /search?q=site:<domain> ... answers like a search engine with the
+    domain's jobs_per_domain "/url?q=..." result links, ten per page
+    (&start=<offset> for later pages), and every
+    posting page carries a Greenhouse-, Lever- or Workday-style form
+    (picked by the domain). Postings cycle through `templates` form
+    variants, which controls how often form analyses can be reused.
+    Every response waits latency (+/- jitter) seconds first and carries
+    an ETag; a request with a matching If-None-Match gets 304. Every
+    client_rendered-th posting writes its heading from a script, so only
+    a browser sees it and enrichment falls back to the browser pool.
+
+    The same postings are listed through Greenhouse- and Lever-shaped
+    JSON feeds under greenhouse_api_url and lever_api_url (Lever pages
+    with skip/limit). A response recorded from a real feed is served
+    instead when fixtures_dir holds it as <request path>.json, e.g.
+    fixtures_dir/lever/v0/postings/acme.json.
+
+    Postings are served from this server's own host, so no host-matched
+    ATS extractor applies to them; serve_as_ats(domains) makes
+    ats_parsers pick extractors for those domains' postings as if they
+    came from the real ATS host, until the server stops.
+
+        with StubJobBoardServer(jobs_per_domain=20, latency=0.05) as board:
+            agent = JobSearchAgent(search_url=board.search_url)
+    """
+
+    def __init__(self,
+                 jobs_per_domain: int = 10,
+                 templates: int = 3,
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 fixtures_dir: Optional[str] = None,
+                 client_rendered: int = 0):
+        self.jobs_per_domain = jobs_per_domain
+        self.client_rendered = client_rendered
+        self.fixtures_dir = fixtures_dir
+        self.templates = max(1, templates)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+        self._aliased: List[str] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.url}/search"
+
+    @property
+    def greenhouse_api_url(self) -> str:
+        return f"{self.url}/greenhouse/v1/boards"
+
+    @property
+    def lever_api_url(self) -> str:
+        return f"{self.url}/lever/v0/postings"
+
+    def job_url(self, domain: str, job: int) -> str:
+        return f"{self.url}/boards/{domain}/jobs/{job}/apply"
+
+    def serve_as_ats(self, domains: List[str]):
+        """Have ats_parsers treat the domains' postings as pages on their ATS host"""
+        for domain in domains:
+            prefix = f"{self.url}/boards/{domain}/"
+            alias_url_prefix(prefix, ATS_HOSTS[board_style(domain)])
+            self._aliased.append(prefix)
+
+    def search_page(self, query: str, start: int = 0) -> str:
+        domain = next((term[5:] for term in query.split() if term.startswith("site:")), "")
+        links = "".join(
+            f'<div class="g"><a href="/url?q={quote(self.job_url(domain, job), safe="")}&sa=U">'
+            f"Job {job} at {html.escape(domain)}</a></div>"
+            for job in range(start, min(start + RESULTS_PER_PAGE, self.jobs_per_domain))
+        ) if domain else ""
+        return f"<html><head><title>{html.escape(query)}</title></head><body>{links}</body></html>"
+
+    def job_page(self, domain: str, job: int) -> str:
+        style = board_style(domain)
+        template = job % self.templates
+        extra = [f"template{template}_q{i}" for i in range(template)]
+        heading = f"<h1>Software Engineer {job}</h1>"
+        if self.client_rendered and job % self.client_rendered == 0:
+            heading = f"<script>document.write({json.dumps(heading)})</script>"
+        return f"""<html><head><title>Job {job} - {html.escape(domain)}</title></head>
+<body>
+  {heading}
+  <p>Synthetic {style} posting {job} on {html.escape(domain)} for benchmarking.</p>
+  {_FORMS[style](job, extra)}
+</body></html>"""
+
+    def greenhouse_feed(self, board: str) -> Dict:
+        domain = f"{board}.greenhouse.test"
+        return {
+            "jobs": [
+                {
+                    "id": job,
+                    "title": f"Software Engineer {job}",
+                    "absolute_url": self.job_url(domain, job),
+                    "location": {"name": "Remote"},
+                    "updated_at": "2024-01-01T00:00:00-05:00",
+                    "content": html.escape(f"<p>Synthetic greenhouse posting {job} on {domain} for benchmarking.</p>"),
+                }
+                for job in range(self.jobs_per_domain)
+            ],
+            "meta": {"total": self.jobs_per_domain},
+        }
+
+    def lever_feed(self, board: str) -> List[Dict]:
+        domain = f"{board}.lever.test"
+        return [
+            {
+                "id": f"{board}-{job}",
+                "text": f"Software Engineer {job}",
+                "hostedUrl": self.job_url(domain, job),
+                "applyUrl": self.job_url(domain, job),
+                "categories": {"location": "Remote", "team": "Engineering"},
+                "descriptionPlain": f"Synthetic lever posting {job} on {domain} for benchmarking.",
+                "createdAt": 1704067200000,
+            }
+            for job in range(self.jobs_per_domain)
+        ]
+
+    def _feed_for(self, path: str, query: Dict[str, List[str]]):
+        parts = [part for part in path.split("/") if part]
+        feed = self._recorded(parts)
+        if feed is None:
+            # /greenhouse/v1/boards/<board>/jobs
+            if len(parts) == 5 and parts[:3] == ["greenhouse", "v1", "boards"] and parts[4] == "jobs":
+                feed = self.greenhouse_feed(parts[3])
+            # /lever/v0/postings/<board>
+            elif len(parts) == 4 and parts[:3] == ["lever", "v0", "postings"]:
+                feed = self.lever_feed(parts[3])
+        if isinstance(feed, list) and "skip" in query:
+            skip = int(query["skip"][0])
+            limit = int(query.get("limit", [str(len(feed))])[0])
+            feed = feed[skip:skip + limit]
+        return feed
+
+    def _recorded(self, parts: List[str]):
+        if not self.fixtures_dir or not parts or ".." in parts:
+            return None
+        path = os.path.join(self.fixtures_dir, *parts) + ".json"
+        if not os.path.isfile(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _page_for(self, path: str, query: Dict[str, List[str]]) -> Optional[str]:
+        if path == "/search":
+            try:
+                start = int(query.get("start", ["0"])[0])
+            except ValueError:
+                return None
+            return self.search_page(query.get("q", [""])[0], start)
+        parts = [part for part in path.split("/") if part]
+        # /boards/<domain>/jobs/<n>/apply
+        if len(parts) == 5 and parts[0] == "boards" and parts[2] == "jobs" and parts[4] == "apply":
+            try:
+                return self.job_page(parts[1], int(parts[3]))
+            except ValueError:
+                return None
+        return None
+
+    def _handler_class(self):
+        board = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                time.sleep(max(0.0, board.latency + random.uniform(-board.jitter, board.jitter)))
+                query = parse_qs(url.query)
+                try:
+                    feed = board._feed_for(url.path, query)
+                except ValueError:
+                    feed = None
+                if feed is not None:
+                    page, content_type = json.dumps(feed), "application/json"
+                else:
+                    page, content_type = board._page_for(url.path, query), "text/html; charset=utf-8"
+                if page is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+
+                payload = page.encode("utf-8")
+                etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with board._lock:
+                        board.requests += 1
+                        board.not_modified += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                with board._lock:
+                    board.requests += 1
+                    board.bytes_sent += len(payload)
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubJobBoardServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        for prefix in self._aliased:
+            remove_url_alias(prefix)
+        self._aliased = []
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "StubJobBoardServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic job board locally")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--jobs-per-domain", type=int, default=10)
+    parser.add_argument("--templates", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--fixtures-dir", help="Serve recorded feed responses from this directory")
+    parser.add_argument("--client-rendered", type=int, default=0,
+                        help="Render every Nth posting's heading from a script (0: none)")
+    args = parser.parse_args()
+
+    board = StubJobBoardServer(args.jobs_per_domain, args.templates, args.latency, args.jitter, port=args.port,
+                               fixtures_dir=args.fixtures_dir, client_rendered=args.client_rendered)
+    print(f"Stub job board listening on {board.url} (search at {board.search_url})")
+    print(f"Greenhouse feeds at {board.greenhouse_api_url}, Lever feeds at {board.lever_api_url}")
+    try:
+        board._server.serve_forever()
+    except KeyboardInterrupt:
+        board._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+# src/utils/checkpoints.py
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import asdict
+from typing import Dict, List, Optional, Tuple
+
+from utils.paths import cache_path
+
+# Stages a job moves through, in order. "filling" is written before the
+# filler touches the page so an interrupted fill is never repeated.
+STAGES = ["found", "analyzed", "filling", "filled", "recorded"]
+STAGE_ORDER = {stage: index for index, stage in enumerate(STAGES)}
+
+# Checkpoint key for the domain-level search stage
+SEARCHED = "searched"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    run_key TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    payload TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (run_key, item_key)
+);
+"""
+
+
+def make_run_key(*parts) -> str:
+    """Stable key for a run, derived from its inputs"""
+    encoded = json.dumps(parts, default=str, sort_keys=True)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+
+def _file_digest(path: Optional[str]) -> Optional[str]:
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                digest.update(chunk)
+    except (OSError, TypeError):
+        return None
+    return digest.hexdigest()
+
+
+def run_key_for(user_details, job_criteria, domains: List[str]) -> str:
+    """Run key for an application run.
+
+    The resume counts by its contents rather than its path: the UI saves
+    every upload under a new temporary name, and a re-upload of the same
+    resume must still resume the run it crashed in.
+    """
+    details = {name: value for name, value in asdict(user_details).items() if name != "resume_path"}
+    return make_run_key(details, asdict(job_criteria), sorted(domains), _file_digest(user_details.resume_path))
+
+
+class CheckpointStore:
+    """Per-job stage checkpoints so an interrupted run can resume"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or cache_path("checkpoints.db")
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(_SCHEMA)
+
+    def load(self, run_key: str) -> Dict[str, Tuple[str, Optional[Dict]]]:
+        """All checkpoints of a run as {item_key: (stage, payload)}"""
+        rows = self.connection.execute(
+            "SELECT item_key, stage, payload FROM checkpoints WHERE run_key = ?", (run_key,)
+        ).fetchall()
+        return {
+            item_key: (stage, json.loads(payload) if payload else None)
+            for item_key, stage, payload in rows
+        }
+
+    def save(self, run_key: str, item_key: str, stage: str, payload: Optional[Dict] = None):
+        """Record that an item completed a stage; never moves an item backwards"""
+        current = self.connection.execute(
+            "SELECT stage FROM checkpoints WHERE run_key = ? AND item_key = ?", (run_key, item_key)
+        ).fetchone()
+        if current and STAGE_ORDER.get(current[0], -1) > STAGE_ORDER.get(stage, -1):
+            return
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (run_key, item_key, stage, payload, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_key, item_key, stage, json.dumps(payload, default=str) if payload is not None else None,
+                 time.time())
+            )
+
+    def clear(self, run_key: str):
+        """Drop the checkpoints of a run that finished"""
+        with self.connection:
+            self.connection.execute("DELETE FROM checkpoints WHERE run_key = ?", (run_key,))
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,152 @@
+# src/utils/crawl_cache.py
+import hashlib
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from models.data_models import JobListing
+from utils.paths import cache_path
+from utils.url_tools import canonicalize_url
+
+_HTTP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    content_type TEXT,
+    content_hash TEXT NOT NULL,
+    body BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+_LISTING_SCHEMA = """
+CREATE TABLE IF NOT EXISTS listings (
+    url TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    page_hash TEXT,
+    seen_at REAL NOT NULL
+);
+"""
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def listing_hash(job: JobListing) -> str:
+    """Fingerprint of what a listing says, independent of the page around it"""
+    return content_hash(f"{job.title}\0{job.description}".encode("utf-8"))
+
+
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_type: str
+    content_hash: str
+    body: bytes
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    # Fetches run on the HTTP thread pool, so one connection is shared under a lock
+    connection = sqlite3.connect(path, check_same_thread=False)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class HttpCache:
+    """Responses that carry an ETag or Last-Modified, for conditional requests.
+
+    PageFetcher sends the stored validators with the next request for
+    the same URL and serves the stored body when the server answers
+    304 Not Modified.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or cache_path("http_cache.db")
+        self.connection = _connect(self.path)
+        self.connection.executescript(_HTTP_SCHEMA)
+        self._lock = threading.Lock()
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified, content_type, content_hash, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def put(self, url: str, response: CachedResponse):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, etag, last_modified, content_type, content_hash, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, response.etag, response.last_modified, response.content_type, response.content_hash,
+                 response.body, time.time())
+            )
+
+    def close(self):
+        self.connection.close()
+
+
+class ListingSnapshots:
+    """What each listing looked like when it was last processed.
+
+    A listing whose content hash matches its snapshot has not changed
+    since an earlier run and is not processed again. The hash of the
+    page it was read from is kept too, so an identical page is known to
+    be unchanged without parsing it. Listings are keyed by canonical URL,
+    so other links to the same posting share its snapshot.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or cache_path("listing_snapshots.db")
+        self.connection = _connect(self.path)
+        self.connection.executescript(_LISTING_SCHEMA)
+        self._lock = threading.Lock()
+
+    def page_unchanged(self, url: str, page_hash: str) -> bool:
+        """True if the listing was last read from exactly this page"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT page_hash FROM listings WHERE url = ?", (canonicalize_url(url),)
+            ).fetchone()
+        return row is not None and row[0] == page_hash
+
+    def changed(self, job: JobListing) -> bool:
+        """True if the listing is new or its content differs from its snapshot"""
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT content_hash FROM listings WHERE url = ?", (canonicalize_url(job.url),)
+            ).fetchone()
+        return row is None or row[0] != listing_hash(job)
+
+    def update(self, job: JobListing, page_hash: Optional[str] = None) -> bool:
+        """Store the listing's snapshot; True if it is new or its content changed"""
+        digest = listing_hash(job)
+        key = canonicalize_url(job.url)
+        with self._lock, self.connection:
+            row = self.connection.execute("SELECT content_hash FROM listings WHERE url = ?", (key,)).fetchone()
+            self.connection.execute(
+                "INSERT OR REPLACE INTO listings (url, domain, content_hash, page_hash, seen_at) VALUES (?, ?, ?, ?, ?)",
+                (key, job.domain, digest, page_hash, time.time())
+            )
+        return row is None or row[0] != digest
+
+    def forget(self, urls: Iterable[str]):
+        """Drop snapshots so the listings are handed on again next run"""
+        with self._lock, self.connection:
+            self.connection.executemany("DELETE FROM listings WHERE url = ?",
+                                        [(canonicalize_url(url),) for url in urls])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM listings").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
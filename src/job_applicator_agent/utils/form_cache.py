@@ -0,0 +1,176 @@
+# src/utils/form_cache.py
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Set
+
+from bs4 import BeautifulSoup
+
+from models.data_models import FormAnalysis
+from utils.paths import cache_path
+
+# Attributes that describe the structure of a form; text, values and
+# actions are left out because they carry job-specific content
+FINGERPRINT_ATTRIBUTES = ("name", "id", "type")
+
+# Job-specific tokens inside attribute values: UUIDs, long hex ids, numbers
+_JOB_TOKEN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|[0-9a-f]{16,}"
+    r"|\d+",
+    re.IGNORECASE,
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    fingerprint TEXT PRIMARY KEY,
+    analysis TEXT NOT NULL,
+    stored_at REAL NOT NULL,
+    used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at);
+"""
+
+
+def _normalize(value) -> str:
+    if isinstance(value, list):
+        value = " ".join(value)
+    return _JOB_TOKEN.sub("#", str(value).strip().lower())
+
+
+def form_fingerprint(soup: BeautifulSoup) -> Optional[str]:
+    """Fingerprint the structure of every <form> on the page.
+
+    Two postings built from the same ATS template produce the same
+    fingerprint even when their job ids differ. Returns None when the page
+    has no form.
+    """
+    forms = soup.find_all("form")
+    if not forms:
+        return None
+
+    lines = []
+    for form in forms:
+        lines.append("form")
+        for tag in form.find_all(True):
+            attributes = " ".join(
+                f"{attr}={_normalize(tag[attr])}"
+                for attr in FINGERPRINT_ATTRIBUTES
+                if tag.has_attr(attr)
+            )
+            lines.append(f"{tag.name} {attributes}".rstrip())
+
+    return hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest()
+
+
+def form_identifiers(soup: BeautifulSoup) -> Set[str]:
+    """All id and name attributes found inside forms on the page"""
+    identifiers = set()
+    for form in soup.find_all("form"):
+        for tag in form.find_all(True):
+            for attr in ("id", "name"):
+                if tag.has_attr(attr):
+                    identifiers.add(tag[attr])
+    return identifiers
+
+
+class FormAnalysisCache:
+    """On-disk LRU cache of FormAnalysis results keyed by form fingerprint.
+
+    Entries live in SQLite (WAL mode), so worker processes sharing the
+    cache, e.g. the shards of a sharded run, see each other's analyses
+    and never overwrite them.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_entries: int = 1000,
+                 ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path or cache_path("form_analysis.db")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._expire()
+
+    def _expire(self):
+        if not self.ttl_seconds:
+            return
+        with self._lock, self.connection:
+            cursor = self.connection.execute("DELETE FROM entries WHERE stored_at < ?",
+                                             (time.time() - self.ttl_seconds,))
+        self.evictions += cursor.rowcount
+
+    def get(self, fingerprint: Optional[str], identifiers: Optional[Set[str]] = None) -> Optional[FormAnalysis]:
+        """Return the cached analysis for a fingerprint, or None on a miss.
+
+        When identifiers are given, an entry only counts as a hit if every
+        field it refers to exists on the current page.
+        """
+        row = None
+        if fingerprint:
+            with self._lock:
+                row = self.connection.execute(
+                    "SELECT analysis, stored_at FROM entries WHERE fingerprint = ?", (fingerprint,)
+                ).fetchone()
+        if row is not None and self.ttl_seconds and row[1] < time.time() - self.ttl_seconds:
+            with self._lock, self.connection:
+                self.connection.execute("DELETE FROM entries WHERE fingerprint = ?", (fingerprint,))
+            self.evictions += 1
+            row = None
+
+        analysis = FormAnalysis.from_dict(json.loads(row[0])) if row is not None else None
+        if analysis is not None and identifiers is not None:
+            referenced = {field.field_id for field in analysis.form_fields}
+            referenced.discard("")
+            if not referenced <= identifiers:
+                analysis = None
+
+        if analysis is None:
+            self.misses += 1
+            return None
+
+        with self._lock, self.connection:
+            self.connection.execute("UPDATE entries SET used_at = ? WHERE fingerprint = ?",
+                                    (time.time(), fingerprint))
+        self.hits += 1
+        return analysis
+
+    def put(self, fingerprint: Optional[str], analysis: FormAnalysis):
+        """Store an analysis, evicting the least recently used entries beyond max_entries"""
+        if not fingerprint or analysis is None:
+            return
+        now = time.time()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (fingerprint, analysis, stored_at, used_at) VALUES (?, ?, ?, ?)",
+                (fingerprint, json.dumps(analysis.to_dict()), now, now)
+            )
+            cursor = self.connection.execute(
+                "DELETE FROM entries WHERE fingerprint IN "
+                "(SELECT fingerprint FROM entries ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+        self.evictions += cursor.rowcount
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            entries = self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self.connection.close()
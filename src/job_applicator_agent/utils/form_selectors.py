@@ -0,0 +1,45 @@
+# src/utils/form_selectors.py
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+from models.data_models import FormAnalysis
+
+
+def attribute_selector(attribute: str, value: str) -> str:
+    """CSS selector matching an exact attribute value, safe for any characters"""
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\a ")
+    return f'[{attribute}="{escaped}"]'
+
+
+def fallback_selector(identifier: str) -> str:
+    """Selector for a control known only by an id-or-name identifier"""
+    return f'{attribute_selector("id", identifier)}, {attribute_selector("name", identifier)}'
+
+
+def resolve_selector(soup: BeautifulSoup, identifier: Optional[str]) -> Optional[str]:
+    """Selector for the control an analysis refers to, checked against the page"""
+    if not identifier:
+        return None
+    if soup.find(attrs={"id": identifier}) is not None:
+        return attribute_selector("id", identifier)
+    if soup.find(attrs={"name": identifier}) is not None:
+        return attribute_selector("name", identifier)
+    return None
+
+
+def resolve_selectors(analysis: FormAnalysis, soup: BeautifulSoup) -> int:
+    """Attach a CSS selector to every control of the analysis found on the page.
+
+    Returns how many of the referenced controls were resolved. Controls
+    that could not be found keep selector None.
+    """
+    resolved = 0
+    for field in analysis.form_fields:
+        field.selector = resolve_selector(soup, field.field_id)
+        resolved += field.selector is not None
+    analysis.resume_upload_selector = resolve_selector(soup, analysis.resume_upload_id)
+    analysis.submit_button_selector = resolve_selector(soup, analysis.submit_button_id)
+    resolved += analysis.resume_upload_selector is not None
+    resolved += analysis.submit_button_selector is not None
+    return resolved
@@ -0,0 +1,144 @@
+# src/utils/form_serializer.py
+from dataclasses import dataclass
+from typing import List
+
+from bs4 import BeautifulSoup
+
+# Elements whose text is never useful to the model
+BOILERPLATE_TAGS = ["script", "style", "noscript", "svg", "template", "head", "header", "footer", "nav"]
+
+# Controls that carry no user input
+_SKIPPED_INPUT_TYPES = {"hidden", "reset", "image"}
+
+# Rough characters-per-token ratio for Gemini on English/HTML-ish text
+CHARS_PER_TOKEN = 4
+
+MAX_OPTIONS = 15
+MAX_LABEL_CHARS = 80
+
+
+@dataclass
+class CompactForm:
+    text: str
+    tokens: int  # Estimated tokens of text
+    controls: int  # Controls included in text
+    total_controls: int  # Controls found on the page
+    source_chars: int  # Size of the raw HTML the text was built from
+    truncated: bool = False
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def control_label(soup: BeautifulSoup, element) -> str:
+    """Best human-readable label for a form control"""
+    element_id = element.get("id")
+    if element_id:
+        label = soup.find("label", attrs={"for": element_id})
+        if label:
+            return label.get_text(" ", strip=True)
+    parent_label = element.find_parent("label")
+    if parent_label:
+        return parent_label.get_text(" ", strip=True)
+    for attr in ("aria-label", "placeholder", "data-automation-id", "name", "id"):
+        if element.get(attr):
+            return element[attr]
+    return ""
+
+
+def _clip(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _describe_control(soup: BeautifulSoup, element) -> str:
+    """One line per control: type | id | name | label | required | options"""
+    if element.name == "input":
+        control_type = element.get("type", "text").lower()
+    elif element.name == "button":
+        control_type = f"button:{element.get('type', 'submit').lower()}"
+    else:
+        control_type = element.name
+
+    parts = [
+        control_type,
+        f"id={element.get('id', '')}",
+        f"name={element.get('name', '')}",
+        f"label={_clip(control_label(soup, element) or element.get_text(' ', strip=True), MAX_LABEL_CHARS)}",
+    ]
+    if element.has_attr("required") or element.get("aria-required") == "true":
+        parts.append("required")
+
+    if element.name == "select":
+        options = [_clip(option.get_text(" ", strip=True), 40) for option in element.find_all("option")]
+        options = [option for option in options if option]
+        if options:
+            more = f" (+{len(options) - MAX_OPTIONS} more)" if len(options) > MAX_OPTIONS else ""
+            parts.append("options=" + "/".join(options[:MAX_OPTIONS]) + more)
+
+    return " | ".join(parts)
+
+
+def _page_context(soup: BeautifulSoup, max_chars: int) -> str:
+    """Title and headings, which tell the model what kind of page this is"""
+    pieces = []
+    if soup.title and soup.title.string:
+        pieces.append(soup.title.string)
+    for heading in soup.find_all(["h1", "h2"]):
+        if heading.find_parent(BOILERPLATE_TAGS) is None:
+            pieces.append(heading.get_text(" ", strip=True))
+    return _clip(" / ".join(piece.strip() for piece in pieces if piece.strip()), max_chars)
+
+
+def serialize_form_controls(soup: BeautifulSoup, token_budget: int = 1500, source_chars: int = 0) -> CompactForm:
+    """Reduce a page to a compact, token-bounded list of its form controls.
+
+    Scripts, styles and page chrome are ignored. Controls inside <form>
+    elements are preferred; pages that render inputs outside a form fall
+    back to every control on the page. The result never exceeds
+    token_budget estimated tokens.
+    """
+    forms = soup.find_all("form")
+    containers = forms if forms else [soup]
+
+    elements = []
+    for container in containers:
+        for element in container.find_all(["input", "textarea", "select", "button"]):
+            if element.find_parent(BOILERPLATE_TAGS) is not None:
+                continue
+            if element.name == "input" and element.get("type", "text").lower() in _SKIPPED_INPUT_TYPES:
+                continue
+            elements.append(element)
+
+    budget_chars = token_budget * CHARS_PER_TOKEN
+    lines: List[str] = []
+    context = _page_context(soup, min(300, budget_chars // 10))
+    if context:
+        lines.append(f"Page: {context}")
+    lines.append("Controls (type | id | name | label | required | options):")
+
+    used = sum(len(line) + 1 for line in lines)
+    included = 0
+    truncated = False
+    for element in elements:
+        line = _describe_control(soup, element)
+        if used + len(line) + 1 > budget_chars:
+            truncated = True
+            break
+        lines.append(line)
+        used += len(line) + 1
+        included += 1
+
+    if not elements:
+        lines.append("None found")
+
+    text = "\n".join(lines)[:budget_chars]
+    return CompactForm(
+        text=text,
+        tokens=estimate_tokens(text),
+        controls=included,
+        total_controls=len(elements),
+        source_chars=source_chars,
+        truncated=truncated,
+    )
@@ -0,0 +1,156 @@
+# src/utils/http_fetch.py
+import asyncio
+import contextvars
+import json
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from utils.crawl_cache import CachedResponse, HttpCache, content_hash
+from utils.tracing import tracer
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/json;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.8",
+}
+
+
+@dataclass
+class FetchedPage:
+    body: bytes
+    content_type: str
+    content_hash: str
+    not_modified: bool = False  # Served from the HTTP cache after a 304
+
+    @property
+    def is_html(self) -> bool:
+        return not self.content_type or "html" in self.content_type or "xml" in self.content_type
+
+    @property
+    def text(self) -> str:
+        charset = "utf-8"
+        if "charset=" in self.content_type:
+            charset = self.content_type.split("charset=", 1)[1].split(";")[0].strip().strip('"')
+        try:
+            return self.body.decode(charset, errors="replace")
+        except LookupError:
+            return self.body.decode("utf-8", errors="replace")
+
+
+class PageFetcher:
+    """Plain-HTTP page fetcher over a pooled keep-alive session.
+
+    Far cheaper than a browser page load for server-rendered pages.
+    Requests run on a small thread pool so many pages can be fetched
+    concurrently without blocking the event loop. With an HttpCache,
+    pages are revalidated with If-None-Match / If-Modified-Since and a
+    304 answer is served from the cache.
+    """
+
+    def __init__(self,
+                 max_connections: int = 16,
+                 timeout: float = 10.0,
+                 retries: int = 2,
+                 headers: Optional[Dict[str, str]] = None,
+                 cache: Optional[HttpCache] = None):
+        self.timeout = timeout
+        self.cache = cache
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+
+        retry = Retry(total=retries, backoff_factor=0.3, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=max_connections, pool_maxsize=max_connections, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="http")
+        self.stats = {"requests": 0, "errors": 0, "bytes": 0, "not_modified": 0}
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """Blocking GET on the pooled session"""
+        self.stats["requests"] += 1
+        with tracer.span("http.get", url=url) as span:
+            response = self.session.get(url, timeout=kwargs.pop("timeout", self.timeout), **kwargs)
+            self.stats["bytes"] += len(response.content)
+            if span.recording:
+                retries = getattr(response.raw, "retries", None)
+                span.set(bytes=len(response.content), status=str(response.status_code),
+                         retries=len(retries.history) if retries is not None else 0)
+        return response
+
+    def get_page(self, url: str, accept: Optional[str] = None) -> Optional[FetchedPage]:
+        """Blocking conditional GET; None if the page could not be fetched"""
+        headers = {"Accept": accept} if accept else {}
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        try:
+            response = self.get(url, headers=headers)
+        except requests.RequestException:
+            self.stats["errors"] += 1
+            return None
+        if response.status_code == 304 and cached is not None:
+            self.stats["not_modified"] += 1
+            return FetchedPage(cached.body, cached.content_type, cached.content_hash, not_modified=True)
+        if response.status_code != 200:
+            return None
+
+        page = FetchedPage(response.content, response.headers.get("Content-Type", ""), content_hash(response.content))
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if self.cache is not None and (etag or last_modified):
+            self.cache.put(url, CachedResponse(etag, last_modified, page.content_type, page.content_hash, page.body))
+        return page
+
+    def fetch_text(self, url: str) -> Optional[str]:
+        """Return the body of an HTML page, or None if it could not be fetched"""
+        page = self.get_page(url)
+        if page is None or not page.is_html:
+            return None
+        return page.text
+
+    def fetch_json_body(self, url: str) -> Optional[Any]:
+        """Return the decoded body of a JSON response, or None if it could not be fetched"""
+        page = self.get_page(url, accept="application/json")
+        if page is None:
+            return None
+        try:
+            return json.loads(page.body)
+        except ValueError:
+            self.stats["errors"] += 1
+            return None
+
+    async def fetch(self, url: str) -> Optional[str]:
+        return await self._run(self.fetch_text, url)
+
+    async def fetch_json(self, url: str) -> Optional[Any]:
+        return await self._run(self.fetch_json_body, url)
+
+    async def fetch_page(self, url: str) -> Optional[FetchedPage]:
+        return await self._run(self.get_page, url)
+
+    async def _run(self, func, url: str):
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, context.run, func, url)
+
+    async def fetch_many(self, urls: List[str]) -> List[Optional[str]]:
+        """Fetch pages concurrently; results are in the same order as urls"""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    def close(self):
+        self.session.close()
+        self._executor.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,148 @@
+# src/utils/job_sources.py
+import html
+import re
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from bs4 import BeautifulSoup
+
+from models.data_models import JobCriteria, JobListing
+from utils.http_fetch import PageFetcher
+
+GREENHOUSE_API_URL = "https://boards-api.greenhouse.io/v1/boards"
+LEVER_API_URL = "https://api.lever.co/v0/postings"
+
+
+class JobSourceError(RuntimeError):
+    """A board feed could not be read"""
+
+
+def split_board(domain: str) -> Tuple[str, str]:
+    """Host and board of a domain entry.
+
+    "greenhouse.io/acme" and "https://boards.greenhouse.io/acme/" both
+    give ("...greenhouse.io", "acme"); a bare "greenhouse.io" has no board.
+    """
+    spec = re.sub(r"^https?://", "", domain.strip(), flags=re.IGNORECASE)
+    host, _, path = spec.partition("/")
+    board = path.strip("/").split("/")[0]
+    return host.lower(), board
+
+
+def matches_criteria(criteria: JobCriteria, title: str, location: str = "") -> bool:
+    """What the search query asks for: every word of the title, and the location when both are known"""
+    title = title.lower()
+    if not all(word in title for word in criteria.title.lower().split()):
+        return False
+    if criteria.location and location and criteria.location.lower() not in location.lower():
+        return False
+    return True
+
+
+def html_to_text(content: str) -> str:
+    """Plain text of an HTML (or HTML-escaped HTML) job description"""
+    if not content:
+        return ""
+    text = BeautifulSoup(html.unescape(content), "html.parser").get_text(" ")
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class JobSource:
+    """A board's own listing feed, read in bulk over HTTP.
+
+    A source claims domain entries naming a board on one of its hosts,
+    e.g. "greenhouse.io/acme". JobSearchAgent reads a claimed domain from
+    its feed and falls back to scraping search results when no source
+    claims it or the feed cannot be read.
+    """
+    name = "feed"
+    hosts: Tuple[str, ...] = ()
+
+    def __init__(self, api_url: str):
+        self.api_url = api_url.rstrip("/")
+
+    def board_for(self, domain: str) -> Optional[str]:
+        """The board a domain entry names, if it is on one of this source's hosts"""
+        host, board = split_board(domain)
+        if board and any(host == known or host.endswith(f".{known}") for known in self.hosts):
+            return board
+        return None
+
+    def listings(self, fetcher: PageFetcher, criteria: JobCriteria, domain: str,
+                 board: str) -> AsyncIterator[JobListing]:
+        """Listings on the board matching criteria; raises JobSourceError if the feed is unavailable"""
+        raise NotImplementedError
+
+    async def _get_json(self, fetcher: PageFetcher, url: str):
+        data = await fetcher.fetch_json(url)
+        if data is None:
+            raise JobSourceError(f"The {self.name} feed at {url} could not be read")
+        return data
+
+
+class GreenhouseSource(JobSource):
+    """Public Greenhouse job board API; one request returns the whole board"""
+    name = "greenhouse"
+    hosts = ("greenhouse.io",)
+
+    def __init__(self, api_url: str = GREENHOUSE_API_URL):
+        super().__init__(api_url)
+
+    async def listings(self, fetcher, criteria, domain, board):
+        data = await self._get_json(fetcher, f"{self.api_url}/{board}/jobs?content=true")
+        if not isinstance(data, dict):
+            raise JobSourceError(f"Unexpected {self.name} response for board {board}")
+
+        for entry in data.get("jobs", []):
+            title = entry.get("title") or ""
+            url = entry.get("absolute_url")
+            location = (entry.get("location") or {}).get("name") or ""
+            if not url or not matches_criteria(criteria, title, location):
+                continue
+            yield JobListing(
+                url=url,
+                domain=domain,
+                title=title,
+                # Greenhouse sends the description as escaped HTML
+                description=html_to_text(entry.get("content") or "")
+            )
+
+
+class LeverSource(JobSource):
+    """Public Lever postings API, read page_size postings at a time"""
+    name = "lever"
+    hosts = ("lever.co",)
+
+    def __init__(self, api_url: str = LEVER_API_URL, page_size: int = 100):
+        super().__init__(api_url)
+        self.page_size = page_size
+
+    async def listings(self, fetcher, criteria, domain, board):
+        skip = 0
+        while True:
+            query = urlencode({"mode": "json", "skip": skip, "limit": self.page_size})
+            page = await self._get_json(fetcher, f"{self.api_url}/{board}?{query}")
+            if not isinstance(page, list):
+                raise JobSourceError(f"Unexpected {self.name} response for board {board}")
+
+            for entry in page:
+                title = entry.get("text") or ""
+                url = entry.get("applyUrl") or entry.get("hostedUrl")
+                location = (entry.get("categories") or {}).get("location") or ""
+                if not url or not matches_criteria(criteria, title, location):
+                    continue
+                yield JobListing(
+                    url=url,
+                    domain=domain,
+                    title=title,
+                    description=entry.get("descriptionPlain") or html_to_text(entry.get("description") or "")
+                )
+
+            if len(page) < self.page_size:
+                break
+            skip += self.page_size
+
+
+def default_sources() -> List[JobSource]:
+    """Feeds tried before search scraping, in order"""
+    return [GreenhouseSource(), LeverSource()]
@@ -0,0 +1,68 @@
+# src/utils/journal.py
+import json
+import os
+import time
+from typing import Dict, Iterator, List
+
+
+class ApplicationJournal:
+    """Append-only JSONL journal with batched group commits.
+
+    Records are buffered and written together once batch_size records are
+    pending or flush_interval seconds have passed since the last commit.
+    With fsync=True every commit is forced to disk. Appending costs the
+    same no matter how many records the journal already holds.
+    """
+
+    def __init__(self,
+                 path: str,
+                 batch_size: int = 32,
+                 flush_interval: float = 1.0,
+                 fsync: bool = False):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._buffer: List[str] = []
+        self._last_commit = time.monotonic()
+
+    def append(self, record: Dict):
+        """Queue one record, committing the group when it is due"""
+        self._buffer.append(json.dumps(record, default=str) + "\n")
+        if (len(self._buffer) >= self.batch_size
+                or time.monotonic() - self._last_commit >= self.flush_interval):
+            self.commit()
+
+    def commit(self):
+        """Write all buffered records with a single write call"""
+        if self._buffer:
+            self._file.write("".join(self._buffer))
+            self._buffer = []
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        self._last_commit = time.monotonic()
+
+    def records(self) -> Iterator[Dict]:
+        """Iterate over every committed record, oldest first"""
+        self.commit()
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A torn final line from a crash is skipped
+                    continue
+
+    def close(self):
+        if self._file is not None:
+            self.commit()
+            self._file.close()
+            self._file = None
@@ -0,0 +1,175 @@
+# src/utils/json_repair.py
+import json
+import re
+from typing import Any, List, Tuple
+
+from models.data_models import FormAnalysis
+
+# Response schema for Gemini structured output (OpenAPI subset)
+FORM_ANALYSIS_SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "form_fields": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "field_id": {"type": "STRING"},
+                    "field_type": {"type": "STRING"},
+                    "label": {"type": "STRING"},
+                    "required": {"type": "BOOLEAN"},
+                },
+                "required": ["field_id", "field_type", "label"],
+            },
+        },
+        "resume_upload_id": {"type": "STRING", "nullable": True},
+        "submit_button_id": {"type": "STRING", "nullable": True},
+    },
+    "required": ["form_fields"],
+}
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*(.*?)```", re.DOTALL)
+# Repairs match string literals first and keep them as they are, so text
+# inside strings ("None of the above", "a, ]") is never rewritten
+_STRING = r'"(?:\\.|[^"\\])*"'
+_TRAILING_COMMA = re.compile(rf"({_STRING})|,\s*([}}\]])")
+_PYTHON_LITERALS = re.compile(rf"({_STRING})|(?<!\w)(True|False|None)(?!\w)")
+_JSON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_TRUE_STRINGS = {"true", "yes", "y", "1", "required"}
+
+
+class SchemaError(ValueError):
+    """Raised when a response cannot be repaired into the expected shape"""
+
+
+def _outermost_json(text: str) -> str:
+    """Slice from the first opening bracket to its matching closing bracket"""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    closing = "}" if text[start] == "{" else "]"
+    end = text.rfind(closing)
+    return text[start:end + 1] if end > start else text[start:]
+
+
+def repair_json(text: str) -> Tuple[Any, List[str]]:
+    """Parse LLM output as JSON, repairing common formatting mistakes.
+
+    Returns the parsed value and the list of repairs applied. Raises
+    SchemaError if the text cannot be made into valid JSON.
+    """
+    repairs = []
+    try:
+        return json.loads(text), repairs
+    except (TypeError, ValueError):
+        pass
+
+    candidate = text or ""
+    match = _FENCE.search(candidate)
+    if match:
+        candidate = match.group(1)
+        repairs.append("stripped markdown fences")
+
+    sliced = _outermost_json(candidate)
+    if sliced.strip() != candidate.strip():
+        candidate = sliced
+        repairs.append("removed surrounding prose")
+
+    for pattern, replace, note in (
+        (_TRAILING_COMMA, lambda m: m.group(2), "removed trailing commas"),
+        (_PYTHON_LITERALS, lambda m: _JSON_LITERALS[m.group(2)], "converted Python literals"),
+    ):
+        try:
+            return json.loads(candidate), repairs
+        except ValueError:
+            pass
+        fixed = pattern.sub(lambda m: m.group(1) if m.group(1) is not None else replace(m), candidate)
+        if fixed != candidate:
+            candidate = fixed
+            repairs.append(note)
+
+    try:
+        return json.loads(candidate), repairs
+    except ValueError as e:
+        raise SchemaError(f"Response is not valid JSON after repair: {e}") from e
+
+
+def _coerce_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    return str(value).strip().lower() in _TRUE_STRINGS
+
+
+def _coerce_optional_id(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return None if value.lower() in {"", "null", "none"} else value
+
+
+def validate_form_analysis(data: Any) -> Tuple[FormAnalysis, List[str]]:
+    """Validate parsed JSON against the FormAnalysis schema, coercing types.
+
+    Returns the FormAnalysis and a list describing every field that had to
+    be repaired. Raises SchemaError when the data is not a form analysis.
+    """
+    repairs = []
+    if isinstance(data, list) and len(data) == 1 and isinstance(data[0], dict):
+        data = data[0]
+        repairs.append("unwrapped single-element array")
+    if not isinstance(data, dict):
+        raise SchemaError(f"Expected a JSON object, got {type(data).__name__}")
+    if "form_fields" not in data:
+        raise SchemaError("Missing form_fields")
+
+    raw_fields = data["form_fields"]
+    if isinstance(raw_fields, dict):
+        raw_fields = [raw_fields]
+        repairs.append("form_fields: wrapped object in list")
+    elif not isinstance(raw_fields, list):
+        raise SchemaError("form_fields is not a list")
+
+    form_fields = []
+    for index, field in enumerate(raw_fields):
+        if not isinstance(field, dict):
+            repairs.append(f"form_fields[{index}]: dropped non-object entry")
+            continue
+
+        field = dict(field)
+        field_id = field.get("field_id") or field.get("id") or field.get("name")
+        if field_id in (None, ""):
+            repairs.append(f"form_fields[{index}]: dropped entry without field_id")
+            continue
+        if "field_id" not in field or not isinstance(field["field_id"], str):
+            repairs.append(f"form_fields[{index}].field_id")
+        field["field_id"] = str(field_id)
+
+        if not isinstance(field.get("field_type"), str) or not field.get("field_type"):
+            repairs.append(f"form_fields[{index}].field_type")
+            field["field_type"] = str(field.get("field_type") or field.get("type") or "text")
+        if not isinstance(field.get("label"), str):
+            repairs.append(f"form_fields[{index}].label")
+            field["label"] = str(field.get("label") or field["field_id"])
+        if "required" in field and not isinstance(field["required"], bool):
+            repairs.append(f"form_fields[{index}].required")
+            field["required"] = _coerce_bool(field["required"])
+        form_fields.append(field)
+
+    result = {"form_fields": form_fields}
+    for key in ("resume_upload_id", "submit_button_id"):
+        value = _coerce_optional_id(data.get(key))
+        if value != data.get(key):
+            repairs.append(key)
+        result[key] = value
+
+    return FormAnalysis.from_dict(result), repairs
+
+
+def parse_form_analysis(text: str) -> Tuple[FormAnalysis, List[str]]:
+    """Repair and validate a raw LLM response into a FormAnalysis"""
+    data, repairs = repair_json(text)
+    analysis, schema_repairs = validate_form_analysis(data)
+    return analysis, repairs + schema_repairs
@@ -0,0 +1,290 @@
+# src/utils/llm_gateway.py
+import asyncio
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Dict, List, Optional, Set, Tuple
+
+import requests
+
+from utils.json_repair import repair_json
+from utils.tracing import tracer
+
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+
+class LLMError(Exception):
+    """Raised when the LLM cannot produce a response within the retry budget"""
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate  # Tokens added per second
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class GeminiTransport:
+    """Blocking transport using the google-generativeai SDK"""
+
+    def __init__(self, api_key: Optional[str], model: str = DEFAULT_MODEL):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.model = genai.GenerativeModel(model)
+        # Older SDK releases reject structured-output settings and request options
+        self.structured_output = True
+        self.request_options = True
+
+    def generate(self, prompt: str, timeout: float, json_schema: Optional[Dict] = None) -> str:
+        if json_schema is not None and self.structured_output:
+            config = {"response_mime_type": "application/json", "response_schema": json_schema}
+            try:
+                return self._generate(prompt, timeout, generation_config=config)
+            except (TypeError, ValueError, KeyError, AttributeError) as e:
+                if _rejects_request_options(e):
+                    raise
+                self.structured_output = False
+        return self._generate(prompt, timeout)
+
+    def _generate(self, prompt: str, timeout: float, **kwargs) -> str:
+        # The SDK call itself is bounded, so a hung request does not hold an executor
+        # thread after the gateway has stopped waiting for it
+        if self.request_options:
+            try:
+                return self.model.generate_content(prompt, request_options={"timeout": timeout}, **kwargs).text
+            except (TypeError, ValueError) as e:
+                if not _rejects_request_options(e):
+                    raise
+                self.request_options = False
+        return self.model.generate_content(prompt, **kwargs).text
+
+
+def _rejects_request_options(error: Exception) -> bool:
+    # Releases without request options either reject the keyword (TypeError) or pass
+    # it on into the request proto (ValueError: Unknown field ... request_options)
+    return isinstance(error, (TypeError, ValueError)) and "request_options" in str(error)
+
+
+def _status_of(error: Exception) -> Optional[int]:
+    """HTTP status behind a transport error, if it carries one"""
+    response = getattr(error, "response", None)
+    status = getattr(response, "status_code", None)
+    if status is None:
+        # google.api_core exceptions carry the status as code
+        status = getattr(error, "code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether another attempt could succeed: timeouts, dropped connections, 429 and 5xx"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError,
+                          requests.Timeout, requests.ConnectionError)):
+        return True
+    status = _status_of(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+class RestTransport:
+    """Blocking transport speaking the Gemini REST API over a pooled session.
+
+    Point base_url at a local stub server (see utils/llm_stub.py) to run
+    without network access.
+    """
+
+    def __init__(self,
+                 base_url: str = "https://generativelanguage.googleapis.com",
+                 api_key: Optional[str] = None,
+                 model: str = DEFAULT_MODEL):
+        self.url = f"{base_url.rstrip('/')}/v1beta/models/{model}:generateContent"
+        self.api_key = api_key
+        self.session = requests.Session()
+
+    def generate(self, prompt: str, timeout: float, json_schema: Optional[Dict] = None) -> str:
+        params = {"key": self.api_key} if self.api_key else None
+        body = {"contents": [{"parts": [{"text": prompt}]}]}
+        if json_schema is not None:
+            body["generationConfig"] = {"responseMimeType": "application/json", "responseSchema": json_schema}
+        response = self.session.post(self.url, params=params, json=body, timeout=timeout)
+        response.raise_for_status()
+        candidates = response.json().get("candidates") or []
+        if not candidates:
+            raise LLMError("Response contained no candidates")
+        return "".join(part.get("text", "") for part in candidates[0]["content"]["parts"])
+
+
+class LLMGateway:
+    """Async front door for all LLM calls.
+
+    Requests go through a token-bucket rate limiter and an in-flight cap,
+    each attempt has a deadline, and failures are retried with jittered
+    exponential backoff. Batchable prompts that pile up while every slot
+    is busy are merged into a single request.
+    """
+
+    def __init__(self,
+                 transport,
+                 rate_per_second: float = 2.0,
+                 burst: int = 4,
+                 max_in_flight: int = 4,
+                 timeout: float = 30.0,
+                 max_retries: int = 3,
+                 backoff_base: float = 0.5,
+                 batch_size: int = 4):
+        self.transport = transport
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.batch_size = batch_size
+
+        self._bucket = TokenBucket(rate_per_second, burst)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        # Timed-out attempts keep their thread until the transport returns
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight * 2, thread_name_prefix="llm")
+        self._pending: List[Tuple[str, Optional[Dict], asyncio.Future]] = []
+        self._dispatcher: Optional[asyncio.Task] = None
+        # The event loop only keeps weak references to tasks
+        self._batches: Set[asyncio.Task] = set()
+
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "timeouts": 0,
+            "failures": 0,
+            "batches": 0,
+            "batched_prompts": 0,
+            "rate_limited_seconds": 0.0,
+        }
+
+    async def generate(self, prompt: str, batchable: bool = False, json_schema: Optional[Dict] = None) -> str:
+        """Send a prompt and return the response text.
+
+        With json_schema the model is asked for structured JSON output
+        matching the schema.
+        """
+        if not batchable or self.batch_size <= 1:
+            async with self._slots:
+                return await self._request(prompt, json_schema)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((prompt, json_schema, future))
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        return await future
+
+    async def _request(self, prompt: str, json_schema: Optional[Dict] = None) -> str:
+        """One logical request with per-attempt deadlines and jittered retries.
+
+        Only failures another attempt could fix are retried (see is_retryable);
+        anything else, e.g. a 400 or 401, fails the request at once.
+        """
+        loop = asyncio.get_running_loop()
+        last_error = None
+        with tracer.span("llm.request") as span:
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self.stats["retries"] += 1
+                    span.add("retries")
+                    # Full jitter keeps retries from synchronizing across workers
+                    await asyncio.sleep(random.uniform(0, self.backoff_base * (2 ** (attempt - 1))))
+
+                waited = await self._bucket.acquire()
+                self.stats["rate_limited_seconds"] += waited
+                self.stats["requests"] += 1
+                span.add("rate_limited_seconds", waited)
+                call = loop.run_in_executor(self._executor, partial(self.transport.generate, prompt, self.timeout, json_schema))
+                try:
+                    return await asyncio.wait_for(call, self.timeout)
+                except asyncio.TimeoutError as e:
+                    self.stats["timeouts"] += 1
+                    span.add("timeouts")
+                    last_error = e
+                except Exception as e:
+                    last_error = e
+                    if not is_retryable(e):
+                        break
+
+            self.stats["failures"] += 1
+        raise LLMError(f"LLM request failed after {attempt + 1} attempts: {last_error}")
+
+    async def _dispatch(self):
+        """Drain pending batchable prompts, merging those that queued up"""
+        while self._pending:
+            await self._slots.acquire()
+            # Only prompts sharing a response schema can be merged
+            schema = self._pending[0][1]
+            batch = [item for item in self._pending if item[1] == schema][:self.batch_size]
+            self._pending = [item for item in self._pending if not any(item is taken for taken in batch)]
+            task = asyncio.create_task(self._run_batch(batch, schema))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, Optional[Dict], asyncio.Future]], json_schema: Optional[Dict]):
+        try:
+            if len(batch) > 1:
+                answers = await self._request_batch([prompt for prompt, _, _ in batch], json_schema)
+            else:
+                answers = None
+
+            for index, (prompt, _, future) in enumerate(batch):
+                if future.done():
+                    continue
+                try:
+                    text = answers[index] if answers is not None else await self._request(prompt, json_schema)
+                    future.set_result(text)
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    async def _request_batch(self, prompts: List[str], json_schema: Optional[Dict] = None) -> Optional[List[str]]:
+        """Ask for several independent answers in one request.
+
+        Returns None when the combined response cannot be split, in which
+        case the prompts are sent individually.
+        """
+        tasks = "\n\n".join(f"### Task {i + 1}\n{prompt.strip()}" for i, prompt in enumerate(prompts))
+        combined = (
+            f"Answer each of the following {len(prompts)} tasks independently.\n"
+            f"Return only a JSON array with exactly {len(prompts)} elements, where "
+            f"element i is the JSON answer to task i.\n\n{tasks}"
+        )
+        batch_schema = {"type": "ARRAY", "items": json_schema} if json_schema is not None else None
+        try:
+            answers, _ = repair_json(await self._request(combined, batch_schema))
+        except (LLMError, ValueError):
+            return None
+        if not isinstance(answers, list) or len(answers) != len(prompts):
+            return None
+
+        self.stats["batches"] += 1
+        self.stats["batched_prompts"] += len(prompts)
+        tracer.count("llm_batched_prompts", len(prompts))
+        return [json.dumps(answer) for answer in answers]
+
+    def get_stats(self) -> Dict[str, float]:
+        return {**self.stats, "pending": len(self._pending)}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,125 @@
+# src/utils/llm_stub.py
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Union
+
+
+class StubLLMServer:
+    """Local stand-in for the Gemini REST endpoint.
+
+    Replays canned response texts (round-robin, or computed by a callable
+    from the prompt) after a configurable latency, so the LLM gateway can
+    be exercised without network access. Use with RestTransport:
+
+        with StubLLMServer(["{...}"], latency=0.2) as stub:
+            gateway = LLMGateway(RestTransport(base_url=stub.url))
+    """
+
+    def __init__(self,
+                 responses: Union[List[str], Callable[[str], str]],
+                 latency: float = 0.0,
+                 jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        self.responses = responses
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate  # Fraction of requests answered with HTTP 503
+        self.requests = 0
+        self.prompts: List[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _response_for(self, index: int, prompt: str) -> str:
+        if callable(self.responses):
+            return self.responses(prompt)
+        return self.responses[index % len(self.responses)]
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                prompt = "".join(
+                    part.get("text", "")
+                    for content in body.get("contents", [])
+                    for part in content.get("parts", [])
+                )
+                with stub._lock:
+                    index = stub.requests
+                    stub.requests += 1
+                    stub.prompts.append(prompt)
+
+                time.sleep(max(0.0, stub.latency + random.uniform(-stub.jitter, stub.jitter)))
+
+                if stub.error_rate and random.random() < stub.error_rate:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+
+                payload = json.dumps({
+                    "candidates": [{"content": {"parts": [{"text": stub._response_for(index, prompt)}]}}]
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StubLLMServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve canned Gemini responses locally")
+    parser.add_argument("responses", help="JSONL file, one response text (JSON string) per line")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    with open(args.responses) as f:
+        responses = [json.loads(line) for line in f if line.strip()]
+
+    server = StubLLMServer(responses, args.latency, args.jitter, args.error_rate, port=args.port)
+    print(f"Stub LLM listening on {server.url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+# src/utils/near_duplicates.py
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from models.data_models import JobListing
+from utils.job_sources import default_sources, split_board
+from utils.paths import cache_path
+from utils.relevance import token_hashes, tokenize
+from utils.url_tools import canonicalize_url
+
+# MinHash signature length, split into BANDS bands of ROWS values for LSH.
+# Postings with Jaccard similarity s share a band with probability
+# 1 - (1 - s ** ROWS) ** BANDS: 0.9998 at s = 0.8, 0.12 at s = 0.3.
+PERMUTATIONS = 64
+ROWS = 4
+BANDS = PERMUTATIONS // ROWS
+
+# Fixed seed: signatures stored by earlier runs must stay comparable
+_rng = np.random.default_rng(0x5EED)
+# Odd multipliers make every a * x + b (mod 2 ** 64) a permutation of hash values
+_MULTIPLIERS = _rng.integers(1, 2 ** 63, size=PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_OFFSETS = _rng.integers(0, 2 ** 63, size=PERMUTATIONS, dtype=np.uint64)
+_COMBINE = np.uint64(0x9E3779B97F4A7C15)
+_TITLE_SALT = np.uint64(0x7469746C65)
+
+# Host labels that name a careers site rather than a company
+_GENERIC_LABELS = {"www", "jobs", "careers", "boards", "job-boards", "apply"}
+
+# ATS hosts put the company in the path (boards.greenhouse.io/<company>/...)
+_ATS_SOURCES = default_sources()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    url TEXT PRIMARY KEY,
+    cluster TEXT NOT NULL,
+    company TEXT NOT NULL,
+    title TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_cluster ON postings (cluster);
+CREATE TABLE IF NOT EXISTS bands (
+    band_key INTEGER NOT NULL,
+    url TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bands_key ON bands (band_key);
+CREATE INDEX IF NOT EXISTS bands_url ON bands (url);
+"""
+
+
+def company_of(job: JobListing) -> str:
+    """Company a listing belongs to: its board on an ATS, else its host"""
+    _, board = split_board(job.domain)
+    for source in _ATS_SOURCES:
+        board = board or source.board_for(job.url)
+    if board:
+        return board.lower()
+    labels = [label for label in (urlsplit(job.url).hostname or "").split(".") if label not in _GENERIC_LABELS]
+    return labels[0] if labels else ""
+
+
+def _mix(hashes: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer, so every output bit depends on every input bit
+    hashes = hashes ^ (hashes >> np.uint64(30))
+    hashes = hashes * np.uint64(0xBF58476D1CE4E5B9)
+    hashes = hashes ^ (hashes >> np.uint64(27))
+    hashes = hashes * np.uint64(0x94D049BB133111EB)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+def _features(job: JobListing, words: np.ndarray) -> np.ndarray:
+    """Hashes of the description's word pairs and of the title's words"""
+    pairs = words[:-1] * _COMBINE + words[1:] if len(words) > 1 else words
+    return np.concatenate([pairs, token_hashes(job.title) ^ _TITLE_SALT])
+
+
+def minhash(job: JobListing, words: Optional[np.ndarray] = None) -> np.ndarray:
+    """MinHash signature of a listing's title and description (words: its description's token hashes)"""
+    features = _features(job, token_hashes(job.description) if words is None else words)
+    if not len(features):
+        return np.zeros(PERMUTATIONS, dtype=np.uint64)
+    # One row per feature, one column per permutation
+    return _mix(features[:, None] * _MULTIPLIERS + _OFFSETS).min(axis=0)
+
+
+def _band_keys(signature: np.ndarray, company: str) -> List[int]:
+    """LSH bucket of every band; only postings of the same company share buckets"""
+    rows = signature.reshape(BANDS, ROWS)
+    keys = _mix(np.arange(BANDS, dtype=np.uint64) + token_hashes(company).sum(dtype=np.uint64))
+    for column in range(ROWS):
+        keys = keys * _COMBINE + rows[:, column]
+    keys = _mix(keys)
+    # SQLite integers are signed 64-bit
+    return keys.view(np.int64).tolist()
+
+
+def _title_overlap(first: str, second: str) -> float:
+    first, second = set(tokenize(first)), set(tokenize(second))
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash index clustering near-duplicate job postings.
+
+    Two postings are the same role, e.g. one job posted on two boards or
+    under two URLs, when they belong to the same company, at least
+    title_overlap of their title words are shared and the estimated
+    Jaccard similarity of their descriptions' word pairs is at least
+    similarity. Signatures are banded into LSH buckets kept in an indexed
+    table, so finding candidates stays a few index probes however many
+    postings the index holds. Postings are keyed, and clusters named, by
+    canonical URL. Listings with fewer than min_tokens description words
+    are too thin to compare and are never treated as duplicates.
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 similarity: float = 0.8,
+                 title_overlap: float = 0.5,
+                 min_tokens: int = 10):
+        self.path = path or cache_path("near_duplicates.db")
+        self.similarity = similarity
+        self.title_overlap = title_overlap
+        self.min_tokens = min_tokens
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    def cluster_of(self, job: JobListing) -> Optional[str]:
+        """Add a listing; returns the representative's canonical URL if it duplicates another posting"""
+        words = token_hashes(job.description)
+        if len(words) < self.min_tokens:
+            return None
+        canonical = canonicalize_url(job.url)
+        company = company_of(job)
+        signature = minhash(job, words)
+        keys = _band_keys(signature, company)
+
+        with self._lock, self.connection:
+            rows = self.connection.execute(
+                "SELECT DISTINCT p.url, p.cluster, p.title, p.signature FROM bands b "
+                f"JOIN postings p ON p.url = b.url WHERE b.band_key IN ({', '.join('?' * len(keys))})",
+                keys
+            ).fetchall()
+            cluster = None
+            for url, row_cluster, title, row_signature in rows:
+                # A posting never duplicates itself or the copies clustered under it
+                if url == canonical or row_cluster == canonical:
+                    continue
+                estimate = np.count_nonzero(np.frombuffer(row_signature, dtype=np.uint64) == signature) / PERMUTATIONS
+                if estimate >= self.similarity and _title_overlap(title, job.title) >= self.title_overlap:
+                    cluster = row_cluster
+                    break
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO postings (url, cluster, company, title, signature, added_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (canonical, cluster or canonical, company, job.title, signature.tobytes(), time.time())
+            )
+            self.connection.execute("DELETE FROM bands WHERE url = ?", (canonical,))
+            self.connection.executemany("INSERT INTO bands (band_key, url) VALUES (?, ?)",
+                                        [(key, canonical) for key in keys])
+        return cluster
+
+    def forget(self, urls: Iterable[str]) -> List[str]:
+        """Drop postings and every posting clustered under them; returns all canonical URLs dropped"""
+        urls = [canonicalize_url(url) for url in urls]
+        dropped = set(urls)
+        with self._lock, self.connection:
+            for url in urls:
+                dropped.update(row[0] for row in self.connection.execute(
+                    "SELECT url FROM postings WHERE cluster = ?", (url,)
+                ))
+            rows = [(url,) for url in dropped]
+            self.connection.executemany("DELETE FROM postings WHERE url = ?", rows)
+            self.connection.executemany("DELETE FROM bands WHERE url = ?", rows)
+        return sorted(dropped)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,13 @@
+# src/utils/paths.py
+import os
+
+# Root directory for caches and stores that persist between runs
+CACHE_DIR_ENV = "JOB_APPLICATOR_CACHE_DIR"
+DEFAULT_CACHE_DIR = ".cache"
+
+
+def cache_path(filename: str) -> str:
+    """Path of a persistent cache file, creating the cache directory if needed"""
+    cache_dir = os.getenv(CACHE_DIR_ENV, DEFAULT_CACHE_DIR)
+    os.makedirs(cache_dir, exist_ok=True)
+    return os.path.join(cache_dir, filename)
@@ -0,0 +1,162 @@
+# src/utils/pipeline.py
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Optional
+
+# Marks the end of the stream on a stage queue
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """A pipeline stage run by a fixed number of concurrent workers.
+
+    The handler receives one item and returns the item for the next stage.
+    Returning None drops the item. With fan_out=True the handler returns an
+    iterable (or async iterable) and every element is forwarded separately.
+    With batch=True the stage is a barrier: once the previous stage is done,
+    the handler receives a list of every item and returns the items to
+    forward. A batch stage always has a single worker.
+    """
+    name: str
+    handler: Callable[[Any], Awaitable[Any]]
+    workers: int = 1
+    queue_size: int = 0  # 0 means 2 * workers
+    fan_out: bool = False
+    batch: bool = False
+
+    def __post_init__(self):
+        if self.batch:
+            self.workers = 1
+
+
+class StagedPipeline:
+    """Bounded-concurrency pipeline of stages connected by queues.
+
+    Every stage reads from its own bounded input queue, so a slow stage
+    applies backpressure to the stages in front of it. Results of the last
+    stage are yielded in completion order.
+    """
+
+    def __init__(self,
+                 stages: List[Stage],
+                 on_error: Optional[Callable[[str, Any, Exception], None]] = None):
+        if not stages:
+            raise ValueError("StagedPipeline needs at least one stage")
+        self.stages = stages
+        self.on_error = on_error
+
+    async def run(self, source) -> AsyncIterator[Any]:
+        """Feed items from source through all stages and yield the results"""
+        queues = [
+            asyncio.Queue(maxsize=stage.queue_size or 2 * max(stage.workers, 1))
+            for stage in self.stages
+        ]
+        output = asyncio.Queue()
+        queues.append(output)
+
+        tasks = [asyncio.create_task(self._feed(source, queues[0], self.stages[0].workers))]
+        for index, stage in enumerate(self.stages):
+            downstream = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            tasks.append(asyncio.create_task(
+                self._run_stage(stage, queues[index], queues[index + 1], downstream)
+            ))
+
+        try:
+            while True:
+                item = await output.get()
+                if item is _DONE:
+                    break
+                yield item
+            # Surface unexpected failures in the feeder or stage supervisors
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _feed(self, source, queue: asyncio.Queue, consumers: int):
+        """Push source items onto the first stage queue"""
+        error = None
+        try:
+            if hasattr(source, "__aiter__"):
+                async for item in source:
+                    await queue.put(item)
+            else:
+                for item in source:
+                    await queue.put(item)
+        except Exception as e:
+            error = e
+
+        # Close the stage even when the source failed so the pipeline drains
+        for _ in range(max(consumers, 1)):
+            await queue.put(_DONE)
+        if error is not None:
+            raise error
+
+    async def _run_stage(self, stage: Stage, inbox: asyncio.Queue,
+                         outbox: asyncio.Queue, consumers: int):
+        """Run the workers of one stage and close the downstream queue"""
+        worker = self._batch_worker if stage.batch else self._worker
+        workers = [
+            asyncio.create_task(worker(stage, inbox, outbox))
+            for _ in range(max(stage.workers, 1))
+        ]
+        try:
+            await asyncio.gather(*workers)
+        except asyncio.CancelledError:
+            for worker in workers:
+                worker.cancel()
+            raise
+
+        for _ in range(max(consumers, 1)):
+            await outbox.put(_DONE)
+
+    async def _worker(self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+
+            try:
+                result = await stage.handler(item)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(stage.name, item, e)
+                continue
+
+            if result is None:
+                continue
+
+            if not stage.fan_out:
+                await outbox.put(result)
+            elif hasattr(result, "__aiter__"):
+                try:
+                    async for element in result:
+                        await outbox.put(element)
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(stage.name, item, e)
+            else:
+                for element in result:
+                    await outbox.put(element)
+
+
+    async def _batch_worker(self, stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        items = []
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            items.append(item)
+
+        try:
+            result = await stage.handler(items)
+        except Exception as e:
+            if self.on_error:
+                self.on_error(stage.name, items, e)
+            return
+
+        for element in result or []:
+            await outbox.put(element)
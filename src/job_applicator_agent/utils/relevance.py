@@ -0,0 +1,134 @@
+# src/utils/relevance.py
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.data_models import JobCriteria, JobListing, UserDetails
+
+# Bytes that make up tokens: lowercase letters, digits, "+" and "#" (c++, c#)
+# and every byte of a multi-byte UTF-8 character
+_TOKEN_BYTES = np.zeros(256, dtype=bool)
+_TOKEN_BYTES[list(b"abcdefghijklmnopqrstuvwxyz0123456789+#")] = True
+_TOKEN_BYTES[128:] = True
+
+_HASH_BASE = np.uint64(1099511628211)
+
+
+def _spans(chars: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and end offsets of the tokens in lowercase UTF-8 bytes"""
+    in_token = _TOKEN_BYTES[chars]
+    # A dot between two token bytes belongs to the token (node.js, asp.net)
+    if len(chars) > 2:
+        in_token[1:-1] |= (chars[1:-1] == ord(".")) & in_token[:-2] & in_token[2:]
+    padded = np.concatenate(([False], in_token, [False]))
+    return np.flatnonzero(padded[1:] & ~padded[:-1]), np.flatnonzero(padded[:-1] & ~padded[1:])
+
+
+def _shape_keys(chars: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Length, first and last byte of every token; equal tokens have equal keys"""
+    return ((ends - starts) << 16) | (chars[starts].astype(np.int64) << 8) | chars[ends - 1]
+
+
+def _hashes(chars: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """64-bit polynomial hash of every token"""
+    if not len(starts):
+        return np.zeros(0, dtype=np.uint64)
+    # Offset of each token byte within its token, and base ** offset (wrapping mod 2**64)
+    lengths = ends - starts
+    firsts = np.cumsum(lengths) - lengths
+    offsets = np.arange(int(lengths.sum())) - np.repeat(firsts, lengths)
+    powers = np.ones(int(lengths.max()), dtype=np.uint64)
+    powers[1:] = np.cumprod(np.full(len(powers) - 1, _HASH_BASE, dtype=np.uint64))
+    terms = chars[np.repeat(starts, lengths) + offsets].astype(np.uint64) * powers[offsets]
+    return np.add.reduceat(terms, firsts)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens, keeping terms like c++, c# and node.js whole"""
+    data = text.lower().encode("utf-8") if text else b""
+    starts, ends = _spans(np.frombuffer(data, dtype=np.uint8))
+    return [data[start:end].decode("utf-8", errors="ignore") for start, end in zip(starts, ends)]
+
+
+def token_hashes(text: str) -> np.ndarray:
+    """64-bit hash of every token in text, split as tokenize() splits it"""
+    chars = np.frombuffer(text.lower().encode("utf-8") if text else b"", dtype=np.uint8)
+    starts, ends = _spans(chars)
+    return _hashes(chars, starts, ends)
+
+
+def query_terms(criteria: JobCriteria, user_details: Optional[UserDetails] = None) -> List[str]:
+    """Terms listings are ranked against: the criteria keywords and the user's skills"""
+    phrases = list(criteria.keywords or [])
+    if user_details is not None:
+        phrases += user_details.skills or []
+    return [term for phrase in phrases for term in tokenize(phrase)]
+
+
+class BM25Ranker:
+    """Okapi BM25 relevance of listings' title and description to a query.
+
+    The batch of listings being ranked is the corpus for document
+    frequencies. All listings are tokenized together as one byte array;
+    token boundaries, matches against the query terms (by a cheap shape
+    key, then a hash) and the (listings x query terms) count matrix are
+    each a few NumPy passes, so thousands of listings take milliseconds.
+    Title terms count title_weight times.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, title_weight: int = 2):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+
+    def score(self, terms: Sequence[str], listings: Sequence[JobListing]) -> np.ndarray:
+        """Score of every listing, in order; terms repeated in the query weigh more"""
+        count = len(listings)
+        if not count or not terms:
+            return np.zeros(count)
+
+        # Every query term is a single token, so the query tokens line up with terms
+        query = np.frombuffer(" ".join(terms).encode("utf-8"), dtype=np.uint8)
+        query_starts, query_ends = _spans(query)
+        vocabulary, query_weights = np.unique(_hashes(query, query_starts, query_ends), return_counts=True)
+        size = len(vocabulary)
+
+        documents = [
+            " ".join([job.title] * self.title_weight + [job.description]).lower().encode("utf-8")
+            for job in listings
+        ]
+        # Documents are joined by a newline, which never belongs to a token
+        chars = np.frombuffer(b"\n".join(documents), dtype=np.uint8)
+        document_starts = np.cumsum([0] + [len(document) + 1 for document in documents[:-1]])
+        starts, ends = _spans(chars)
+        owners = np.searchsorted(document_starts, starts, side="right") - 1
+        lengths = np.bincount(owners, minlength=count).astype(float)
+
+        # Only tokens shaped like a query term are hashed and looked up
+        candidates = np.flatnonzero(np.isin(_shape_keys(chars, starts, ends),
+                                            _shape_keys(query, query_starts, query_ends)))
+        hashes = _hashes(chars, starts[candidates], ends[candidates])
+        positions = np.minimum(np.searchsorted(vocabulary, hashes), size - 1)
+        matched = vocabulary[positions] == hashes
+        tf = np.bincount(owners[candidates[matched]] * size + positions[matched],
+                         minlength=count * size).reshape(count, size).astype(float)
+
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((count - df + 0.5) / (df + 0.5))
+        average_length = lengths.mean() or 1.0
+        norm = self.k1 * (1 - self.b + self.b * lengths / average_length)
+        saturated = tf * (self.k1 + 1) / (tf + norm[:, None])
+        return saturated @ (idf * query_weights)
+
+
+def select_top(scores: np.ndarray, top_k: Optional[int] = None, min_score: Optional[float] = None) -> np.ndarray:
+    """Indices of the best scores, best first: at most top_k of them, none below min_score"""
+    candidates = np.arange(len(scores))
+    if min_score is not None:
+        candidates = candidates[scores >= min_score]
+    if top_k is not None and top_k <= 0:
+        return candidates[:0]
+    if top_k is not None and top_k < len(candidates):
+        # Partial selection first, so only the kept scores are sorted
+        candidates = candidates[np.argpartition(-scores[candidates], top_k - 1)[:top_k]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
@@ -0,0 +1,117 @@
+# src/utils/seen_store.py
+import fcntl
+import hashlib
+import math
+import os
+from typing import Optional
+
+from utils.paths import cache_path
+from utils.url_tools import canonicalize_url
+
+
+def _digest(url: str) -> bytes:
+    return hashlib.sha256(canonicalize_url(url).encode("utf-8")).digest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over byte digests"""
+
+    def __init__(self, capacity: int, error_rate: float, bits: Optional[bytearray] = None):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        # A filter saved with different parameters cannot be reused
+        length = (self.size + 7) // 8
+        self.bits = bits if bits is not None and len(bits) == length else bytearray(length)
+
+    def _positions(self, digest: bytes):
+        # Double hashing: position_i = h1 + i * h2
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, digest: bytes):
+        for position in self._positions(digest):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, digest: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(digest))
+
+
+class SeenJobStore:
+    """Persistent record of job postings already processed in earlier runs.
+
+    URLs are canonicalized before hashing. The exact mode keeps a set of
+    digests and appends new ones to a log file; the compact mode keeps a
+    Bloom filter instead (a few bits per posting, with a small
+    false-positive rate that causes a posting to be skipped wrongly).
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 bloom: bool = False,
+                 capacity: int = 1_000_000,
+                 error_rate: float = 0.001):
+        self.bloom = bloom
+        self.path = path or cache_path("seen_jobs.bloom" if bloom else "seen_jobs.log")
+        self._dirty = False
+
+        if bloom:
+            bits = None
+            if os.path.exists(self.path):
+                with open(self.path, "rb") as f:
+                    bits = bytearray(f.read())
+            self._filter = BloomFilter(capacity, error_rate, bits)
+            self._log = None
+        else:
+            self._digests = set()
+            if os.path.exists(self.path):
+                with open(self.path, "r") as f:
+                    self._digests.update(line.strip() for line in f if line.strip())
+            self._log = open(self.path, "a")
+
+    def __contains__(self, url: str) -> bool:
+        digest = _digest(url)
+        if self.bloom:
+            return digest in self._filter
+        return digest[:16].hex() in self._digests
+
+    def add(self, url: str):
+        digest = _digest(url)
+        if self.bloom:
+            self._filter.add(digest)
+        else:
+            key = digest[:16].hex()
+            if key in self._digests:
+                return
+            self._digests.add(key)
+            self._log.write(key + "\n")
+        self._dirty = True
+
+    def flush(self):
+        if not self._dirty:
+            return
+        if self.bloom:
+            # Other processes (e.g. the shards of a sharded run) may have saved the
+            # filter since it was loaded; a union of Bloom filters is their bitwise OR
+            with open(f"{self.path}.lock", "w") as lock:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                if os.path.exists(self.path):
+                    with open(self.path, "rb") as f:
+                        saved = f.read()
+                    if len(saved) == len(self._filter.bits):
+                        merged = int.from_bytes(saved, "little") | int.from_bytes(self._filter.bits, "little")
+                        self._filter.bits = bytearray(merged.to_bytes(len(saved), "little"))
+                tmp_path = f"{self.path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(self._filter.bits)
+                os.replace(tmp_path, self.path)
+        else:
+            self._log.flush()
+        self._dirty = False
+
+    def close(self):
+        self.flush()
+        if self._log is not None:
+            self._log.close()
+            self._log = None
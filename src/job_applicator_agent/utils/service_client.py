@@ -0,0 +1,89 @@
+# src/utils/service_client.py
+import os
+import time
+from dataclasses import asdict, is_dataclass
+from typing import Dict, Iterator, List, Optional
+
+import requests
+
+from models.data_models import ApplicationResult
+
+# Set to the daemon's address (e.g. http://127.0.0.1:8765) to use it
+DAEMON_URL_ENV = "JOB_APPLICATOR_DAEMON_URL"
+
+
+class ServiceError(RuntimeError):
+    pass
+
+
+def daemon_url() -> Optional[str]:
+    """Address of the running job application service, if one is configured"""
+    return os.environ.get(DAEMON_URL_ENV) or None
+
+
+class ServiceClient:
+    """Thin client for the job application service in daemon.py"""
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 10):
+        self.base_url = (base_url or daemon_url() or "").rstrip("/")
+        if not self.base_url:
+            raise ServiceError(f"No service address given and {DAEMON_URL_ENV} is not set")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _request(self, method: str, path: str, **kwargs) -> Dict:
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise ServiceError(f"Job application service unreachable at {self.base_url}: {e}") from e
+        if response.status_code >= 400:
+            raise ServiceError(response.json().get("error", f"HTTP {response.status_code}"))
+        return response.json()
+
+    def health(self) -> Dict:
+        return self._request("GET", "/health")
+
+    def stats(self) -> Dict:
+        return self._request("GET", "/stats")
+
+    def submit(self, user_details, job_criteria, domains: List[str],
+               top_k: Optional[int] = None, min_score: Optional[float] = None) -> str:
+        """Queue a job; user_details and job_criteria may be dataclasses or dicts
+
+        top_k and min_score, if given, override the service's ranking settings.
+        """
+        payload = {
+            "user_details": asdict(user_details) if is_dataclass(user_details) else user_details,
+            "job_criteria": asdict(job_criteria) if is_dataclass(job_criteria) else job_criteria,
+            "domains": list(domains),
+        }
+        if top_k is not None:
+            payload["top_k"] = top_k
+        if min_score is not None:
+            payload["min_score"] = min_score
+        return self._request("POST", "/jobs", json=payload)["job_id"]
+
+    def job(self, job_id: str, since: int = 0) -> Dict:
+        return self._request("GET", f"/jobs/{job_id}", params={"since": since})
+
+    def iter_results(self, job_id: str, poll_interval: float = 0.5) -> Iterator[ApplicationResult]:
+        """Yield each result of a job as the service records it"""
+        since = 0
+        while True:
+            job = self.job(job_id, since)
+            for record in job["results"]:
+                yield ApplicationResult.from_record(record)
+            since = job["next"]
+            if job["status"] == "failed":
+                raise ServiceError(f"Job {job_id} failed: {job['error']}")
+            if job["status"] == "done":
+                return
+            time.sleep(poll_interval)
+
+    def run(self, user_details, job_criteria, domains: List[str],
+            top_k: Optional[int] = None, min_score: Optional[float] = None) -> List[ApplicationResult]:
+        """Submit a job and wait for all of its results"""
+        return list(self.iter_results(self.submit(user_details, job_criteria, domains, top_k, min_score)))
+
+    def close(self):
+        self.session.close()
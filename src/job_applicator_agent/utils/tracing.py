@@ -0,0 +1,283 @@
+# src/utils/tracing.py
+import contextvars
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.paths import cache_path
+
+# Set to a directory to enable tracing; traces and metrics are written there
+TRACE_DIR_ENV = "JOB_APPLICATOR_TRACE_DIR"
+
+# Upper bounds (seconds) of the span duration histogram buckets
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "job_applicator"
+
+# The job a span belongs to, inherited by every span opened inside job_scope()
+_current_job: contextvars.ContextVar = contextvars.ContextVar("trace_job", default=None)
+
+
+class _NoopSpan:
+    """Shared stand-in returned while tracing is disabled"""
+    recording = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+    def add(self, key: str, value: float = 1):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """A timed operation with attributes, e.g. a page load or an LLM request"""
+    recording = True
+    __slots__ = ("tracer", "name", "attrs", "start_ns", "end_ns", "thread_id")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+        job = _current_job.get()
+        if job is not None:
+            attrs.setdefault("job", job)
+        self.start_ns = 0
+        self.end_ns = 0
+        self.thread_id = 0
+
+    def __enter__(self):
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer._finish(self)
+        return False
+
+    @property
+    def duration(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key: str, value: float = 1):
+        self.attrs[key] = self.attrs.get(key, 0) + value
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{_metric_name(k)}="{_label_value(v)}"' for k, v in labels) + "}"
+
+
+class Tracer:
+    """Collects spans and counters in memory.
+
+    While disabled, span() hands out a shared no-op object and count()
+    returns immediately, so instrumented code pays one attribute check.
+    Span durations feed a histogram per span name, and numeric span
+    attributes (bytes, tokens, retries, cache hits) are summed into
+    counters. Spans export as Chrome trace JSON (chrome://tracing or
+    Perfetto) and metrics as Prometheus text.
+    """
+
+    def __init__(self, enabled: bool = False, directory: Optional[str] = None, max_spans: int = 100_000):
+        self.enabled = enabled
+        self.directory = directory
+        self.max_spans = max_spans  # Older spans stop being kept; metrics still update
+
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+        self._spans: List[Span] = []
+        self._dropped = 0
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._histograms: Dict[str, List[float]] = {}
+
+    def span(self, name: str, **attrs):
+        """Context manager timing the enclosed block"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def job_scope(self, job: str):
+        """Attribute every span opened inside the block to a job"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _JobScope(job)
+
+    def count(self, name: str, value: float = 1, **labels):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def _finish(self, span: Span):
+        duration = span.duration
+        with self._lock:
+            if len(self._spans) < self.max_spans:
+                self._spans.append(span)
+            else:
+                self._dropped += 1
+
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                # One slot per bucket, then sum and count
+                histogram = self._histograms[span.name] = [0] * (len(DURATION_BUCKETS) + 2)
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    histogram[index] += 1
+            histogram[-2] += duration
+            histogram[-1] += 1
+
+            for key, value in span.attrs.items():
+                if isinstance(value, (int, float)):
+                    counter = (f"span_{key}", (("span", span.name),))
+                    self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def span_durations(self) -> Dict[str, List[float]]:
+        """Durations in seconds of the kept spans, by span name"""
+        durations: Dict[str, List[float]] = {}
+        with self._lock:
+            for span in self._spans:
+                durations.setdefault(span.name, []).append(span.duration)
+        return durations
+
+    def counters(self) -> Dict[str, float]:
+        """Counter totals by name, summed over labels"""
+        totals: Dict[str, float] = {}
+        with self._lock:
+            for (name, _), value in self._counters.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
+
+    def chrome_trace(self) -> Dict:
+        """Spans in the Chrome trace event format.
+
+        Spans that belong to a job are drawn on one track per job, the
+        others on the track of the thread that ran them.
+        """
+        pid = os.getpid()
+        events = []
+        tracks: Dict[str, int] = {}
+        with self._lock:
+            spans = list(self._spans)
+        for span in spans:
+            job = span.attrs.get("job")
+            if job is not None:
+                if job not in tracks:
+                    tracks[job] = len(tracks) + 1
+                    events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tracks[job],
+                                   "args": {"name": str(job)}})
+                tid = tracks[job]
+            else:
+                tid = span.thread_id
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": (span.start_ns - self._origin_ns) / 1000,
+                "dur": (span.end_ns - span.start_ns) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": {key: value if isinstance(value, (int, float, bool)) else str(value)
+                         for key, value in span.attrs.items()},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"dropped_spans": self._dropped}}
+
+    def prometheus_text(self) -> str:
+        """Counters and span duration histograms in the Prometheus text format"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((name, list(values)) for name, values in self._histograms.items())
+
+        by_name: Dict[str, List] = {}
+        for (name, labels), value in counters:
+            by_name.setdefault(name, []).append((labels, value))
+        for name, samples in by_name.items():
+            metric = f"{METRIC_PREFIX}_{_metric_name(name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for labels, value in samples:
+                lines.append(f"{metric}{_labels(labels)} {value:g}")
+
+        if histograms:
+            metric = f"{METRIC_PREFIX}_span_duration_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, values in histograms:
+                for index, bound in enumerate(DURATION_BUCKETS):
+                    lines.append(f"{metric}_bucket{_labels((('span', name), ('le', f'{bound:g}')))} {values[index]}")
+                lines.append(f"{metric}_bucket{_labels((('span', name), ('le', '+Inf')))} {values[-1]}")
+                lines.append(f"{metric}_sum{_labels((('span', name),))} {values[-2]:.6f}")
+                lines.append(f"{metric}_count{_labels((('span', name),))} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+    def export(self, directory: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Write trace.json and metrics.prom; returns their paths"""
+        if not self.enabled:
+            return None
+        directory = directory or self.directory or cache_path("trace")
+        os.makedirs(directory, exist_ok=True)
+        trace_path = os.path.join(directory, "trace.json")
+        metrics_path = os.path.join(directory, "metrics.prom")
+
+        for path, content in ((trace_path, json.dumps(self.chrome_trace())),
+                              (metrics_path, self.prometheus_text())):
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        return trace_path, metrics_path
+
+    def reset(self):
+        with self._lock:
+            self._spans = []
+            self._dropped = 0
+            self._counters = {}
+            self._histograms = {}
+            self._origin_ns = time.perf_counter_ns()
+
+
+class _JobScope:
+    __slots__ = ("job", "token")
+
+    def __init__(self, job: str):
+        self.job = job
+        self.token = None
+
+    def __enter__(self):
+        self.token = _current_job.set(self.job)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_job.reset(self.token)
+        return False
+
+
+# Process-wide tracer used by every agent
+tracer = Tracer(enabled=bool(os.environ.get(TRACE_DIR_ENV)), directory=os.environ.get(TRACE_DIR_ENV) or None)
@@ -0,0 +1,59 @@
+# src/utils/url_tools.py
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {
+    "gclid", "fbclid", "msclkid", "mc_cid", "mc_eid", "ref", "referrer",
+    "source", "src", "gh_src", "lever-source", "lever-origin", "trk", "trackingid",
+}
+TRACKING_PREFIXES = ("utm_", "lever-source")
+
+# Local servers (benchmarks, fixtures) only speak plain http
+LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+
+def unwrap_search_redirect(href: str) -> str:
+    """Return the target of a Google "/url?q=..." result link, or href unchanged"""
+    parts = urlsplit(href)
+    if parts.path == "/url" and (not parts.netloc or "google." in parts.netloc):
+        for key, value in parse_qsl(parts.query):
+            if key in ("q", "url") and value.startswith("http"):
+                return value
+    return href
+
+
+def canonicalize_url(url: str) -> str:
+    """Key under which different links to the same posting compare equal.
+
+    Lowercases scheme and host, upgrades http to https (except on
+    loopback hosts, which serve local fixtures), drops "www.", default
+    ports, fragments, trailing slashes and tracking parameters, and sorts
+    the remaining query parameters. The result is for comparisons only:
+    the site may not serve it, so pages are always loaded from the
+    original link.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if scheme == "http" and host not in LOOPBACK_HOSTS:
+        scheme = "https"
+
+    if host.startswith("www."):
+        host = host[4:]
+    if ":" in host:
+        # IPv6 literals keep their brackets in a netloc
+        host = f"[{host}]"
+    port = parts.port
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted(
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ""))
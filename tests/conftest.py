@@ -0,0 +1,17 @@
+# tests/conftest.py
+import os
+import sys
+
+import pytest
+
+# Modules import each other flat from the agent's source directory
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "job_applicator_agent")
+sys.path.insert(0, SOURCE_DIR)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep every persistent cache and store a test opens inside its own directory"""
+    directory = tmp_path / "cache"
+    monkeypatch.setenv("JOB_APPLICATOR_CACHE_DIR", str(directory))
+    return directory
@@ -0,0 +1,58 @@
+# tests/test_application_store.py
+from datetime import datetime
+
+import pytest
+
+from models.data_models import ApplicationResult, JobListing
+from utils.application_store import ApplicationStore, default_store_path
+
+
+def result(number: int, domain: str = "lever.co", success: bool = True, day: int = 1) -> ApplicationResult:
+    job = JobListing(url=f"https://jobs.{domain}/acme/{number}", domain=domain, title=f"Engineer {number}")
+    return ApplicationResult(job=job, success=success, timestamp=datetime(2024, 1, day, 12, 0))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ApplicationStore(str(tmp_path / "applications.db"))
+    yield store
+    store.close()
+
+
+def numbers(rows):
+    return [int(result.job.url.rsplit("/", 1)[1]) for _, result in rows]
+
+
+def test_default_path_is_in_the_cache_directory(cache_dir):
+    store = ApplicationStore()
+    assert store.path == default_store_path() == str(cache_dir / "applications.db")
+    store.close()
+
+
+def test_cursor_pages_newest_first_and_oldest_first(store):
+    for number in range(5):
+        store.add(result(number))
+
+    first = store.query(limit=2)
+    assert numbers(first) == [4, 3]
+    assert numbers(store.query(limit=2, cursor=first[-1][0])) == [2, 1]
+
+    first = store.query(limit=2, oldest_first=True)
+    assert numbers(first) == [0, 1]
+    assert numbers(store.query(limit=2, cursor=first[-1][0], oldest_first=True)) == [2, 3]
+
+
+def test_filters_count_and_summary(store):
+    store.add(result(1, "lever.co", success=True, day=1))
+    store.add(result(2, "lever.co", success=False, day=5))
+    store.add(result(3, "greenhouse.io", success=False, day=5), run_id="run")
+
+    assert numbers(store.query(limit=None, domain="lever.co", success=False)) == [2]
+    assert numbers(store.query(limit=None, since=datetime(2024, 1, 3))) == [3, 2]
+    assert numbers(store.query(limit=None, run_id="run")) == [3]
+    assert numbers(store.query(limit=None, url="https://JOBS.lever.co/acme/1?utm_source=x")) == [1]
+    assert store.count(success=False) == 2
+    assert store.summary() == [
+        {"domain": "lever.co", "total": 2, "successes": 1, "failures": 1},
+        {"domain": "greenhouse.io", "total": 1, "successes": 0, "failures": 1},
+    ]
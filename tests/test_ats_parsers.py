@@ -0,0 +1,34 @@
+# tests/test_ats_parsers.py
+from bs4 import BeautifulSoup
+
+from utils.ats_parsers import extract_form
+from utils.board_stub import StubJobBoardServer
+
+DOMAINS = ["acme.greenhouse.test", "acme.lever.test", "acme.workday.test"]
+
+
+def extract(board, domain):
+    return extract_form(board.job_url(domain, 1), BeautifulSoup(board.job_page(domain, 1), "html.parser"))
+
+
+def test_stub_postings_are_parsed_by_their_ats_extractor_when_served_as_ats():
+    with StubJobBoardServer(templates=2) as board:
+        assert [extract(board, domain) for domain in DOMAINS] == [None, None, None]
+
+        board.serve_as_ats(DOMAINS)
+        extractions = [extract(board, domain) for domain in DOMAINS]
+        assert [extraction.extractor for extraction in extractions] == ["greenhouse", "lever", "workday"]
+        for extraction in extractions:
+            assert extraction.analysis.resume_upload_id and extraction.analysis.submit_button_id
+            # Template 1 adds one extra question to the standard fields
+            assert any("template1_q0" in field.field_id for field in extraction.analysis.form_fields)
+
+    # Stopping the board drops its aliases
+    assert extract(board, DOMAINS[0]) is None
+
+
+def test_aliases_only_cover_the_served_domains():
+    with StubJobBoardServer() as board:
+        board.serve_as_ats(DOMAINS[:1])
+        assert extract(board, DOMAINS[0]).extractor == "greenhouse"
+        assert extract(board, "other.greenhouse.test") is None
@@ -0,0 +1,67 @@
+# tests/test_benchmark_report.py
+import copy
+import json
+
+import pytest
+
+from utils.benchmark_report import DEFAULT_BASELINE, compare_to_baseline, percentile, summarize
+
+
+@pytest.fixture
+def baseline():
+    with open(DEFAULT_BASELINE) as f:
+        return json.load(f)
+
+
+def timed(baseline, jobs_per_minute=60.0, p95=0.5):
+    """The committed baseline as the reference runner would record it"""
+    timed = copy.deepcopy(baseline)
+    timed["jobs_per_minute"] = jobs_per_minute
+    timed["stages"] = {"coordinator.analyze": {"count": 30, "p50": 0.2, "p95": p95, "p99": p95, "max": p95}}
+    return timed
+
+
+def report_like(baseline, **changes):
+    report = {"successful": baseline["jobs"], "jobs_per_minute": 0.0, **copy.deepcopy(baseline), **changes}
+    report.setdefault("stages", {})
+    return report
+
+
+def test_committed_baseline_covers_the_default_run(baseline):
+    assert baseline["config"]["domains"] * baseline["config"]["jobs_per_domain"] == baseline["jobs"]
+    assert compare_to_baseline(report_like(baseline), baseline) == []
+
+
+def test_dropped_jobs_are_a_regression(baseline):
+    regressions = compare_to_baseline(report_like(baseline, jobs=baseline["jobs"] - 1), baseline)
+    assert len(regressions) == 1 and "jobs processed" in regressions[0]
+
+
+def test_reports_of_another_config_are_not_compared(baseline):
+    config = {**baseline["config"], "browsers": 1}
+    regressions = compare_to_baseline(report_like(baseline, config=config, jobs=0), baseline)
+    assert len(regressions) == 1 and regressions[0].startswith("Config differs")
+
+
+def test_slowdowns_beyond_the_tolerance_are_regressions(baseline):
+    reference = timed(baseline)
+    assert compare_to_baseline(report_like(reference, jobs_per_minute=50.0), reference) == []
+    assert compare_to_baseline(report_like(reference, jobs_per_minute=40.0), reference) != []
+
+    slower = report_like(reference, stages=timed(baseline, p95=0.7)["stages"])
+    assert [regression.split()[:2] for regression in compare_to_baseline(slower, reference)] == [
+        ["coordinator.analyze", "p95"], ["coordinator.analyze", "p99"]
+    ]
+
+
+def test_changes_under_the_noise_floor_are_ignored(baseline):
+    reference = timed(baseline, p95=0.001)
+    jittery = report_like(reference, stages=timed(baseline, p95=0.004)["stages"])
+    assert compare_to_baseline(jittery, reference) == []
+
+
+def test_summaries_use_nearest_rank_percentiles():
+    durations = [float(value) for value in range(1, 101)]
+    assert percentile(durations, 95) == 95.0
+    assert summarize(durations)["p99"] == 99.0
+    assert summarize([]) == {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
@@ -0,0 +1,86 @@
+# tests/test_checkpoints.py
+from dataclasses import replace
+
+import pytest
+
+from models.data_models import JobCriteria, UserDetails
+from utils.checkpoints import SEARCHED, CheckpointStore, make_run_key, run_key_for
+
+CRITERIA = JobCriteria(title="Software Engineer", location="Remote", experience=3)
+DOMAINS = ["greenhouse.io/acme", "lever.co/acme"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(str(tmp_path / "checkpoints.db"))
+    yield store
+    store.close()
+
+
+def user(tmp_path, name="resume.pdf", contents=b"%PDF-1.4 resume"):
+    path = tmp_path / name
+    path.write_bytes(contents)
+    return UserDetails(name="Ada", email="ada@example.com", phone="555-0100", resume_path=str(path))
+
+
+def test_run_keys_follow_the_resume_contents_not_its_path(tmp_path):
+    key = run_key_for(user(tmp_path), CRITERIA, DOMAINS)
+
+    assert run_key_for(user(tmp_path, name="upload-2.pdf"), CRITERIA, DOMAINS) == key
+    assert run_key_for(user(tmp_path, contents=b"%PDF-1.4 new resume"), CRITERIA, DOMAINS) != key
+
+
+def test_run_keys_follow_the_run_inputs(tmp_path):
+    details = user(tmp_path)
+    key = run_key_for(details, CRITERIA, DOMAINS)
+
+    assert run_key_for(details, CRITERIA, list(reversed(DOMAINS))) == key
+    assert run_key_for(details, CRITERIA, DOMAINS[:1]) != key
+    assert run_key_for(details, replace(CRITERIA, location="Berlin"), DOMAINS) != key
+    assert run_key_for(replace(details, email="ada@example.org"), CRITERIA, DOMAINS) != key
+
+
+def test_a_missing_resume_still_gives_a_key(tmp_path):
+    details = UserDetails(name="Ada", email="ada@example.com", phone="555-0100",
+                          resume_path=str(tmp_path / "missing.pdf"))
+    assert run_key_for(details, CRITERIA, DOMAINS) == run_key_for(details, CRITERIA, DOMAINS)
+    assert len(make_run_key("anything")) == 16
+
+
+def test_checkpoints_are_kept_per_run(store):
+    store.save("run-a", f"domain:{DOMAINS[0]}", SEARCHED)
+    store.save("run-a", "https://example.test/jobs/1", "analyzed", {"fields": 3})
+    store.save("run-b", "https://example.test/jobs/1", "found")
+
+    assert store.load("run-a") == {
+        f"domain:{DOMAINS[0]}": (SEARCHED, None),
+        "https://example.test/jobs/1": ("analyzed", {"fields": 3}),
+    }
+    assert store.load("run-b") == {"https://example.test/jobs/1": ("found", None)}
+
+    store.clear("run-a")
+    assert store.load("run-a") == {}
+    assert store.load("run-b") != {}
+
+
+def test_items_never_move_back_a_stage(store):
+    url = "https://example.test/jobs/1"
+    store.save("run", url, "filling")
+    store.save("run", url, "analyzed", {"late": True})
+    assert store.load("run")[url] == ("filling", None)
+
+    store.save("run", url, "recorded")
+    assert store.load("run")[url] == ("recorded", None)
+
+
+def test_checkpoints_survive_reopening(tmp_path):
+    path = str(tmp_path / "checkpoints.db")
+    first = CheckpointStore(path)
+    first.save("run", "job", "filled", {"success": True})
+    first.close()
+
+    second = CheckpointStore(path)
+    try:
+        assert second.load("run") == {"job": ("filled", {"success": True})}
+    finally:
+        second.close()
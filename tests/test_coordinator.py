@@ -0,0 +1,235 @@
+# tests/test_coordinator.py
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import dagger
+import pytest
+
+from agents.coordinator import CoordinatorAgent
+from agents.tracker import TrackerAgent
+from models.data_models import ApplicationResult, FormAnalysis, JobCriteria, JobListing, UserDetails
+from utils.application_store import ApplicationStore
+from utils.checkpoints import CheckpointStore, run_key_for
+
+DOMAIN = "jobs.example.test"
+
+
+def listing(number: int) -> JobListing:
+    return JobListing(url=f"https://{DOMAIN}/apply/{number}", domain=DOMAIN, title=f"Engineer {number}")
+
+
+class FakeJobSearch(dagger.Agent):
+    def __init__(self, jobs):
+        super().__init__()
+        self.jobs = jobs
+        self.forgotten = []
+        self.recorded = []
+        self.seen = []
+
+    async def stream_jobs(self, criteria, domains):
+        for job in self.jobs:
+            if job.domain in domains:
+                yield JobListing(**vars(job))
+
+    async def record_listings(self, urls):
+        self.recorded.extend(urls)
+
+    async def forget_listings(self, urls):
+        self.forgotten.extend(urls)
+
+    async def mark_jobs_seen(self, urls):
+        self.seen.extend(urls)
+
+
+class FakeBrowserPool(dagger.Agent):
+    @asynccontextmanager
+    async def session(self):
+        yield None
+
+
+class FakeFormAnalyzer(dagger.Agent):
+    def __init__(self, unanalyzable=()):
+        super().__init__()
+        self.unanalyzable = set(unanalyzable)
+
+    async def analyze_application_form(self, url, session=None):
+        if url in self.unanalyzable:
+            return None
+        return FormAnalysis(form_fields=[])
+
+
+class FakeFormFiller(dagger.Agent):
+    def __init__(self, fills, failing=(), rejected=()):
+        super().__init__()
+        self.fills = fills  # Shared across runs, so a job filled twice shows up
+        self.failing = set(failing)
+        self.rejected = set(rejected)
+
+    async def fill_application(self, job, user_details, form_analysis, session=None):
+        self.fills.append(job.url)
+        if job.url in self.failing:
+            raise RuntimeError(f"Could not fill {job.url}")
+        return ApplicationResult(job=job, success=job.url not in self.rejected, timestamp=datetime.now())
+
+
+@pytest.fixture
+def resume(tmp_path):
+    def write(name: str, contents: bytes = b"%PDF resume") -> str:
+        path = tmp_path / name
+        path.write_bytes(contents)
+        return str(path)
+    return write
+
+
+@pytest.fixture
+def run(tmp_path):
+    """Build a runtime around a coordinator; returns (runtime, coordinator, job search)"""
+    def build(jobs, fills=None, unanalyzable=(), failing=(), rejected=(), **coordinator_options):
+        runtime = dagger.Runtime()
+        coordinator = CoordinatorAgent(checkpoints=CheckpointStore(str(tmp_path / "checkpoints.db")),
+                                       **coordinator_options)
+        job_search = FakeJobSearch(jobs)
+        runtime.register_agent("coordinator", coordinator)
+        runtime.register_agent("job_search", job_search)
+        runtime.register_agent("browser_pool", FakeBrowserPool())
+        runtime.register_agent("form_analyzer", FakeFormAnalyzer(unanalyzable))
+        runtime.register_agent("form_filler", FakeFormFiller(fills if fills is not None else [], failing,
+                                                                     rejected))
+        runtime.register_agent("tracker", TrackerAgent(output_dir=str(tmp_path),
+                                                       store=ApplicationStore(str(tmp_path / "applications.db"))))
+        return runtime, coordinator, job_search
+    return build
+
+
+def user(resume_path: str) -> UserDetails:
+    return UserDetails(name="Ada", email="ada@example.test", phone="555", resume_path=resume_path)
+
+
+CRITERIA = JobCriteria(title="Engineer", location="Remote", experience=3)
+
+
+def test_run_key_ignores_where_the_resume_was_saved(resume):
+    first = run_key_for(user(resume("temp_resume_1.pdf")), CRITERIA, [DOMAIN])
+    assert run_key_for(user(resume("temp_resume_2.pdf")), CRITERIA, [DOMAIN]) == first
+    assert run_key_for(user(resume("temp_resume_3.pdf", b"%PDF other")), CRITERIA, [DOMAIN]) != first
+
+
+def test_crashed_run_resumes_with_a_reuploaded_resume(run, resume, tmp_path):
+    jobs = [listing(number) for number in range(4)]
+    fills = []
+
+    async def crash_after_first_result():
+        runtime, coordinator, _ = run(jobs, fills, stage_workers={"analyze": 1, "fill": 1})
+        stream = coordinator.stream_job_applications(user(resume("temp_resume_1.pdf")), CRITERIA, [DOMAIN])
+        first = await stream.__anext__()
+        # The process dies: nothing after the first result runs, checkpoints stay behind
+        await stream.aclose()
+        await runtime.shutdown()
+        return first
+
+    async def rerun():
+        runtime, coordinator, _ = run(jobs, fills)
+        try:
+            return await coordinator.coordinate_job_applications(
+                user(resume("temp_resume_2.pdf")), CRITERIA, [DOMAIN]
+            )
+        finally:
+            await runtime.shutdown()
+
+    first = asyncio.run(crash_after_first_result())
+    key = run_key_for(user(resume("temp_resume_2.pdf")), CRITERIA, [DOMAIN])
+    assert CheckpointStore(str(tmp_path / "checkpoints.db")).load(key)
+
+    results = asyncio.run(rerun())
+    assert first.job.url not in {result.job.url for result in results}
+    # No job is filled twice, and every job ends up recorded by one of the two runs
+    assert sorted(fills) == sorted(set(fills))
+    store = ApplicationStore(str(tmp_path / "applications.db"))
+    assert sorted(result.job.url for _, result in store.query(limit=None)) == sorted(job.url for job in jobs)
+    # The finished run leaves no checkpoints behind
+    assert CheckpointStore(str(tmp_path / "checkpoints.db")).load(key) == {}
+
+
+def described(number: int, description: str) -> JobListing:
+    return JobListing(url=f"https://{DOMAIN}/apply/{number}", domain=DOMAIN,
+                      title=f"Engineer {number}", description=description)
+
+
+RANKED_JOBS = [
+    described(0, "Frontend work in TypeScript and React"),
+    described(1, "Backend services in Python with PostgreSQL"),
+    described(2, "Sales engineering for enterprise customers"),
+    described(3, "Python data pipelines and backend APIs in Python"),
+]
+RANKED_CRITERIA = JobCriteria(title="Engineer", location="Remote", experience=3, keywords=["python", "backend"])
+
+
+@pytest.mark.parametrize("options, overrides", [
+    ({"top_k": 2}, {}),
+    ({}, {"top_k": 2}),
+    ({"min_score": 0.5}, {}),
+])
+def test_ranking_drops_low_scoring_listings_and_forgets_them(run, resume, options, overrides):
+    fills = []
+
+    async def scenario():
+        runtime, coordinator, job_search = run(RANKED_JOBS, fills, **options)
+        try:
+            results = await coordinator.coordinate_job_applications(
+                user(resume("resume.pdf")), RANKED_CRITERIA, [DOMAIN], **overrides
+            )
+            return results, job_search
+        finally:
+            await runtime.shutdown()
+
+    results, job_search = asyncio.run(scenario())
+    assert sorted(fills) == [RANKED_JOBS[1].url, RANKED_JOBS[3].url]
+    assert sorted(result.job.url for result in results) == sorted(fills)
+    # Listings passed over stay eligible for later runs
+    assert sorted(job_search.forgotten) == [RANKED_JOBS[0].url, RANKED_JOBS[2].url]
+
+
+def test_without_keywords_or_skills_every_listing_is_kept(run, resume):
+    fills = []
+
+    async def scenario():
+        runtime, coordinator, _ = run(RANKED_JOBS, fills, top_k=1)
+        try:
+            await coordinator.coordinate_job_applications(user(resume("resume.pdf")), CRITERIA, [DOMAIN])
+        finally:
+            await runtime.shutdown()
+
+    asyncio.run(scenario())
+    assert sorted(fills) == sorted(job.url for job in RANKED_JOBS)
+
+
+JOBS = [listing(number) for number in range(4)]
+
+
+@pytest.mark.parametrize("session_mode", [True, False])
+def test_dropped_jobs_are_handed_on_to_the_next_run(run, resume, session_mode):
+    fills = []
+    unanalyzable, failing, rejected = JOBS[0].url, JOBS[1].url, JOBS[2].url
+
+    async def attempt(**agents):
+        runtime, coordinator, job_search = run(JOBS, fills, session_mode=session_mode, **agents)
+        try:
+            results = await coordinator.coordinate_job_applications(user(resume("resume.pdf")), CRITERIA, [DOMAIN])
+            return results, job_search
+        finally:
+            await runtime.shutdown()
+
+    results, job_search = asyncio.run(attempt(unanalyzable=[unanalyzable], failing=[failing], rejected=[rejected]))
+
+    # An unanalyzable form is never filled; a fill that raised yields no result
+    assert sorted(fills) == [failing, rejected, JOBS[3].url]
+    assert {result.job.url: result.success for result in results} == {rejected: False, JOBS[3].url: True}
+    # Only the application that went through is remembered; the rest stay eligible
+    assert job_search.recorded == job_search.seen == [JOBS[3].url]
+    assert sorted(job_search.forgotten) == [unanalyzable, failing, rejected]
+
+    # The finished run left no checkpoints behind, so the failed fill is retried
+    results, _ = asyncio.run(attempt())
+    assert sorted(result.job.url for result in results) == [job.url for job in JOBS]
+    assert fills.count(failing) == 2
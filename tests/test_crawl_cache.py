@@ -0,0 +1,87 @@
+# tests/test_crawl_cache.py
+from dataclasses import replace
+
+import pytest
+
+from models.data_models import JobListing
+from utils.crawl_cache import CachedResponse, HttpCache, ListingSnapshots, content_hash, listing_hash
+
+JOB = JobListing(url="https://boards.greenhouse.io/acme/jobs/1", domain="greenhouse.io/acme",
+                 title="Backend Engineer", description="Build payment services in Python.")
+
+
+@pytest.fixture
+def snapshots(tmp_path):
+    snapshots = ListingSnapshots(str(tmp_path / "listing_snapshots.db"))
+    yield snapshots
+    snapshots.close()
+
+
+def test_listing_hashes_follow_what_the_listing_says():
+    assert listing_hash(JOB) == listing_hash(replace(JOB, url="https://example.test/other", domain="other"))
+    assert listing_hash(JOB) != listing_hash(replace(JOB, description="Build payment services in Go."))
+    assert listing_hash(JOB) != listing_hash(replace(JOB, title="Backend Engineer II"))
+
+
+def test_checking_a_listing_does_not_record_it(snapshots):
+    assert snapshots.changed(JOB) and snapshots.changed(JOB)
+    assert len(snapshots) == 0
+
+    assert snapshots.update(JOB, page_hash="page-1")
+    assert not snapshots.changed(JOB)
+    assert not snapshots.update(JOB, page_hash="page-1")
+
+
+def test_edited_listings_count_as_changed(snapshots):
+    snapshots.update(JOB)
+    edited = replace(JOB, description="Build payment services in Python and Go.")
+
+    assert snapshots.changed(edited)
+    assert snapshots.update(edited)
+    assert not snapshots.changed(edited) and snapshots.changed(JOB)
+
+
+def test_other_links_to_a_posting_share_its_snapshot(snapshots):
+    snapshots.update(JOB, page_hash="page-1")
+    tracked = replace(JOB, url="http://www.boards.greenhouse.io/acme/jobs/1/?gh_src=feed")
+
+    assert not snapshots.changed(tracked)
+    assert snapshots.page_unchanged(tracked.url, "page-1")
+    assert not snapshots.page_unchanged(tracked.url, "page-2")
+    assert not snapshots.page_unchanged("https://boards.greenhouse.io/acme/jobs/2", "page-1")
+
+
+def test_forgotten_listings_are_new_again(snapshots):
+    snapshots.update(JOB)
+    snapshots.forget([JOB.url + "?utm_source=mail"])
+
+    assert snapshots.changed(JOB)
+    assert len(snapshots) == 0
+
+
+def test_snapshots_persist_across_runs(tmp_path):
+    path = str(tmp_path / "listing_snapshots.db")
+    first = ListingSnapshots(path)
+    first.update(JOB)
+    first.close()
+
+    second = ListingSnapshots(path)
+    try:
+        assert not second.changed(JOB)
+    finally:
+        second.close()
+
+
+def test_http_cache_keeps_the_latest_response_per_url(tmp_path):
+    cache = HttpCache(str(tmp_path / "http_cache.db"))
+    try:
+        url = "https://boards-api.greenhouse.io/v1/boards/acme/jobs"
+        assert cache.get(url) is None
+
+        cache.put(url, CachedResponse('"v1"', None, "application/json", content_hash(b"[]"), b"[]"))
+        cache.put(url, CachedResponse('"v2"', "Mon, 04 Mar 2024 10:00:00 GMT", "application/json",
+                                      content_hash(b"[1]"), b"[1]"))
+        assert cache.get(url) == CachedResponse('"v2"', "Mon, 04 Mar 2024 10:00:00 GMT", "application/json",
+                                                content_hash(b"[1]"), b"[1]")
+    finally:
+        cache.close()
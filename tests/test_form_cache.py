@@ -0,0 +1,67 @@
+# tests/test_form_cache.py
+import time
+
+from bs4 import BeautifulSoup
+
+from models.data_models import FormAnalysis, FormField
+from utils.form_cache import FormAnalysisCache, form_fingerprint, form_identifiers
+
+
+def analysis(*field_ids: str) -> FormAnalysis:
+    return FormAnalysis(form_fields=[FormField(field_id=field_id, field_type="text", label=field_id)
+                                     for field_id in field_ids])
+
+
+def form(job: int) -> BeautifulSoup:
+    return BeautifulSoup(
+        f'<form action="/jobs/{job}"><input name="first_name" id="job_{job}_name">'
+        '<input type="email" name="email"></form>', "html.parser"
+    )
+
+
+def test_fingerprint_ignores_job_ids():
+    assert form_fingerprint(form(1)) == form_fingerprint(form(2))
+    assert form_fingerprint(BeautifulSoup("<p>No form</p>", "html.parser")) is None
+    assert form_identifiers(form(1)) == {"first_name", "job_1_name", "email"}
+
+
+def test_hit_needs_every_referenced_field_on_the_page(tmp_path):
+    cache = FormAnalysisCache(str(tmp_path / "forms.db"))
+    cache.put("fp", analysis("first_name", "email"))
+    assert cache.get("fp", {"first_name", "email", "phone"}).form_fields[0].field_id == "first_name"
+    assert cache.get("fp", {"first_name"}) is None
+    assert cache.get("other") is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "evictions": 0}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = FormAnalysisCache(str(tmp_path / "forms.db"), max_entries=2)
+    cache.put("a", analysis("x"))
+    time.sleep(0.01)
+    cache.put("b", analysis("x"))
+    time.sleep(0.01)
+    assert cache.get("a") is not None
+    time.sleep(0.01)
+    cache.put("c", analysis("x"))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_dropped(tmp_path):
+    cache = FormAnalysisCache(str(tmp_path / "forms.db"), ttl_seconds=0.05)
+    cache.put("a", analysis("x"))
+    time.sleep(0.1)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_processes_sharing_a_cache_keep_each_others_entries(tmp_path):
+    # Each shard of a sharded run opens the cache in its own process
+    first = FormAnalysisCache(str(tmp_path / "forms.db"))
+    second = FormAnalysisCache(str(tmp_path / "forms.db"))
+    first.put("a", analysis("x"))
+    second.put("b", analysis("y"))
+    first.put("c", analysis("z"))
+    reopened = FormAnalysisCache(str(tmp_path / "forms.db"))
+    assert all(reopened.get(key) is not None for key in ("a", "b", "c"))
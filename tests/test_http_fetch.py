@@ -0,0 +1,98 @@
+# tests/test_http_fetch.py
+import json
+import os
+import shutil
+
+import pytest
+
+from utils.board_stub import StubJobBoardServer
+from utils.crawl_cache import HttpCache
+from utils.http_fetch import PageFetcher
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "feeds")
+
+
+@pytest.fixture
+def fixtures(tmp_path):
+    """A copy of the recorded feeds the test may edit"""
+    directory = tmp_path / "feeds"
+    shutil.copytree(FIXTURES, directory)
+    return directory
+
+
+@pytest.fixture
+def board(fixtures):
+    with StubJobBoardServer(fixtures_dir=str(fixtures)) as board:
+        yield board
+
+
+def fetcher(tmp_path):
+    return PageFetcher(retries=0, cache=HttpCache(str(tmp_path / "http_cache.db")))
+
+
+def test_unchanged_pages_are_revalidated_and_served_from_the_cache(board, tmp_path):
+    url = f"{board.greenhouse_api_url}/acme/jobs"
+    pages = fetcher(tmp_path)
+    try:
+        first = pages.get_page(url)
+        second = pages.get_page(url)
+    finally:
+        pages.close()
+
+    assert not first.not_modified and second.not_modified
+    assert second.body == first.body and second.content_hash == first.content_hash
+    assert json.loads(second.body)["meta"] == {"total": 3}
+    assert (board.requests, board.not_modified, pages.stats["not_modified"]) == (2, 1, 1)
+
+
+def test_stored_etags_are_reused_by_later_runs(board, tmp_path):
+    url = f"{board.lever_api_url}/acme?mode=json&skip=0&limit=100"
+    for run in range(2):
+        pages = fetcher(tmp_path)
+        try:
+            page = pages.get_page(url, accept="application/json")
+        finally:
+            pages.close()
+        assert page.not_modified == bool(run)
+    assert board.not_modified == 1
+
+
+def test_changed_pages_are_downloaded_and_replace_the_cached_copy(board, fixtures, tmp_path):
+    url = f"{board.greenhouse_api_url}/acme/jobs"
+    path = fixtures / "greenhouse" / "v1" / "boards" / "acme" / "jobs.json"
+    pages = fetcher(tmp_path)
+    try:
+        original = pages.get_page(url)
+        feed = json.loads(path.read_text())
+        del feed["jobs"][0]
+        feed["meta"]["total"] = 2
+        path.write_text(json.dumps(feed))
+
+        changed = pages.get_page(url)
+        revalidated = pages.get_page(url)
+    finally:
+        pages.close()
+
+    assert not changed.not_modified and changed.content_hash != original.content_hash
+    assert revalidated.not_modified and json.loads(revalidated.body)["meta"] == {"total": 2}
+    assert board.not_modified == 1
+
+
+def test_pages_without_a_cache_are_always_downloaded(board):
+    pages = PageFetcher(retries=0)
+    try:
+        assert [pages.get_page(board.search_url + "?q=site:acme.lever.test").not_modified for _ in range(2)] == [
+            False, False
+        ]
+    finally:
+        pages.close()
+    assert board.not_modified == 0
+
+
+def test_missing_pages_are_not_cached(board, tmp_path):
+    pages = fetcher(tmp_path)
+    try:
+        assert pages.get_page(f"{board.url}/nowhere") is None
+        assert pages.cache.get(f"{board.url}/nowhere") is None
+    finally:
+        pages.close()
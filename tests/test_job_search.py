@@ -0,0 +1,126 @@
+# tests/test_job_search.py
+import asyncio
+import urllib.request
+from contextlib import asynccontextmanager
+
+import dagger
+import pytest
+
+from agents.job_search import JobSearchAgent
+from models.data_models import JobCriteria
+from utils.board_stub import StubJobBoardServer
+from utils.job_sources import GreenhouseSource, LeverSource
+
+CRITERIA = JobCriteria(title="Software Engineer", location="Remote", experience=3)
+BOARD = "greenhouse.io/acme"
+
+
+class NoBrowserPool(dagger.Agent):
+    """Feeds never need a browser"""
+
+
+class HttpBrowserPool(dagger.Agent):
+    """Stands in for the Selenium pool: a "browser" is a page fetched over HTTP"""
+
+    class Driver:
+        page_source = ""
+
+    def __init__(self):
+        super().__init__()
+        self.loads = []
+
+    @asynccontextmanager
+    async def lease(self):
+        yield self.Driver()
+
+    def load_page(self, driver, url, wait_for=None):
+        self.loads.append(url)
+        with urllib.request.urlopen(url) as response:
+            driver.page_source = response.read().decode("utf-8")
+
+    async def navigate(self, driver, url, wait_for=None):
+        await self.run(self.load_page, driver, url, wait_for)
+
+    async def run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+
+@pytest.fixture
+def board():
+    with StubJobBoardServer(jobs_per_domain=5) as board:
+        yield board
+
+
+def search(board, domains=(BOARD,), then=None, **options):
+    """One run: a fresh agent over the persistent stores in the cache directory.
+
+    then(agent, jobs), if given, is awaited before the agent shuts down.
+    """
+    async def run():
+        runtime = dagger.Runtime()
+        agent = JobSearchAgent(
+            sources=[GreenhouseSource(board.greenhouse_api_url), LeverSource(board.lever_api_url)],
+            **options
+        )
+        runtime.register_agent("browser_pool", NoBrowserPool())
+        runtime.register_agent("job_search", agent)
+        try:
+            jobs = await agent.find_jobs(CRITERIA, list(domains))
+            if then is not None:
+                await then(agent, jobs)
+            return jobs
+        finally:
+            await agent.shutdown()
+    return asyncio.run(run())
+
+
+def test_listings_of_an_abandoned_run_are_handed_on_again(board):
+    jobs = search(board)
+    assert len(jobs) == 3
+    # The run never got to these listings, so the next one sees them again
+    again = search(board)
+    assert [job.url for job in again] == [job.url for job in jobs]
+
+
+def test_recorded_listings_are_skipped_until_they_change(board):
+    async def record(agent, jobs):
+        await agent.record_listings([job.url for job in jobs])
+
+    assert len(search(board, then=record, max_jobs_per_domain=10)) == 5
+    assert search(board, max_jobs_per_domain=10) == []
+
+    board.jobs_per_domain = 6
+    changed = search(board, max_jobs_per_domain=10)
+    assert [job.title for job in changed] == ["Software Engineer 5"]
+
+
+def scrape(board, domain, **options):
+    """Scrape one domain's search results; returns the agent, its listings, claimed URLs and page loads"""
+    async def run():
+        agent = JobSearchAgent(search_url=board.search_url, sources=[], **options)
+        pool = HttpBrowserPool()
+        found_urls, listings = set(), asyncio.Queue()
+        try:
+            await agent._scrape_search(pool, CRITERIA, domain, found_urls, listings)
+        finally:
+            await agent.shutdown()
+        jobs = [listings.get_nowait() for _ in range(listings.qsize())]
+        return jobs, found_urls, pool.loads
+    return asyncio.run(run())
+
+
+def test_search_follows_result_pages_up_to_the_limit():
+    with StubJobBoardServer(jobs_per_domain=25) as board:
+        jobs, found_urls, loads = scrape(board, "acme.lever.test", max_jobs_per_domain=12)
+    assert sorted(int(job.url.split("/")[-2]) for job in jobs) == list(range(12))
+    assert all(job.title.startswith("Software Engineer") and job.description for job in jobs)
+    # Two result pages were enough; listings past the limit are not claimed
+    assert sum("/search" in url for url in loads) == 2
+    assert len(found_urls) == 12
+
+
+def test_search_reads_at_most_max_result_pages():
+    with StubJobBoardServer(jobs_per_domain=50) as board:
+        jobs, _, loads = scrape(board, "acme.lever.test", max_jobs_per_domain=50, max_result_pages=2)
+    assert len(jobs) == 20
+    assert sum("/search" in url for url in loads) == 2
@@ -0,0 +1,78 @@
+# tests/test_job_sources.py
+import asyncio
+import os
+
+import pytest
+
+from models.data_models import JobCriteria
+from utils.board_stub import StubJobBoardServer
+from utils.crawl_cache import HttpCache
+from utils.http_fetch import PageFetcher
+from utils.job_sources import GreenhouseSource, JobSourceError, LeverSource, split_board
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "feeds")
+CRITERIA = JobCriteria(title="Software Engineer", location="Remote", experience=3)
+
+
+@pytest.fixture
+def board():
+    # Responses recorded from the boards' public APIs
+    with StubJobBoardServer(fixtures_dir=FIXTURES) as board:
+        yield board
+
+
+def listings(source, board_name, tmp_path, runs=1):
+    """Every run's listings, each run through a fresh fetcher over one HTTP cache"""
+    async def run():
+        fetcher = PageFetcher(retries=0, cache=HttpCache(str(tmp_path / "http_cache.db")))
+        try:
+            return [job async for job in source.listings(fetcher, CRITERIA, f"{source.hosts[0]}/{board_name}",
+                                                         board_name)]
+        finally:
+            fetcher.close()
+    return [asyncio.run(run()) for _ in range(runs)]
+
+
+def test_recorded_greenhouse_feed(board, tmp_path):
+    [jobs] = listings(GreenhouseSource(board.greenhouse_api_url), "acme", tmp_path)
+
+    # The Berlin posting and the marketing role do not match the criteria
+    assert [(job.url, job.title) for job in jobs] == [
+        ("https://boards.greenhouse.io/acme/jobs/4012001", "Senior Software Engineer, Payments")
+    ]
+    assert jobs[0].domain == "greenhouse.io/acme"
+    assert jobs[0].description == (
+        "About the role Build the services that move money for Acme's customers. Python & Go PostgreSQL"
+    )
+
+
+def test_recorded_lever_feed_is_read_page_by_page(board, tmp_path):
+    [jobs] = listings(LeverSource(board.lever_api_url, page_size=2), "acme", tmp_path)
+
+    assert [job.url for job in jobs] == [
+        "https://jobs.lever.co/acme/5b9f2c1e-0d41-4c3a-9f1e-1a2b3c4d5e01/apply",
+        "https://jobs.lever.co/acme/5b9f2c1e-0d41-4c3a-9f1e-1a2b3c4d5e02/apply",
+    ]
+    # Without a plain-text description the HTML one is converted
+    assert [job.description for job in jobs] == ["Own Acme's order pipeline end to end.", "Build Acme's data platform."]
+    # Two full pages and the empty page that ends the feed
+    assert board.requests == 3
+
+
+def test_feeds_read_again_are_revalidated(board, tmp_path):
+    first, second = listings(LeverSource(board.lever_api_url, page_size=2), "acme", tmp_path, runs=2)
+
+    assert second == first
+    assert (board.requests, board.not_modified) == (6, 3)
+
+
+def test_unreadable_feeds_raise(board, tmp_path):
+    with pytest.raises(JobSourceError):
+        listings(GreenhouseSource(f"{board.url}/nowhere"), "acme", tmp_path)
+
+
+def test_domain_entries_name_their_board():
+    assert split_board("https://boards.greenhouse.io/acme/") == ("boards.greenhouse.io", "acme")
+    assert GreenhouseSource().board_for("greenhouse.io/acme") == "acme"
+    assert GreenhouseSource().board_for("jobs.lever.co/acme") is None
+    assert LeverSource().board_for("lever.co") is None
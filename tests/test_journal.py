@@ -0,0 +1,75 @@
+# tests/test_journal.py
+import json
+
+import pytest
+
+from utils.journal import ApplicationJournal
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "journal" / "applications.jsonl"
+
+
+def lines(path):
+    return path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+
+
+def test_records_are_written_in_groups(path):
+    journal = ApplicationJournal(str(path), batch_size=3, flush_interval=3600)
+    try:
+        journal.append({"n": 0})
+        journal.append({"n": 1})
+        assert lines(path) == []
+
+        journal.append({"n": 2})
+        assert [json.loads(line) for line in lines(path)] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    finally:
+        journal.close()
+
+
+def test_a_due_flush_interval_commits_at_once(path):
+    journal = ApplicationJournal(str(path), batch_size=100, flush_interval=0)
+    try:
+        journal.append({"n": 0})
+        assert len(lines(path)) == 1
+    finally:
+        journal.close()
+
+
+def test_reading_and_closing_commit_pending_records(path):
+    journal = ApplicationJournal(str(path), batch_size=100, flush_interval=3600, fsync=True)
+    journal.append({"n": 0, "at": path})
+    assert list(journal.records()) == [{"n": 0, "at": str(path)}]
+
+    journal.append({"n": 1})
+    journal.close()
+    journal.close()
+    assert len(lines(path)) == 2
+
+
+def test_reopened_journals_append_after_earlier_records(path):
+    for n in range(2):
+        journal = ApplicationJournal(str(path))
+        journal.append({"n": n})
+        journal.close()
+
+    journal = ApplicationJournal(str(path))
+    try:
+        assert [record["n"] for record in journal.records()] == [0, 1]
+    finally:
+        journal.close()
+
+
+def test_a_torn_final_line_is_skipped(path):
+    journal = ApplicationJournal(str(path), batch_size=1)
+    journal.append({"n": 0})
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"n": 1, "url": "https://exa\n\n')
+
+    journal = ApplicationJournal(str(path))
+    try:
+        assert list(journal.records()) == [{"n": 0}]
+    finally:
+        journal.close()
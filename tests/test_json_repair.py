@@ -0,0 +1,48 @@
+# tests/test_json_repair.py
+import pytest
+
+from utils.json_repair import SchemaError, parse_form_analysis, repair_json
+
+
+def test_python_literals_are_converted_outside_strings_only():
+    data, repairs = repair_json(
+        '{"label": "None of the above", "hint": "True or False?", "required": True, "default": None}'
+    )
+    assert data == {"label": "None of the above", "hint": "True or False?", "required": True, "default": None}
+    assert repairs == ["converted Python literals"]
+
+
+def test_trailing_commas_are_removed_outside_strings_only():
+    data, repairs = repair_json('{"options": ["a, ]", "b",], "note": "x,}",}')
+    assert data == {"options": ["a, ]", "b"], "note": "x,}"}
+    assert repairs == ["removed trailing commas"]
+
+
+def test_escaped_quotes_do_not_end_a_string():
+    data, _ = repair_json('{"label": "Say \\"None\\", True", "required": False,}')
+    assert data == {"label": 'Say "None", True', "required": False}
+
+
+def test_fenced_responses_with_prose_are_unwrapped():
+    data, repairs = repair_json('Here you go:\n```json\n{"form_fields": [],}\n```\nDone.')
+    assert data == {"form_fields": []}
+    assert repairs == ["stripped markdown fences", "removed trailing commas"]
+
+
+def test_valid_json_is_parsed_untouched():
+    assert repair_json('{"label": "None, True,]"}') == ({"label": "None, True,]"}, [])
+
+
+def test_unrepairable_text_raises():
+    with pytest.raises(SchemaError):
+        repair_json("no JSON here")
+
+
+def test_labels_survive_a_repaired_form_analysis():
+    analysis, _ = parse_form_analysis(
+        '{"form_fields": [{"field_id": "q1", "field_type": "select", "label": "None of the above", '
+        '"required": True}], "resume_upload_id": None, "submit_button_id": "submit",}'
+    )
+    assert analysis.form_fields[0].label == "None of the above"
+    assert analysis.form_fields[0].required is True
+    assert analysis.resume_upload_id is None and analysis.submit_button_id == "submit"
@@ -0,0 +1,237 @@
+# tests/test_llm_gateway.py
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+import types
+
+import pytest
+import requests
+
+from utils.llm_gateway import GeminiTransport, LLMError, LLMGateway, RestTransport, TokenBucket, is_retryable
+from utils.llm_stub import StubLLMServer
+
+
+class FakeTransport:
+    """Answers each prompt with {"echo": prompt}, failing first with the queued errors"""
+
+    def __init__(self, errors=()):
+        self.errors = list(errors)
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt, timeout, json_schema=None):
+        with self._lock:
+            self.prompts.append(prompt)
+            if self.errors:
+                raise self.errors.pop(0)
+        tasks = re.findall(r"### Task \d+\n(.*)", prompt)
+        if tasks:
+            return json.dumps([{"echo": task} for task in tasks])
+        return json.dumps({"echo": prompt})
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.HTTPError(f"{status} Error", response=response)
+
+
+def gateway_for(transport, **kwargs):
+    options = {"rate_per_second": 1000, "burst": 1000, "backoff_base": 0.001, **kwargs}
+    return LLMGateway(transport, **options)
+
+
+class TestGeminiTransport:
+    class FakeModel:
+        """generate_content as google-generativeai 0.3.1 behaves: request_options ends up in the request proto"""
+
+        def __init__(self, structured=True):
+            self.structured = structured
+            self.calls = []
+
+        def generate_content(self, prompt, **kwargs):
+            self.calls.append(kwargs)
+            if "request_options" in kwargs:
+                raise ValueError("Unknown field for GenerateContentRequest: request_options")
+            if "generation_config" in kwargs and not self.structured:
+                raise ValueError("Unknown field for GenerationConfig: response_schema")
+            return types.SimpleNamespace(text='{"ok": true}')
+
+    @pytest.fixture
+    def transport(self, monkeypatch):
+        genai = types.ModuleType("google.generativeai")
+        genai.configure = lambda api_key=None: None
+        genai.GenerativeModel = lambda model: self.FakeModel()
+        google = types.ModuleType("google")
+        google.generativeai = genai
+        monkeypatch.setitem(sys.modules, "google", google)
+        monkeypatch.setitem(sys.modules, "google.generativeai", genai)
+        return GeminiTransport(api_key="key")
+
+    def test_falls_back_when_the_sdk_rejects_request_options(self, transport):
+        assert transport.generate("prompt", 5.0, json_schema={"type": "OBJECT"}) == '{"ok": true}'
+        assert transport.request_options is False
+        # The timeout error must not switch structured output off
+        assert transport.structured_output is True
+        assert transport.model.calls[-1] == {
+            "generation_config": {"response_mime_type": "application/json", "response_schema": {"type": "OBJECT"}}
+        }
+
+        transport.generate("prompt", 5.0)
+        assert "request_options" not in transport.model.calls[-1]
+
+    def test_structured_output_falls_back_on_its_own_errors(self, transport):
+        transport.model = self.FakeModel(structured=False)
+        assert transport.generate("prompt", 5.0, json_schema={"type": "OBJECT"}) == '{"ok": true}'
+        assert transport.structured_output is False
+        assert transport.model.calls[-1] == {}
+
+
+def test_token_bucket_spaces_requests_after_the_burst():
+    async def scenario():
+        bucket = TokenBucket(rate=20, burst=2)
+        started = time.monotonic()
+        waited = [await bucket.acquire() for _ in range(4)]
+        return waited, time.monotonic() - started
+
+    waited, elapsed = asyncio.run(scenario())
+    assert waited[:2] == [0.0, 0.0]
+    assert all(wait > 0 for wait in waited[2:])
+    assert elapsed == pytest.approx(0.1, abs=0.05)
+
+
+def test_queued_batchable_prompts_are_merged():
+    transport = FakeTransport()
+
+    async def scenario():
+        gateway = gateway_for(transport, max_in_flight=1, batch_size=4)
+        try:
+            answers = await asyncio.gather(*(gateway.generate(f"prompt {i}", batchable=True) for i in range(5)))
+            return answers, gateway.get_stats()
+        finally:
+            gateway.close()
+
+    answers, stats = asyncio.run(scenario())
+    assert [json.loads(answer) for answer in answers] == [{"echo": f"prompt {i}"} for i in range(5)]
+    # Four prompts share one request, the fifth goes alone
+    assert len(transport.prompts) == 2
+    assert stats["batches"] == 1 and stats["batched_prompts"] == 4
+    assert stats["pending"] == 0
+
+
+def test_unsplittable_batch_answers_fall_back_to_single_requests():
+    class ScalarTransport(FakeTransport):
+        def generate(self, prompt, timeout, json_schema=None):
+            self.prompts.append(prompt)
+            return json.dumps({"echo": prompt})
+
+    transport = ScalarTransport()
+
+    async def scenario():
+        gateway = gateway_for(transport, max_in_flight=1, batch_size=3)
+        try:
+            return await asyncio.gather(*(gateway.generate(f"prompt {i}", batchable=True) for i in range(3)))
+        finally:
+            gateway.close()
+
+    answers = asyncio.run(scenario())
+    assert [json.loads(answer) for answer in answers] == [{"echo": f"prompt {i}"} for i in range(3)]
+    # One combined attempt, then each prompt on its own
+    assert len(transport.prompts) == 4
+
+
+@pytest.mark.parametrize("error", [http_error(429), http_error(503), requests.Timeout(), requests.ConnectionError()])
+def test_transient_failures_are_retried(error):
+    transport = FakeTransport(errors=[error, error])
+
+    async def scenario():
+        gateway = gateway_for(transport)
+        try:
+            return await gateway.generate("prompt"), gateway.get_stats()
+        finally:
+            gateway.close()
+
+    answer, stats = asyncio.run(scenario())
+    assert json.loads(answer) == {"echo": "prompt"}
+    assert stats["requests"] == 3 and stats["retries"] == 2
+
+
+@pytest.mark.parametrize("status", [400, 401, 403, 404])
+def test_client_errors_are_not_retried(status):
+    transport = FakeTransport(errors=[http_error(status)])
+
+    async def scenario():
+        gateway = gateway_for(transport)
+        try:
+            with pytest.raises(LLMError, match="after 1 attempts"):
+                await gateway.generate("prompt")
+            return gateway.get_stats()
+        finally:
+            gateway.close()
+
+    stats = asyncio.run(scenario())
+    assert stats["requests"] == 1 and stats["retries"] == 0 and stats["failures"] == 1
+
+
+def test_is_retryable_reads_api_error_codes():
+    class ResourceExhausted(Exception):
+        code = 429
+
+    class InvalidArgument(Exception):
+        code = 400
+
+    assert is_retryable(ResourceExhausted())
+    assert not is_retryable(InvalidArgument())
+    assert not is_retryable(ValueError("blocked response"))
+
+
+def test_timed_out_attempts_are_retried():
+    class SlowTransport(FakeTransport):
+        def generate(self, prompt, timeout, json_schema=None):
+            self.prompts.append(prompt)
+            if len(self.prompts) == 1:
+                time.sleep(0.3)
+            return json.dumps({"echo": prompt})
+
+    transport = SlowTransport()
+
+    async def scenario():
+        gateway = gateway_for(transport, timeout=0.1)
+        try:
+            return await gateway.generate("prompt"), gateway.get_stats()
+        finally:
+            gateway.close()
+
+    answer, stats = asyncio.run(scenario())
+    assert json.loads(answer) == {"echo": "prompt"}
+    assert stats["timeouts"] == 1 and stats["retries"] == 1
+
+
+class TestAgainstStubServer:
+    def test_round_trip(self):
+        with StubLLMServer(['{"fields": []}']) as stub:
+            async def scenario():
+                gateway = gateway_for(RestTransport(base_url=stub.url))
+                try:
+                    return await gateway.generate("describe the form", json_schema={"type": "OBJECT"})
+                finally:
+                    gateway.close()
+
+            assert asyncio.run(scenario()) == '{"fields": []}'
+            assert stub.prompts == ["describe the form"]
+
+    def test_unavailable_server_exhausts_the_retry_budget(self):
+        with StubLLMServer(['{}'], error_rate=1.0) as stub:
+            async def scenario():
+                gateway = gateway_for(RestTransport(base_url=stub.url), max_retries=2)
+                try:
+                    with pytest.raises(LLMError, match="after 3 attempts"):
+                        await gateway.generate("prompt")
+                finally:
+                    gateway.close()
+
+            asyncio.run(scenario())
+            assert stub.requests == 3
@@ -0,0 +1,88 @@
+# tests/test_near_duplicates.py
+import numpy as np
+import pytest
+
+from models.data_models import JobListing
+from utils.near_duplicates import PERMUTATIONS, NearDuplicateIndex, company_of, minhash
+
+DESCRIPTION = (
+    "Acme is hiring a backend engineer to design, build and operate the payment services that move "
+    "money for millions of customers. You will work in Python and Go, own services end to end, "
+    "and help us scale PostgreSQL and Kafka across three regions."
+)
+
+
+def job(url, title="Senior Backend Engineer", description=DESCRIPTION, domain=""):
+    return JobListing(url=url, domain=domain or url.split("/")[2], title=title, description=description)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / "near_duplicates.db"))
+    yield index
+    index.close()
+
+
+def test_signatures_are_stable_and_track_similarity():
+    signature = minhash(job("https://acme.test/1"))
+    assert signature.shape == (PERMUTATIONS,) and signature.dtype == np.uint64
+    assert np.array_equal(signature, minhash(job("https://elsewhere.test/2")))
+
+    reworded = minhash(job("https://acme.test/1", description=DESCRIPTION.replace("three regions", "two regions")))
+    unrelated = minhash(job("https://acme.test/1", title="Office Manager",
+                            description="Run the front desk, plan events and keep the office stocked."))
+    assert np.mean(reworded == signature) > 0.8
+    assert np.mean(unrelated == signature) < 0.2
+
+
+def test_companies_come_from_the_ats_board_or_the_host():
+    assert company_of(job("https://boards.greenhouse.io/acme/jobs/1", domain="greenhouse.io/Acme")) == "acme"
+    assert company_of(job("https://jobs.lever.co/acme/abc", domain="lever.co")) == "acme"
+    assert company_of(job("https://careers.acme.com/jobs/1")) == "acme"
+
+
+def test_a_repost_joins_the_original_cluster(index):
+    original = "https://boards.greenhouse.io/acme/jobs/1"
+    assert index.cluster_of(job(original, domain="greenhouse.io/acme")) is None
+
+    # The same role under another URL, lightly edited
+    repost = job("https://boards.greenhouse.io/acme/jobs/2?gh_src=feed", domain="greenhouse.io/acme",
+                 description=DESCRIPTION.replace("three regions", "two regions"))
+    assert index.cluster_of(repost) == original
+    # Seeing a posting again never makes it a duplicate of itself
+    assert index.cluster_of(job(original, domain="greenhouse.io/acme")) is None
+    assert len(index) == 2
+
+
+def test_other_companies_roles_and_thin_listings_are_not_duplicates(index):
+    index.cluster_of(job("https://boards.greenhouse.io/acme/jobs/1", domain="greenhouse.io/acme"))
+
+    assert index.cluster_of(job("https://boards.greenhouse.io/globex/jobs/1", domain="greenhouse.io/globex")) is None
+    assert index.cluster_of(job("https://boards.greenhouse.io/acme/jobs/3", domain="greenhouse.io/acme",
+                                title="Staff Data Analyst")) is None
+    assert index.cluster_of(job("https://boards.greenhouse.io/acme/jobs/4", domain="greenhouse.io/acme",
+                                description="Backend engineer, Python.")) is None
+    assert len(index) == 3
+
+
+def test_forgetting_a_posting_drops_its_cluster(index):
+    original = "https://boards.greenhouse.io/acme/jobs/1"
+    index.cluster_of(job(original, domain="greenhouse.io/acme"))
+    index.cluster_of(job("https://boards.greenhouse.io/acme/jobs/2", domain="greenhouse.io/acme"))
+
+    assert index.forget([original + "?utm_source=mail"]) == [original, "https://boards.greenhouse.io/acme/jobs/2"]
+    assert len(index) == 0
+    assert index.cluster_of(job("https://boards.greenhouse.io/acme/jobs/2", domain="greenhouse.io/acme")) is None
+
+
+def test_the_index_persists_across_runs(tmp_path):
+    path = str(tmp_path / "near_duplicates.db")
+    first = NearDuplicateIndex(path)
+    first.cluster_of(job("https://careers.acme.com/jobs/1"))
+    first.close()
+
+    second = NearDuplicateIndex(path)
+    try:
+        assert second.cluster_of(job("https://careers.acme.com/jobs/1-remote")) == "https://careers.acme.com/jobs/1"
+    finally:
+        second.close()
@@ -0,0 +1,142 @@
+# tests/test_pipeline.py
+import asyncio
+
+import pytest
+
+from utils.pipeline import Stage, StagedPipeline
+
+
+def collect(pipeline, source):
+    async def run():
+        return [item async for item in pipeline.run(source)]
+    return asyncio.run(run())
+
+
+async def double(item):
+    return item * 2
+
+
+def test_items_flow_through_every_stage():
+    async def increment(item):
+        return item + 1
+
+    pipeline = StagedPipeline([Stage("double", double, workers=3), Stage("increment", increment, workers=2)])
+    assert sorted(collect(pipeline, range(10))) == [2 * n + 1 for n in range(10)]
+
+
+def test_none_drops_an_item():
+    async def odd_only(item):
+        return item if item % 2 else None
+
+    assert sorted(collect(StagedPipeline([Stage("odd", odd_only)]), range(6))) == [1, 3, 5]
+
+
+def test_fan_out_forwards_every_element():
+    async def pair(item):
+        return [item, -item]
+
+    async def countdown(item):
+        async def elements():
+            for n in range(item, 0, -1):
+                yield n
+        return elements()
+
+    pipeline = StagedPipeline([Stage("pair", pair, fan_out=True), Stage("countdown", countdown, fan_out=True)])
+    # Negative items count down from nothing
+    assert sorted(collect(pipeline, [2, 3])) == [1, 1, 2, 2, 3]
+
+
+def test_batch_stage_sees_every_item_at_once():
+    batches = []
+
+    async def rank(items):
+        batches.append(sorted(items))
+        return sorted(items, reverse=True)[:3]
+
+    pipeline = StagedPipeline([Stage("double", double, workers=4), Stage("rank", rank, batch=True, workers=5)])
+    assert collect(pipeline, range(10)) == [18, 16, 14]
+    assert batches == [[2 * n for n in range(10)]]
+    assert pipeline.stages[1].workers == 1
+
+
+def test_failed_items_are_reported_and_the_rest_continue():
+    errors = []
+
+    async def fragile(item):
+        if item == 3:
+            raise ValueError("bad item")
+        return item
+
+    async def broken_batch(items):
+        raise RuntimeError("no ranking")
+
+    pipeline = StagedPipeline([Stage("fragile", fragile, workers=2)],
+                              on_error=lambda stage, item, error: errors.append((stage, item, str(error))))
+    assert sorted(collect(pipeline, range(5))) == [0, 1, 2, 4]
+    assert errors == [("fragile", 3, "bad item")]
+
+    errors.clear()
+    pipeline = StagedPipeline([Stage("fragile", fragile), Stage("batch", broken_batch, batch=True)],
+                              on_error=lambda stage, item, error: errors.append((stage, item, str(error))))
+    assert collect(pipeline, range(3)) == []
+    assert errors == [("batch", [0, 1, 2], "no ranking")]
+
+
+def test_workers_bound_the_concurrency_of_a_stage():
+    running, peak = 0, 0
+
+    async def slow(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item
+
+    assert len(collect(StagedPipeline([Stage("slow", slow, workers=3)]), range(12))) == 12
+    assert peak == 3
+
+
+def test_a_slow_stage_holds_back_the_source():
+    taken = 0
+
+    def source():
+        nonlocal taken
+        for item in range(100):
+            taken += 1
+            yield item
+
+    async def run():
+        async def slow(item):
+            await asyncio.sleep(0.01)
+            return item
+
+        stream = StagedPipeline([Stage("fast", double, workers=2, queue_size=2), Stage("slow", slow)]).run(source())
+        await stream.__anext__()
+        in_flight = taken
+        await stream.aclose()
+        return in_flight
+
+    # Bounded by the stage queues and workers, not by the length of the source
+    assert asyncio.run(run()) < 10
+
+
+def test_a_failing_source_still_drains_and_then_raises():
+    def source():
+        yield 1
+        yield 2
+        raise RuntimeError("source broke")
+
+    async def run():
+        seen = []
+        with pytest.raises(RuntimeError, match="source broke"):
+            async for item in StagedPipeline([Stage("double", double)]).run(source()):
+                seen.append(item)
+        return seen
+
+    assert sorted(asyncio.run(run())) == [2, 4]
+
+
+def test_a_pipeline_needs_stages():
+    with pytest.raises(ValueError):
+        StagedPipeline([])
@@ -0,0 +1,84 @@
+# tests/test_relevance.py
+import math
+
+import numpy as np
+
+from models.data_models import JobCriteria, JobListing, UserDetails
+from utils.relevance import BM25Ranker, query_terms, select_top, token_hashes, tokenize
+
+
+def listing(title, description=""):
+    return JobListing(url=f"https://jobs.example.test/{len(title)}", domain="jobs.example.test",
+                      title=title, description=description)
+
+
+def reference_bm25(terms, listings, k1=1.2, b=0.75, title_weight=2):
+    """Textbook Okapi BM25 over tokenize(), to check the vectorized ranker against"""
+    documents = [tokenize(" ".join([job.title] * title_weight + [job.description])) for job in listings]
+    average = sum(len(document) for document in documents) / len(documents) or 1.0
+    scores = []
+    for document in documents:
+        score = 0.0
+        for term in terms:
+            df = sum(1 for other in documents if term in other)
+            tf = document.count(term)
+            idf = math.log1p((len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len(document) / average))
+        scores.append(score)
+    return scores
+
+
+def test_tokens_keep_programming_terms_whole():
+    assert tokenize("Senior C++/C# engineer, Node.js & ASP.NET. Café!") == [
+        "senior", "c++", "c#", "engineer", "node.js", "asp.net", "café"
+    ]
+    assert tokenize("") == []
+
+
+def test_token_hashes_line_up_with_tokens():
+    hashes = token_hashes("Python python PYTHON go")
+    assert len(hashes) == 4
+    assert hashes[0] == hashes[1] == hashes[2] != hashes[3]
+    assert len(token_hashes("")) == 0
+
+
+def test_query_terms_come_from_keywords_and_skills():
+    criteria = JobCriteria(title="Engineer", location="Remote", experience=3, keywords=["Machine Learning"])
+    user = UserDetails(name="Ada", email="ada@example.com", phone="", resume_path="", skills=["Python", "C++"])
+    assert query_terms(criteria, user) == ["machine", "learning", "python", "c++"]
+    assert query_terms(JobCriteria(title="Engineer", location="", experience=0)) == []
+
+
+def test_scores_match_textbook_bm25():
+    listings = [
+        listing("Python Engineer", "Build data pipelines in Python and SQL."),
+        listing("Frontend Engineer", "React, TypeScript and a little Python."),
+        listing("Go Engineer", "Distributed systems in Go; Kubernetes experience."),
+        listing("Engineering Manager", "Lead a team of engineers."),
+    ]
+    terms = ["python", "sql", "kubernetes", "python"]
+    scores = BM25Ranker().score(terms, listings)
+    np.testing.assert_allclose(scores, reference_bm25(terms, listings))
+
+
+def test_title_matches_outweigh_description_matches():
+    listings = [listing("Data Engineer", "Pipelines with Rust."), listing("Rust Engineer", "Pipelines with data.")]
+    scores = BM25Ranker().score(["rust"], listings)
+    assert scores[1] > scores[0] > 0
+
+
+def test_nothing_to_rank_scores_zero():
+    assert BM25Ranker().score(["python"], []).shape == (0,)
+    np.testing.assert_array_equal(BM25Ranker().score([], [listing("Python Engineer")]), [0.0])
+    np.testing.assert_array_equal(BM25Ranker().score(["haskell"], [listing("Python Engineer")]), [0.0])
+
+
+def test_select_top_keeps_the_best_scores_in_order():
+    scores = np.array([0.5, 3.0, 0.0, 2.0, 2.5, 1.0])
+    assert select_top(scores).tolist() == [1, 4, 3, 5, 0, 2]
+    assert select_top(scores, top_k=3).tolist() == [1, 4, 3]
+    assert select_top(scores, min_score=1.0).tolist() == [1, 4, 3, 5]
+    assert select_top(scores, top_k=2, min_score=2.5).tolist() == [1, 4]
+    assert select_top(scores, top_k=0).tolist() == []
+    # Ties keep the listings' order
+    assert select_top(np.array([1.0, 2.0, 1.0, 2.0])).tolist() == [1, 3, 0, 2]
@@ -0,0 +1,31 @@
+# tests/test_seen_store.py
+import pytest
+
+from utils.seen_store import SeenJobStore
+
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_seen_jobs_persist_by_canonical_url(tmp_path, bloom):
+    path = str(tmp_path / "seen")
+    store = SeenJobStore(path, bloom=bloom, capacity=1000)
+    store.add("https://jobs.example.test/apply/1?utm_source=feed")
+    store.close()
+
+    reopened = SeenJobStore(path, bloom=bloom, capacity=1000)
+    assert "https://JOBS.example.test/apply/1" in reopened
+    assert "https://jobs.example.test/apply/2" not in reopened
+
+
+@pytest.mark.parametrize("bloom", [False, True])
+def test_stores_flushed_by_several_processes_keep_every_url(tmp_path, bloom):
+    path = str(tmp_path / "seen")
+    # Shards open the store before any of them has flushed
+    shards = [SeenJobStore(path, bloom=bloom, capacity=1000) for _ in range(3)]
+    for index, store in enumerate(shards):
+        store.add(f"https://jobs.example.test/apply/{index}")
+        store.flush()
+    for store in shards:
+        store.close()
+
+    merged = SeenJobStore(path, bloom=bloom, capacity=1000)
+    assert all(f"https://jobs.example.test/apply/{index}" in merged for index in range(3))
@@ -0,0 +1,82 @@
+# tests/test_tracker.py
+import asyncio
+import csv
+from datetime import datetime
+
+import pytest
+
+from agents.tracker import TrackerAgent
+from models.data_models import ApplicationResult, JobListing
+from utils.application_store import ApplicationStore
+
+
+def result(number: int, success: bool = True) -> ApplicationResult:
+    job = JobListing(url=f"https://jobs.example.test/apply/{number}", domain="jobs.example.test",
+                     title=f"Engineer {number}")
+    return ApplicationResult(job=job, success=success, timestamp=datetime(2024, 1, 1, 12, 0, number),
+                             notes=f"note {number}")
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    agent = TrackerAgent(output_dir=str(tmp_path), store=ApplicationStore(str(tmp_path / "applications.db")))
+    yield agent
+    asyncio.run(agent.shutdown())
+
+
+def test_runs_sharing_a_tracker_report_only_their_own_results(tracker):
+    async def scenario():
+        first, second = await tracker.start_run(), await tracker.start_run()
+        for number in range(3):
+            await tracker.record_application(result(number), run_id=first)
+            await tracker.record_application(result(10 + number, success=False), run_id=second)
+        return first, second, await tracker.get_all_applications(first)
+
+    first, second, applications = asyncio.run(scenario())
+    assert [app.job.url for app in applications] == [result(number).job.url for number in range(3)]
+
+    report = asyncio.run(tracker.export_reports(first))
+    with open(report, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["url"] for row in rows] == [result(number).job.url for number in range(3)]
+    assert rows[0]["notes"] == "note 0" and rows[0]["timestamp"] == "2024-01-01 12:00:00"
+    with open(report.replace(".csv", ".txt")) as f:
+        assert f.read().count("Title: Engineer") == 3
+
+    with open(asyncio.run(tracker.export_reports(second)), newline="") as f:
+        assert [row["success"] for row in csv.DictReader(f)] == ["False"] * 3
+
+
+def test_runs_exported_together_get_their_own_files(tracker):
+    async def scenario():
+        runs = [await tracker.start_run(), await tracker.start_run()]
+        for number, run_id in enumerate(runs):
+            await tracker.record_application(result(number), run_id=run_id)
+        return [await tracker.export_reports(run_id) for run_id in runs]
+
+    reports = asyncio.run(scenario())
+    assert len(set(reports)) == 2
+    for number, report in enumerate(reports):
+        with open(report, newline="") as f:
+            assert [row["url"] for row in csv.DictReader(f)] == [result(number).job.url]
+
+
+def test_export_does_not_scan_the_journal(tracker, monkeypatch):
+    async def scenario():
+        await tracker.record_application(result(1))
+        monkeypatch.setattr(tracker.journal, "records", lambda: pytest.fail("export read the whole journal"))
+        return await tracker.export_reports()
+
+    with open(asyncio.run(scenario()), newline="") as f:
+        assert len(list(csv.DictReader(f))) == 1
+
+
+def test_every_result_is_journaled(tracker):
+    async def scenario():
+        await tracker.record_application(result(1))
+        await tracker.record_application(result(2, success=False))
+
+    asyncio.run(scenario())
+    records = list(tracker.journal.records())
+    assert [record["url"] for record in records] == [result(1).job.url, result(2).job.url]
+    assert all(record["run_id"] == tracker.run_id for record in records)
@@ -0,0 +1,48 @@
+# tests/test_url_tools.py
+import pytest
+
+from utils.url_tools import canonicalize_url, unwrap_search_redirect
+
+CANONICAL = "https://boards.greenhouse.io/acme/jobs/123"
+
+
+@pytest.mark.parametrize("url", [
+    CANONICAL,
+    "http://boards.greenhouse.io/acme/jobs/123",
+    "HTTPS://Boards.Greenhouse.IO/acme/jobs/123/",
+    "https://www.boards.greenhouse.io/acme/jobs/123",
+    "https://boards.greenhouse.io:443/acme/jobs/123#app",
+    "https://boards.greenhouse.io/acme/jobs/123?gh_src=abc&utm_source=linkedin&utm_medium=social",
+    "  https://boards.greenhouse.io/acme/jobs/123?lever-source[]=x&fbclid=1  ",
+])
+def test_links_to_one_posting_share_a_canonical_url(url):
+    assert canonicalize_url(url) == CANONICAL
+
+
+def test_meaningful_query_parameters_are_kept_in_a_stable_order():
+    assert canonicalize_url("https://jobs.example.com/apply?lang=en&id=7&utm_campaign=x") == (
+        "https://jobs.example.com/apply?id=7&lang=en"
+    )
+    assert canonicalize_url("https://jobs.example.com/apply?id=7&empty=") == "https://jobs.example.com/apply?empty=&id=7"
+
+
+def test_paths_are_case_sensitive_and_distinct_postings_stay_distinct():
+    assert canonicalize_url("https://jobs.example.com/Jobs/1") != canonicalize_url("https://jobs.example.com/jobs/1")
+    assert canonicalize_url("https://jobs.example.com/jobs/1") != canonicalize_url("https://jobs.example.com/jobs/2")
+    assert canonicalize_url("https://Jobs.Example.com") == "https://jobs.example.com/"
+
+
+def test_local_servers_keep_plain_http_and_their_port():
+    assert canonicalize_url("http://127.0.0.1:8090/boards/a/jobs/1/apply/") == "http://127.0.0.1:8090/boards/a/jobs/1/apply"
+    assert canonicalize_url("http://localhost/jobs?src=x") == "http://localhost/jobs"
+    assert canonicalize_url("http://[::1]:8080/jobs") == "http://[::1]:8080/jobs"
+
+
+def test_search_result_redirects_are_unwrapped():
+    target = "https://jobs.lever.co/acme/abc"
+    assert unwrap_search_redirect(f"/url?q={target}&sa=U&ved=x") == target
+    assert unwrap_search_redirect(f"https://www.google.com/url?url={target}") == target
+    # Other links, and redirects elsewhere, are left alone
+    assert unwrap_search_redirect(target) == target
+    assert unwrap_search_redirect(f"https://example.com/url?q={target}") == f"https://example.com/url?q={target}"
+    assert unwrap_search_redirect("/url?q=javascript:alert(1)") == "/url?q=javascript:alert(1)"